@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 from app.api.routes import companies
 from app.api.routes import auth
+from app.api.routes import postal
 
 api_router = APIRouter()
 
 # 企業ルーター登録
 api_router.include_router(companies.router, prefix="/companies", tags=["companies"])
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
\ No newline at end of file
+api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(postal.router, prefix="/postal", tags=["postal"])
\ No newline at end of file
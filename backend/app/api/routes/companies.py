@@ -1,15 +1,52 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import ValidationError
-from typing import List
+import io
 from datetime import datetime
-from passlib.hash import bcrypt
-from beanie import PydanticObjectId
+from functools import cached_property
+from fastapi import APIRouter, HTTPException, Depends, File, Header, Query, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Union
 from pymongo.errors import DuplicateKeyError
 
-from app.schemas.company import CompanyCreate, CompanyResponse
+from app.schemas.company import (
+    CompanyCreate,
+    CompanyImportReport,
+    CompanyPage,
+    CompanyResponse,
+    CompanySuggestion,
+)
 from app.models.company_document import Company as CompanyDoc
 from app.dependencies.auth import get_current_user
 from app.schemas.auth import UserInfo
+from app.services.company_cache import company_cache, company_etag
+from app.services.company_search import autocomplete_companies
+from app.services.company_export import (
+    build_export_filter,
+    csv_stream,
+    iter_export_rows,
+    ndjson_export_stream,
+)
+from app.services.company_import import import_companies, parse_csv, parse_ndjson
+from app.services.company_query import SortOption, UnsupportedQueryShape, build_list_query
+from app.services.company_reader import company_reads, find_company_page, find_company_rows, iter_company_rows
+from app.services.company_serializer import (
+    company_json,
+    company_list_json,
+    company_page_json,
+)
+from app.services.company_validation import build_company_document
+from app.services.group_commit import insert_company
+from app.services.password_service import password_service
+from app.utils.etag import not_modified
+from app.utils.fast_json import FastJSONResponse
+from app.utils.singleflight import flight_key
+from app.utils.streaming import (
+    CSV_MEDIA_TYPE,
+    GZIP_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    gzip_stream,
+    json_array_stream,
+    ndjson_stream,
+)
 
 router = APIRouter()
 
@@ -36,18 +73,132 @@ def _to_response_model(doc: CompanyDoc) -> CompanyResponse:
     )
 
 
-@router.get("/", response_model=List[CompanyResponse])
-async def get_companies(current_user: UserInfo = Depends(get_current_user)):
-    """すべての企業を取得します。"""
-    docs = await CompanyDoc.find_all().to_list()
-    result: List[CompanyResponse] = []
-    for d in docs:
-        try:
-            result.append(_to_response_model(d))
-        except ValidationError:
-            # Skip legacy/malformed documents that don't satisfy current API schema
-            continue
-    return result
+@router.get("/", response_model=Union[CompanyPage, List[CompanyResponse]])
+async def get_companies(
+    limit: int = Query(20, ge=1, le=100, description="1ページあたりの件数"),
+    cursor: Optional[str] = Query(None, description="前ページの next_cursor"),
+    legacy: bool = Query(False, description="true の場合は従来通り全件を配列で返す（非推奨）"),
+    prefecture: Optional[str] = Query(None, description="都道府県で絞り込み"),
+    months: Optional[str] = Query(None, description="年度設定で絞り込み（例: 04-03）"),
+    appIntegrationEnabled: Optional[bool] = Query(None),
+    safetyConfirmationEnabled: Optional[bool] = Query(None),
+    occupationalDoctorIntegrationEnabled: Optional[bool] = Query(None),
+    employeeChatEnabled: Optional[bool] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="作成日時の下限（この日時を含む）"),
+    created_to: Optional[datetime] = Query(None, description="作成日時の上限（この日時を含まない）"),
+    sort: SortOption = Query("created_at", description="並び順（先頭の - は降順）"),
+    current_user: UserInfo = Depends(get_current_user),
+):
+    """企業一覧を (並び順のキー, _id) のキーセットページネーションで取得します。
+
+    絞り込みと並び順は複合索引で処理できる組み合わせだけを受け付けます（それ以外は 400）。
+    生ドキュメントを直接 JSON バイト列にします（Beanie / CompanyResponse での再検証を省略）。
+    """
+    try:
+        list_query = build_list_query(
+            prefecture=prefecture,
+            months=months,
+            flags={
+                "appIntegrationEnabled": appIntegrationEnabled,
+                "safetyConfirmationEnabled": safetyConfirmationEnabled,
+                "occupationalDoctorIntegrationEnabled": occupationalDoctorIntegrationEnabled,
+                "employeeChatEnabled": employeeChatEnabled,
+            },
+            created_from=created_from,
+            created_to=created_to,
+            sort=sort,
+        )
+    except UnsupportedQueryShape as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if legacy:
+        async def load_all() -> bytes:
+            return company_list_json(await find_company_rows(list_query.filter, sort=list_query.sort))
+
+        key = flight_key("list", "legacy", list_query.filter, list_query.sort)
+        return FastJSONResponse(await company_reads.do(key, load_all))
+
+    try:
+        query = list_query.after(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    async def load_page() -> bytes:
+        # 次ページのカーソルは非互換の行を除外する前のページ末尾から作る
+        rows, page_end, has_next = await find_company_page(query, limit, sort=list_query.sort)
+        next_cursor = list_query.cursor_for(page_end) if has_next else None
+        return company_page_json(rows, next_cursor)
+
+    # 同時に届いた同じ条件の一覧は1回の取得・シリアライズを共有する
+    key = flight_key("list", query, list_query.sort, limit)
+    return FastJSONResponse(await company_reads.do(key, load_page))
+
+
+async def _iter_company_json(batch_size: int) -> AsyncIterator[bytes]:
+    async for raw in iter_company_rows(batch_size):
+        yield company_json(raw)
+
+
+@router.get("/stream")
+async def stream_companies(
+    format: Literal["ndjson", "json"] = Query("ndjson", description="ndjson: 1行1企業 / json: JSON配列"),
+    batch_size: int = Query(500, ge=1, le=10000, description="Mongo カーソルのバッチサイズ"),
+    current_user: UserInfo = Depends(get_current_user),
+):
+    """全企業をバッファせずにストリーミングで返します（バックオフィス同期用）。"""
+    items = _iter_company_json(batch_size)
+    if format == "json":
+        return StreamingResponse(json_array_stream(items), media_type=JSON_MEDIA_TYPE)
+    return StreamingResponse(ndjson_stream(items), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/export")
+async def export_companies(
+    format: Literal["csv", "ndjson"] = Query("csv", description="csv: ヘッダー付き CSV / ndjson: 1行1企業"),
+    gzip: bool = Query(False, description="true の場合は gzip 圧縮して返す"),
+    prefecture: Optional[str] = Query(None, description="都道府県で絞り込み"),
+    months: Optional[str] = Query(None, description="年度設定で絞り込み（例: 04-03）"),
+    appIntegrationEnabled: Optional[bool] = Query(None),
+    safetyConfirmationEnabled: Optional[bool] = Query(None),
+    occupationalDoctorIntegrationEnabled: Optional[bool] = Query(None),
+    employeeChatEnabled: Optional[bool] = Query(None),
+    created_from: Optional[datetime] = Query(None, description="作成日時の下限（この日時を含む）"),
+    created_to: Optional[datetime] = Query(None, description="作成日時の上限（この日時を含まない）"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Mongo カーソルのバッチサイズ"),
+    current_user: UserInfo = Depends(get_current_user),
+):
+    """条件に合う企業を CSV / NDJSON でストリーミング出力します（夜間の全件ダンプ用）。"""
+    query = build_export_filter(
+        prefecture=prefecture,
+        flags={
+            "appIntegrationEnabled": appIntegrationEnabled,
+            "safetyConfirmationEnabled": safetyConfirmationEnabled,
+            "occupationalDoctorIntegrationEnabled": occupationalDoctorIntegrationEnabled,
+            "employeeChatEnabled": employeeChatEnabled,
+        },
+        created_from=created_from,
+        created_to=created_to,
+        months=months,
+    )
+    rows = iter_export_rows(query, batch_size=batch_size)
+    if format == "csv":
+        body, media_type, filename = csv_stream(rows), CSV_MEDIA_TYPE, "companies.csv"
+    else:
+        body, media_type, filename = ndjson_export_stream(rows), NDJSON_MEDIA_TYPE, "companies.ndjson"
+    if gzip:
+        body, media_type, filename = gzip_stream(body), GZIP_MEDIA_TYPE, filename + ".gz"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+@router.get("/autocomplete", response_model=List[CompanySuggestion])
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=255, description="ひらがな・カタカナ（全角/半角）・漢字の入力途中文字列"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: UserInfo = Depends(get_current_user),
+):
+    """企業名・企業名カナ・担当者名カナの前方一致候補を返します。"""
+    return await autocomplete_companies(q, limit=limit)
 
 
 @router.post("/", response_model=CompanyResponse)
@@ -56,51 +207,75 @@ async def create_company(
     current_user: UserInfo = Depends(get_current_user)
 ):
     """新しい企業を作成します。"""
-    # 重複確認 (既存ドキュメントの不完全なスキーマによる検証エラーを避けるためcountで確認)
-    if await CompanyDoc.find({"companyCode": company.companyCode}).count() > 0:
-        raise HTTPException(status_code=400, detail="Company code already exists")
-
-    # パスワードハッシュ
-    # hashed = bcrypt.hash(company.ownerLoginPassword)
-
-    doc = CompanyDoc(
-        companyName=company.companyName,
-        companyNameKana=company.companyNameKana,
-        companyCode=company.companyCode,
-        contactName=company.contactName,
-        contactNameKana=company.contactNameKana,
-        phoneNumber=company.phoneNumber,
-        postalCode=company.postalCode,
-        location=company.location.model_dump(),
-        months=company.months,
-        ownerLoginEmail=company.ownerLoginEmail,
-        ownerLoginPassword=company.ownerLoginPassword,
-        appIntegrationEnabled=company.appIntegrationEnabled,
-        safetyConfirmationEnabled=company.safetyConfirmationEnabled,
-        occupationalDoctorIntegrationEnabled=company.occupationalDoctorIntegrationEnabled,
-        employeeChatEnabled=company.employeeChatEnabled,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
-    )
+    # パスワードハッシュ（ワーカースレッドで計算し、イベントループを止めない）
+    hashed = await password_service.hash(company.ownerLoginPassword)
+
+    # リクエストボディは FastAPI が CompanyCreate として検証済みのため再検証しない
+    doc = build_company_document(company, ownerLoginPassword=hashed)
     try:
-        await doc.insert()
+        # 重複は事前確認せず、companyCode の一意索引 (idx_company_code) に任せる
+        await insert_company(doc)
     except DuplicateKeyError as e:
         # Map DB unique index violations to 400 without pre-checks
         # Currently the only unique field is companyCode
         raise HTTPException(status_code=400, detail="Company code already exists") from e
+    await company_cache.invalidate(str(doc.id))
     return _to_response_model(doc)
 
 
-@router.get("/{company_id}", response_model=CompanyResponse)
+@router.post("/import", response_model=CompanyImportReport)
+async def import_companies_file(
+    file: UploadFile = File(..., description="NDJSON (1行1企業) または ヘッダー付き CSV"),
+    format: Optional[Literal["ndjson", "csv"]] = Query(None, description="省略時はファイル名・Content-Type から判定"),
+    current_user: UserInfo = Depends(get_current_user),
+):
+    """企業を一括登録します。行ごとの結果（作成・企業コード重複・検証エラー）を返します。"""
+    if format is None:
+        name = (file.filename or "").lower()
+        is_csv = name.endswith(".csv") or (file.content_type or "").startswith("text/csv")
+        format = "csv" if is_csv else "ndjson"
+    # アップロードは一時ファイルに保持されているため、行単位で読み進める（読み込み・解析はスレッドで行う）
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    rows = parse_csv(lines) if format == "csv" else parse_ndjson(lines)
+    try:
+        return await import_companies(rows)
+    except UnicodeDecodeError:
+        # まだ何も書き込んでいない場合のみ（途中で読めなくなった場合は結果の errors に含まれる）
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+
+
+class _CompanyBody:
+    """1件取得の共有結果（本文は 304 にならなかった場合に一度だけ作る）"""
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+        self.etag = company_etag(raw)
+
+    @cached_property
+    def body(self) -> bytes:
+        return company_json(self.raw)
+
+
+@router.get("/{company_id}", response_model=CompanyResponse, responses={304: {"description": "Not Modified"}})
 async def get_company(
     company_id: str,
+    if_none_match: Optional[str] = Header(None),
     current_user: UserInfo = Depends(get_current_user)
 ):
-    """特定の企業を取得します。"""
-    try:
-        doc = await CompanyDoc.get(PydanticObjectId(company_id))
-    except Exception:
-        doc = None
-    if not doc:
+    """特定の企業を取得します。
+
+    read-through キャッシュを経由し、If-None-Match が ETag と一致する場合は本文を作らずに 304 を返します。
+    """
+    async def load() -> Optional[_CompanyBody]:
+        raw = await company_cache.get(company_id)
+        return _CompanyBody(raw) if raw is not None else None
+
+    # 同時に届いた同じ ID の取得は1回の読み取り・シリアライズを共有する
+    company = await company_reads.do(flight_key("get", company_id), load)
+    if company is None:
         raise HTTPException(status_code=404, detail="Company not found")
-    return _to_response_model(doc)
\ No newline at end of file
+    # 毎回再検証させる（変更がなければ 304 で本文を送らない）
+    headers = {"ETag": company.etag, "Cache-Control": "private, no-cache"}
+    if not_modified(if_none_match, company.etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(company.body, headers=headers)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.services.metrics import PROMETHEUS_MEDIA_TYPE, metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus のスクレイプ用（HTTP / GraphQL / MongoDB / Keycloak の所要時間など）"""
+    return Response(content=metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
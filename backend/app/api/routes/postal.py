@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Path
+
+from app.dependencies.auth import get_current_user
+from app.schemas.auth import UserInfo
+from app.schemas.postal import PostalAddress, PostalLookupResponse
+from app.services.postal_index import normalize_postal_code, postal_service
+
+router = APIRouter()
+
+
+@router.get("/{code}", response_model=PostalLookupResponse)
+async def lookup_postal_code(
+    code: str = Path(..., description="郵便番号（ハイフンあり/なし）"),
+    current_user: UserInfo = Depends(get_current_user),
+):
+    """郵便番号から住所を返します（同梱の索引を参照し、外部 API は呼びません）。"""
+    normalized = normalize_postal_code(code)
+    if normalized is None:
+        raise HTTPException(status_code=400, detail="Postal code must be 7 digits")
+    if not postal_service.available:
+        raise HTTPException(status_code=503, detail="Postal index is not available")
+    entries = postal_service.lookup(normalized)
+    if not entries:
+        raise HTTPException(status_code=404, detail="Postal code not found")
+    return PostalLookupResponse(
+        postalCode=normalized,
+        addresses=[PostalAddress(prefecture=e.prefecture, city=e.city, town=e.town) for e in entries],
+    )
@@ -0,0 +1,34 @@
+import hmac
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response
+
+from app.config import PROFILING_ALL_REQUESTS, PROFILING_TOKEN
+from app.services.profiling import profile_store
+
+router = APIRouter()
+
+_MEDIA_TYPES = {"folded": "text/plain; charset=utf-8", "json": "application/json"}
+
+
+@router.get("/debug/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(
+    profile_id: str,
+    format: Literal["folded", "json"] = "folded",
+    x_profile_token: Optional[str] = Header(None),
+):
+    """保存済みのプロファイル（folded: collapsed stacks / json: フェーズ別の所要時間）
+
+    PROFILING_TOKEN を X-Profile-Token ヘッダーで渡した場合のみ返します
+    （トークン未設定で PROFILING_ALL_REQUESTS が有効なローカル環境ではヘッダー不要）。
+    """
+    if PROFILING_TOKEN:
+        if x_profile_token is None or not hmac.compare_digest(x_profile_token.encode(), PROFILING_TOKEN.encode()):
+            raise HTTPException(status_code=403, detail="Invalid profile token")
+    elif not PROFILING_ALL_REQUESTS:
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+    content = profile_store.load(profile_id, format)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=content, media_type=_MEDIA_TYPES[format])
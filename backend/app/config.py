@@ -21,4 +21,61 @@ MONGODB_DB = (
 KEYCLOAK_URL = os.getenv("KEYCLOAK_URL", "http://localhost:8083")
 KEYCLOAK_REALM = os.getenv("KEYCLOAK_REALM", "add-rec-tool")
 KEYCLOAK_CLIENT_ID = os.getenv("KEYCLOAK_CLIENT_ID", "admin-cli")
-KEYCLOAK_CLIENT_SECRET = os.getenv("KEYCLOAK_CLIENT_SECRET", "")
\ No newline at end of file
+KEYCLOAK_CLIENT_SECRET = os.getenv("KEYCLOAK_CLIENT_SECRET", "")
+# 検証済みトークンのキャッシュ件数上限 (0 で無効)
+KEYCLOAK_TOKEN_CACHE_SIZE = int(os.getenv("KEYCLOAK_TOKEN_CACHE_SIZE", "10000"))
+
+# Keycloak HTTP クライアント（アプリ全体で共有）
+KEYCLOAK_HTTP_MAX_CONNECTIONS = int(os.getenv("KEYCLOAK_HTTP_MAX_CONNECTIONS", "100"))
+KEYCLOAK_HTTP_MAX_KEEPALIVE = int(os.getenv("KEYCLOAK_HTTP_MAX_KEEPALIVE", "20"))
+KEYCLOAK_HTTP_TIMEOUT_SECONDS = float(os.getenv("KEYCLOAK_HTTP_TIMEOUT_SECONDS", "10"))
+# JWKS (公開鍵) のキャッシュ有効期間と、期限前にバックグラウンド更新する余裕
+KEYCLOAK_JWKS_TTL_SECONDS = int(os.getenv("KEYCLOAK_JWKS_TTL_SECONDS", "3600"))
+KEYCLOAK_JWKS_REFRESH_MARGIN_SECONDS = int(os.getenv("KEYCLOAK_JWKS_REFRESH_MARGIN_SECONDS", "300"))
+# 未知の kid を受け取った際の JWKS 強制更新の最小間隔（バックグラウンド更新の間隔の下限も兼ねる）
+KEYCLOAK_JWKS_MIN_REFRESH_INTERVAL_SECONDS = int(os.getenv("KEYCLOAK_JWKS_MIN_REFRESH_INTERVAL_SECONDS", "30"))
+
+# 一括インポート: 検証・insert_many を行う1チャンクの行数
+COMPANY_IMPORT_CHUNK_SIZE = int(os.getenv("COMPANY_IMPORT_CHUNK_SIZE", "500"))
+
+# companiesConnection.totalCount: 絞り込み条件ごとの件数キャッシュの有効期間
+COMPANY_COUNT_CACHE_TTL_SECONDS = float(os.getenv("COMPANY_COUNT_CACHE_TTL_SECONDS", "30"))
+
+# パスワードハッシュ (bcrypt): コスト係数と、ハッシュ計算に使うワーカースレッド数
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+# 一括インポート用のワーカースレッド数（対話的な作成・ログインとは別のプールで計算する）
+PASSWORD_IMPORT_HASH_WORKERS = int(os.getenv("PASSWORD_IMPORT_HASH_WORKERS", "2"))
+
+# 企業作成のグループコミット（同時に届いた insert を1回の insert_many にまとめる）。既定は無効
+COMPANY_GROUP_COMMIT_ENABLED = os.getenv("COMPANY_GROUP_COMMIT_ENABLED", "false").lower() in {"1", "true", "yes"}
+# 最初の insert からまとめて書き込むまでの待ち時間と、1回にまとめる最大件数
+COMPANY_GROUP_COMMIT_WINDOW_MS = float(os.getenv("COMPANY_GROUP_COMMIT_WINDOW_MS", "5"))
+COMPANY_GROUP_COMMIT_MAX_BATCH = int(os.getenv("COMPANY_GROUP_COMMIT_MAX_BATCH", "100"))
+
+# 郵便番号 → 住所の索引ファイル（scripts/build_postal_index.py で KEN_ALL.CSV から生成）
+POSTAL_INDEX_PATH = os.getenv("POSTAL_INDEX_PATH") or os.path.join(os.path.dirname(__file__), "data", "postal_index.bin")
+# 企業登録時に postalCode と location.prefecture / city の整合を確認する（全国版の索引を配置した環境向け）
+POSTAL_ADDRESS_CHECK_ENABLED = os.getenv("POSTAL_ADDRESS_CHECK_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+# 企業1件取得の read-through キャッシュ（TTL 0 で無効）
+# memory: プロセス内 LRU（ワーカー間で共有されないため、他ワーカーの更新は TTL まで反映されない）
+# redis: 共有キャッシュ（redis パッケージが必要）
+COMPANY_CACHE_BACKEND = os.getenv("COMPANY_CACHE_BACKEND", "memory")
+COMPANY_CACHE_TTL_SECONDS = float(os.getenv("COMPANY_CACHE_TTL_SECONDS", "60"))
+COMPANY_CACHE_MAX_ENTRIES = int(os.getenv("COMPANY_CACHE_MAX_ENTRIES", "10000"))
+COMPANY_CACHE_REDIS_URL = os.getenv("COMPANY_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# /metrics（Prometheus テキスト形式）と計測用ミドルウェアを有効にする
+# /metrics は認証なしで公開されるため既定は無効（スクレイプ元からのみ到達できる環境で有効にする）
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+# リクエスト単位のプロファイリング（サンプリングで collapsed stacks + フェーズ別の所要時間を保存）。既定は無効
+# 有効時は X-Profile-Token ヘッダーが PROFILING_TOKEN と一致したリクエストだけを対象にする
+# PROFILING_ALL_REQUESTS=true は全リクエストを対象にする（ローカル調査用）
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in {"1", "true", "yes"}
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_ALL_REQUESTS = os.getenv("PROFILING_ALL_REQUESTS", "false").lower() in {"1", "true", "yes"}
+PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "1"))
+PROFILING_OUTPUT_DIR = os.getenv("PROFILING_OUTPUT_DIR", "profiles")
+PROFILING_MAX_STORED = int(os.getenv("PROFILING_MAX_STORED", "100"))
@@ -3,8 +3,12 @@ from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 
-from .config import MONGODB_URI, MONGODB_DB
+from .config import MONGODB_URI, MONGODB_DB, PROFILING_ENABLED
 from .models.company_document import Company
+from .migrations.indexes import apply_index_migrations
+from .migrations.schema_versions import apply_schema_checks
+from .services.metrics import mongo_event_listeners
+from .services.profiling import MongoProfileListener
 
 _client: Optional[AsyncIOMotorClient] = None
 
@@ -24,19 +28,17 @@ async def init_db() -> None:
     except Exception:
         pass
 
-    _client = AsyncIOMotorClient(MONGODB_URI)
+    # コマンド所要時間・接続プールの状態を /metrics に出す（プロファイリング有効時は db フェーズにも加算）
+    listeners = mongo_event_listeners()
+    if PROFILING_ENABLED:
+        listeners.append(MongoProfileListener())
+    _client = AsyncIOMotorClient(MONGODB_URI, event_listeners=listeners)
     db = _client[MONGODB_DB]
-    await init_beanie(database=db, document_models=[Company])
-
-    # Ensure legacy unique index on ownerLoginEmail is removed if present
-    try:
-        companies_col = db.get_collection("companies")
-        # Drop by index name created previously in model Settings
-        await companies_col.drop_index("idx_owner_email")
-        print("[DB] Dropped legacy unique index: idx_owner_email")
-    except Exception:
-        # Index may not exist; ignore
-        pass
+    # 索引は起動ごとに作成せず、バージョン管理された差分適用に任せる
+    await init_beanie(database=db, document_models=[Company], skip_indexes=True)
+    await apply_index_migrations(db)
+    # 従来ドキュメントの互換性は読み取りの経路ではなく、ここで判定基準ごとに1回だけ記録する
+    await apply_schema_checks(db)
 
 
 async def close_db() -> None:
@@ -0,0 +1,33 @@
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException, Request
+from strawberry.dataloader import DataLoader
+
+from app.graphql.resolvers.company import load_companies_by_ids
+from app.services.keycloak_service import keycloak_service
+
+
+async def get_context(request: Request) -> Dict[str, Any]:
+    """リクエストごとの GraphQL コンテキストを作ります。
+
+    トークン検証はここで1回だけ行い、各リゾルバは結果（user / auth_error）を参照します。
+    DataLoader もリクエスト単位で生成し、同一リクエスト内の ID 検索をまとめます。
+    """
+    user = None
+    auth_error: Optional[HTTPException] = None
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        try:
+            user = await keycloak_service.verify_token(auth_header.replace("Bearer ", ""))
+        except HTTPException as e:
+            auth_error = e
+        except httpx.HTTPError as e:
+            # Keycloak に到達できない場合も、認証不要のフィールド（hello など）は処理を続ける
+            print(f"[Keycloak] Token verification unavailable: {e!r}")
+            auth_error = HTTPException(status_code=503, detail="Authentication service unavailable")
+    return {
+        "user": user,
+        "auth_error": auth_error,
+        "company_loader": DataLoader(load_fn=load_companies_by_ids),
+    }
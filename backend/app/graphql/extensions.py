@@ -0,0 +1,41 @@
+import time
+from typing import Iterator
+
+from strawberry.extensions import SchemaExtension
+
+from app.services.metrics import GRAPHQL_OPERATION_SECONDS
+from app.utils.profiling import phase
+
+
+class MetricsExtension(SchemaExtension):
+    """GraphQL の操作ごと（operation 名 + 種別）の所要時間を記録します。"""
+
+    def on_operation(self) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        context = self.execution_context
+        try:
+            operation_type = context.operation_type.value
+        except RuntimeError:
+            # 構文エラーなどで文書が解析できなかった場合
+            operation_type = "unknown"
+        result = context.result
+        status = "error" if context.pre_execution_errors or (result is not None and result.errors) else "ok"
+        GRAPHQL_OPERATION_SECONDS.observe(
+            time.perf_counter() - start,
+            context.operation_name or "anonymous",
+            operation_type,
+            status,
+        )
+
+
+class ProfilingExtension(SchemaExtension):
+    """プロファイル対象のリクエストで、GraphQL の構文解析・検証の時間をフェーズとして記録します。"""
+
+    def on_parse(self) -> Iterator[None]:
+        with phase("gql_parse"):
+            yield
+
+    def on_validate(self) -> Iterator[None]:
+        with phase("gql_validate"):
+            yield
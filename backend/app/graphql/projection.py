@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import strawberry
+from strawberry.types.base import get_object_definition
+from strawberry.types.nodes import FragmentSpread, InlineFragment, Selection
+
+FieldMap = Dict[str, "FieldMapping"]
+
+
+@dataclass(frozen=True)
+class FieldMapping:
+    """GraphQL フィールド → MongoDB のドキュメントパス"""
+    path: str
+    children: Optional[FieldMap] = None
+
+
+def _unwrap(type_):
+    # Optional[...] / List[...] を剥がして中身の型を取り出す
+    while hasattr(type_, "of_type"):
+        type_ = type_.of_type
+    return type_
+
+
+def build_field_map(
+    schema: strawberry.Schema,
+    type_: type,
+    paths: Optional[Mapping[str, str]] = None,
+    prefix: str = "",
+) -> FieldMap:
+    """strawberry 型のフィールドとドキュメントパスの対応表を作ります。
+
+    スキーマ構築時に一度だけ呼び出し、GraphQL 名（auto camel case 後）で引けるようにします。
+    paths で Python 名ごとのパスを上書きできます（例: {"id": "_id"}）。
+    """
+    converter = schema.config.name_converter
+    field_map: FieldMap = {}
+    for field in get_object_definition(type_, strict=True).fields:
+        path = prefix + (paths or {}).get(field.python_name, field.python_name)
+        nested = _unwrap(field.type)
+        children = None
+        if get_object_definition(nested) is not None:
+            children = build_field_map(schema, nested, prefix=f"{path}.")
+        field_map[converter.get_graphql_name(field)] = FieldMapping(path=path, children=children)
+    return field_map
+
+
+def _collect_paths(selections: Iterable[Selection], field_map: FieldMap, paths: set) -> None:
+    for selection in selections:
+        if isinstance(selection, (FragmentSpread, InlineFragment)):
+            _collect_paths(selection.selections, field_map, paths)
+            continue
+        if selection.name == "__typename":
+            continue
+        mapping = field_map[selection.name]
+        if mapping.children and selection.selections:
+            _collect_paths(selection.selections, mapping.children, paths)
+        else:
+            paths.add(mapping.path)
+
+
+def projection_from_selections(
+    selections: Iterable[Selection], field_map: FieldMap
+) -> Optional[Dict[str, int]]:
+    """選択されたフィールドから MongoDB の projection を作ります。
+
+    対応表にないフィールドが含まれる場合は None（= 全フィールド取得）を返します。
+    """
+    paths = {"_id"}
+    try:
+        _collect_paths(selections, field_map, paths)
+    except KeyError:
+        return None
+    return {path: 1 for path in sorted(paths)}
+
+
+def child_selections(selections: Iterable[Selection], name: str) -> List[Selection]:
+    """name フィールドの子の選択を返します（フラグメント内も含め、複数回の指定はまとめる）。"""
+    children: List[Selection] = []
+    for selection in selections:
+        if isinstance(selection, (FragmentSpread, InlineFragment)):
+            children.extend(child_selections(selection.selections, name))
+        elif selection.name == name:
+            children.extend(selection.selections)
+    return children
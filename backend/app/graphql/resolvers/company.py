@@ -1,19 +1,61 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from passlib.hash import bcrypt
+import strawberry
 from beanie import PydanticObjectId
 from pydantic import ValidationError
 from pymongo.errors import DuplicateKeyError
 
 from app.models.company_document import Company as CompanyDoc
-from app.schemas.company import (
-    CompanyCreate as CompanyCreateSchema,
-    Location as LocationSchema,
+from app.graphql.types.company import (
+    Company as GQLCompany,
+    CompanyConnection,
+    CompanyCreateInput,
+    CompanyEdge,
+    CompanyFilter,
+    CompanyImportReport,
+    CompanySort,
+    CompanySuggestion,
+    ImportRowResult,
+    Location,
+    PageInfo,
 )
-from app.graphql.types.company import Company as GQLCompany, CompanyCreateInput, Location
+from app.services.company_cache import company_cache
+from app.services.company_count import count_companies
+from app.services.company_import import import_companies as import_company_rows, parse_csv, parse_ndjson
+from app.services.company_query import ListQuery, build_list_query
+from app.services.company_reader import (
+    company_reads,
+    ensure_compatible,
+    find_company_page,
+    is_projected,
+    readable,
+    versioned,
+)
+from app.services.company_search import autocomplete_companies, search_company_rows
+from app.services.company_serializer import normalize_email
+from app.services.company_validation import (
+    build_company_document,
+    field_errors,
+    format_field_errors,
+    validate_company,
+)
+from app.services.group_commit import insert_company
+from app.services.password_service import password_service
+from app.utils.profiling import phase
+from app.utils.singleflight import flight_key
+
+# projection 指定がない場合でも返さないフィールド
+DEFAULT_PROJECTION = {"ownerLoginPassword": 0, "searchTokens": 0, "searchKeys": 0}
+_DEFAULT_MONTHS = CompanyDoc.model_fields["months"].default
+
+# DataLoader のキー: (企業ID, projection のパス一覧)。空タプルは DEFAULT_PROJECTION
+CompanyKey = Tuple[str, Tuple[str, ...]]
+
+
+def company_key(company_id: str, projection: Optional[Dict[str, int]] = None) -> CompanyKey:
+    return company_id, tuple(projection) if projection else ()
 
 
 def _to_gql_company(doc: CompanyDoc) -> GQLCompany:
@@ -38,95 +80,206 @@ def _to_gql_company(doc: CompanyDoc) -> GQLCompany:
     )
 
 
-async def list_companies(limit: int = 20, offset: int = 0, search: Optional[str] = None) -> List[GQLCompany]:
-    query = {}
+def _to_gql_company_from_raw(raw: Dict[str, Any]) -> GQLCompany:
+    """projection 済みの生ドキュメントから変換します（未選択のフィールドは None）。"""
+    location = raw.get("location")
+    return GQLCompany(
+        id=str(raw["_id"]),
+        companyName=raw.get("companyName"),
+        companyNameKana=raw.get("companyNameKana"),
+        companyCode=raw.get("companyCode"),
+        contactName=raw.get("contactName"),
+        contactNameKana=raw.get("contactNameKana"),
+        phoneNumber=raw.get("phoneNumber"),
+        postalCode=raw.get("postalCode"),
+        location=Location(
+            prefecture=location.get("prefecture"),
+            city=location.get("city"),
+            streetAddress=location.get("streetAddress"),
+            addressLine=location.get("addressLine"),
+        ) if location is not None else None,
+        months=raw.get("months", _DEFAULT_MONTHS),
+        ownerLoginEmail=normalize_email(raw["ownerLoginEmail"]) if raw.get("ownerLoginEmail") else None,
+        appIntegrationEnabled=raw.get("appIntegrationEnabled"),
+        safetyConfirmationEnabled=raw.get("safetyConfirmationEnabled"),
+        occupationalDoctorIntegrationEnabled=raw.get("occupationalDoctorIntegrationEnabled"),
+        employeeChatEnabled=raw.get("employeeChatEnabled"),
+        created_at=raw.get("created_at"),
+        updated_at=raw.get("updated_at"),
+    )
+
+
+def _list_query(filter: Optional[CompanyFilter], sort: CompanySort) -> ListQuery:
+    """絞り込み・並び順を索引のある形に限定します（それ以外は UnsupportedQueryShape）。"""
+    if filter is None:
+        return build_list_query(sort=sort.value)
+    return build_list_query(
+        prefecture=filter.prefecture,
+        months=filter.months,
+        flags={
+            "appIntegrationEnabled": filter.appIntegrationEnabled,
+            "safetyConfirmationEnabled": filter.safetyConfirmationEnabled,
+            "occupationalDoctorIntegrationEnabled": filter.occupationalDoctorIntegrationEnabled,
+            "employeeChatEnabled": filter.employeeChatEnabled,
+        },
+        created_from=filter.createdFrom,
+        created_to=filter.createdTo,
+        sort=sort.value,
+    )
+
+
+async def list_companies(
+    limit: int = 20,
+    offset: int = 0,
+    search: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+    filter: Optional[CompanyFilter] = None,
+    sort: Optional[CompanySort] = None,
+) -> List[GQLCompany]:
+    projection = projection or DEFAULT_PROJECTION
     if search:
-        # naive contains filter on name/code/email
-        query = {
-            "$or": [
-                {"companyName": {"$regex": search, "$options": "i"}},
-                {"companyCode": {"$regex": search, "$options": "i"}},
-            ]
-        }
-    docs = await CompanyDoc.find(query).skip(offset).limit(limit).to_list()
-    return [_to_gql_company(d) for d in docs]
-
-
-async def get_company(company_id: str) -> Optional[GQLCompany]:
-    try:
-        doc = await CompanyDoc.get(PydanticObjectId(company_id))
-    except Exception:
-        doc = None
-    return _to_gql_company(doc) if doc else None
+        if filter is not None or sort is not None:
+            # 検索は n-gram 索引で絞り込むため、他の絞り込み・並び順とは併用できない
+            raise ValueError("search cannot be combined with filter or sort")
+
+        async def load() -> List[GQLCompany]:
+            # n-gram 索引による検索（全トークン一致、関連度順）
+            rows = await search_company_rows(search, offset=offset, limit=limit, projection=projection)
+            with phase("hydrate"):
+                return [_to_gql_company_from_raw(r) for r in rows]
+
+        key = flight_key("gql-search", search, offset, limit, projection)
+    else:
+        list_query = _list_query(filter, sort or CompanySort.CREATED_AT_ASC)
+
+        async def load() -> List[GQLCompany]:
+            cursor = (
+                CompanyDoc.get_motor_collection()
+                .find(readable(list_query.filter), versioned(projection))
+                .sort(list_query.sort)
+                .skip(offset)
+                .limit(limit)
+            )
+            rows = await ensure_compatible(await cursor.to_list(length=limit), projected=is_projected(projection))
+            with phase("hydrate"):
+                return [_to_gql_company_from_raw(r) for r in rows]
+
+        key = flight_key("gql-list", list_query.filter, list_query.sort, offset, limit, projection)
+    # 同時に届いた同じ引数の一覧は1回の取得・変換を共有する（結果のリストはコピーして返す）
+    return list(await company_reads.do(key, load))
+
+
+async def companies_connection(
+    first: int = 20,
+    after: Optional[str] = None,
+    filter: Optional[CompanyFilter] = None,
+    projection: Optional[Dict[str, int]] = None,
+    sort: CompanySort = CompanySort.CREATED_AT_ASC,
+) -> CompanyConnection:
+    """(並び順のキー, _id) のキーセットで1ページ分を取得します（深いページでも skip しない）。"""
+    list_query = _list_query(filter, sort)
+    # 不正なカーソル・別の並び順のカーソルは ValueError("Invalid cursor")
+    page_query = list_query.after(after)
+    if projection is not None:
+        # カーソル生成に並び順のキーが必要
+        projection = {**projection, list_query.field: 1}
+
+    # 非互換の行を除外しても、次ページの有無と endCursor は除外前のページ末尾から決める
+    rows, page_end, has_next = await find_company_page(
+        page_query, first, sort=list_query.sort, projection=projection or DEFAULT_PROJECTION
+    )
+    with phase("hydrate"):
+        edges = [CompanyEdge(cursor=list_query.cursor_for(r), node=_to_gql_company_from_raw(r)) for r in rows]
+    return CompanyConnection(
+        edges=edges,
+        pageInfo=PageInfo(
+            hasNextPage=has_next,
+            hasPreviousPage=bool(after),
+            startCursor=edges[0].cursor if edges else None,
+            endCursor=list_query.cursor_for(page_end) if page_end is not None else None,
+        ),
+        count=lambda: count_companies(list_query.filter),
+    )
+
+
+async def autocomplete(q: str, limit: int = 10) -> List[CompanySuggestion]:
+    suggestions = await autocomplete_companies(q, limit=limit)
+    return [CompanySuggestion(**s.model_dump()) for s in suggestions]
+
+
+async def load_companies_by_ids(keys: List[CompanyKey]) -> List[Optional[GQLCompany]]:
+    """DataLoader のバッチ関数: 全キーを1回の $in クエリにまとめます。
+
+    同時に届いた同じキーの組（別リクエストの同じクエリ）は1回の取得を共有します。
+    """
+    return list(await company_reads.do(flight_key("gql-get", keys), lambda: _load_companies(keys)))
+
+
+async def _load_companies(keys: List[CompanyKey]) -> List[Optional[GQLCompany]]:
+    """キャッシュが有効な場合は read-through キャッシュ（ID 単位の全フィールド）から返し、
+    ない ID だけを取得します。無効な場合は projection の和集合（いずれかが既定なら
+    DEFAULT_PROJECTION）で直接取得します。
+    """
+    if company_cache.enabled:
+        found = await company_cache.get_many([company_id for company_id, _ in keys])
+        with phase("hydrate"):
+            return [_to_gql_company_from_raw(found[cid]) if cid in found else None for cid, _ in keys]
+
+    oids = []
+    for company_id, _ in keys:
+        try:
+            oids.append(PydanticObjectId(company_id))
+        except Exception:
+            # 不正な ID は None を返す
+            continue
+    if not oids:
+        return [None] * len(keys)
+
+    path_sets = [paths for _, paths in keys]
+    if all(path_sets):
+        projection = {p: 1 for p in sorted(set().union(*path_sets))}
+    else:
+        projection = DEFAULT_PROJECTION
+    query = {"_id": {"$in": list(dict.fromkeys(oids))}}
+    cursor = CompanyDoc.get_motor_collection().find(readable(query), versioned(projection))
+    rows = await ensure_compatible([raw async for raw in cursor], projected=is_projected(projection))
+    found = {str(raw["_id"]): raw for raw in rows}
+    with phase("hydrate"):
+        return [_to_gql_company_from_raw(found[cid]) if cid in found else None for cid, _ in keys]
 
 
 async def create_company(input: CompanyCreateInput) -> GQLCompany:
-    # Validate input using Pydantic schema to align with REST rules
+    # Validate input once using the Pydantic schema to align with REST rules
     try:
-        _ = CompanyCreateSchema(
-            companyName=input.companyName,
-            companyNameKana=input.companyNameKana,
-            companyCode=input.companyCode,
-            contactName=input.contactName,
-            contactNameKana=input.contactNameKana,
-            phoneNumber=input.phoneNumber,
-            postalCode=input.postalCode,
-            location=LocationSchema(
-                prefecture=input.location.prefecture,
-                city=input.location.city,
-                streetAddress=input.location.streetAddress,
-                addressLine=input.location.addressLine,
-            ),
-            months=input.months,
-            ownerLoginEmail=input.ownerLoginEmail,
-            ownerLoginPassword=input.ownerLoginPassword,
-            appIntegrationEnabled=input.appIntegrationEnabled,
-            safetyConfirmationEnabled=input.safetyConfirmationEnabled,
-            occupationalDoctorIntegrationEnabled=input.occupationalDoctorIntegrationEnabled,
-            employeeChatEnabled=input.employeeChatEnabled,
-        )
+        company = validate_company(strawberry.asdict(input))
     except ValidationError as e:
         # Surface a concise, user-friendly message to GraphQL clients
-        errs = "; ".join(
-            [
-                f"{'.'.join([str(p) for p in err.get('loc', [])])}: {err.get('msg', 'invalid')}"
-                for err in e.errors()
-            ]
-        )
-        raise ValueError(errs) from e
-
-    # uniqueness checks (use count to avoid parsing old docs missing fields)
-    if await CompanyDoc.find({"companyCode": input.companyCode}).count() > 0:
-        raise ValueError("Company code already exists")
-
-    # hashed = bcrypt.hash(input.ownerLoginPassword)
-    doc = CompanyDoc(
-        companyName=input.companyName,
-        companyNameKana=input.companyNameKana,
-        companyCode=input.companyCode,
-        contactName=input.contactName,
-        contactNameKana=input.contactNameKana,
-        phoneNumber=input.phoneNumber,
-        postalCode=input.postalCode,
-        location={
-            "prefecture": input.location.prefecture,
-            "city": input.location.city,
-            "streetAddress": input.location.streetAddress,
-            "addressLine": input.location.addressLine,
-        },
-        months=input.months,
-        ownerLoginEmail=input.ownerLoginEmail,
-        ownerLoginPassword=input.ownerLoginPassword,
-        appIntegrationEnabled=input.appIntegrationEnabled,
-        safetyConfirmationEnabled=input.safetyConfirmationEnabled,
-        occupationalDoctorIntegrationEnabled=input.occupationalDoctorIntegrationEnabled,
-        employeeChatEnabled=input.employeeChatEnabled,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
-    )
+        raise ValueError("; ".join(format_field_errors(field_errors(e)))) from e
+
+    hashed = await password_service.hash(company.ownerLoginPassword)
+    doc = build_company_document(company, ownerLoginPassword=hashed)
     try:
-        await doc.insert()
+        # uniqueness is enforced by the unique companyCode index (no pre-check round trip)
+        await insert_company(doc)
     except DuplicateKeyError as e:
-        # In case of race conditions, map DB unique violations to a friendly message
+        # Map DB unique violations to a friendly message
         raise ValueError("Company code already exists") from e
+    await company_cache.invalidate(str(doc.id))
     return _to_gql_company(doc)
+
+
+async def import_companies(data: str, format: str = "ndjson") -> CompanyImportReport:
+    if format not in ("ndjson", "csv"):
+        raise ValueError("format must be 'ndjson' or 'csv'")
+    lines = data.splitlines(keepends=True)
+    rows = parse_csv(lines) if format == "csv" else parse_ndjson(lines)
+    report = await import_company_rows(rows)
+    return CompanyImportReport(
+        total=report.total,
+        created=report.created,
+        duplicates=report.duplicates,
+        invalid=report.invalid,
+        failed=report.failed,
+        rows=[ImportRowResult(**r.model_dump()) for r in report.rows],
+        errors=report.errors,
+    )
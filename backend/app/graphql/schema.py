@@ -1,22 +1,37 @@
 import strawberry
 from typing import Optional, List
 from strawberry.types import Info
-from fastapi import Request
-from app.graphql.types.company import Company as GQLCompany, CompanyCreateInput
-from app.graphql.resolvers.company import list_companies, get_company, create_company
+from fastapi import HTTPException
+from app.graphql.types.company import (
+    Company as GQLCompany,
+    CompanyConnection,
+    CompanyCreateInput,
+    CompanyFilter,
+    CompanyImportReport,
+    CompanySort,
+    CompanySuggestion,
+)
+from app.graphql.resolvers.company import (
+    autocomplete,
+    companies_connection,
+    company_key,
+    create_company,
+    import_companies,
+    list_companies,
+)
+from app.config import METRICS_ENABLED, PROFILING_ENABLED
+from app.graphql.extensions import MetricsExtension, ProfilingExtension
+from app.graphql.projection import build_field_map, child_selections, projection_from_selections
 
 
-async def get_user_from_context(info: Info):
-    request: Request = info.context["request"]
-    auth_header = request.headers.get("Authorization")
-    
-    if not auth_header or not auth_header.startswith("Bearer "):
-        from fastapi import HTTPException
+def get_user_from_context(info: Info):
+    # トークン検証はコンテキスト生成時（app/graphql/context.py）に1回だけ実施済み
+    if info.context.get("auth_error") is not None:
+        raise info.context["auth_error"]
+    user = info.context.get("user")
+    if user is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    token = auth_header.replace("Bearer ", "")
-    from app.services.keycloak_service import keycloak_service
-    return await keycloak_service.verify_token(token)
+    return user
 
 
 @strawberry.type
@@ -31,15 +46,44 @@ class Query:
         info: Info,
         limit: int = 20,
         offset: int = 0,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        filter: Optional[CompanyFilter] = None,
+        sort: Optional[CompanySort] = None,
     ) -> List[GQLCompany]:
-        await get_user_from_context(info)
-        return await list_companies(limit=limit, offset=offset, search=search)
+        """filter / sort は索引のある組み合わせのみ（search とは併用不可）"""
+        get_user_from_context(info)
+        projection = projection_from_selections(info.selected_fields[0].selections, COMPANY_FIELD_MAP)
+        return await list_companies(
+            limit=limit, offset=offset, search=search, projection=projection, filter=filter, sort=sort,
+        )
+
+    @strawberry.field
+    async def companiesConnection(
+        self,
+        info: Info,
+        first: int = 20,
+        after: Optional[str] = None,
+        filter: Optional[CompanyFilter] = None,
+        sort: CompanySort = CompanySort.CREATED_AT_ASC,
+    ) -> CompanyConnection:
+        """Relay 形式の企業一覧（after に前ページの endCursor を指定、sort を変えたら先頭から）"""
+        get_user_from_context(info)
+        node_selections = child_selections(child_selections(info.selected_fields[0].selections, "edges"), "node")
+        projection = projection_from_selections(node_selections, COMPANY_FIELD_MAP)
+        return await companies_connection(
+            first=max(1, min(first, 100)), after=after, filter=filter, projection=projection, sort=sort,
+        )
 
     @strawberry.field
     async def company(self, info: Info, id: str) -> Optional[GQLCompany]:
-        await get_user_from_context(info)
-        return await get_company(id)
+        get_user_from_context(info)
+        projection = projection_from_selections(info.selected_fields[0].selections, COMPANY_FIELD_MAP)
+        return await info.context["company_loader"].load(company_key(id, projection))
+
+    @strawberry.field
+    async def companyAutocomplete(self, info: Info, q: str, limit: int = 10) -> List[CompanySuggestion]:
+        get_user_from_context(info)
+        return await autocomplete(q, limit=max(1, min(limit, 50)))
 
 
 @strawberry.type
@@ -50,8 +94,28 @@ class Mutation:
 
     @strawberry.mutation
     async def createCompany(self, info: Info, input: CompanyCreateInput) -> GQLCompany:
-        await get_user_from_context(info)
+        get_user_from_context(info)
         return await create_company(input)
 
+    @strawberry.mutation
+    async def importCompanies(self, info: Info, data: str, format: str = "ndjson") -> CompanyImportReport:
+        """NDJSON または CSV 文字列から企業を一括登録します。"""
+        get_user_from_context(info)
+        return await import_companies(data, format=format)
+
+
+# 無効な計測・プロファイリングの拡張は登録しない（実行時のフックを増やさない）
+_extensions = []
+if METRICS_ENABLED:
+    _extensions.append(MetricsExtension)
+if PROFILING_ENABLED:
+    _extensions.append(ProfilingExtension)
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    extensions=_extensions,
+)
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+# GraphQL フィールド名 → ドキュメントパスの対応表（スキーマ構築時に一度だけ計算）
+COMPANY_FIELD_MAP = build_field_map(schema, GQLCompany, paths={"id": "_id"})
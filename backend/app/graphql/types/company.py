@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import strawberry
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import Awaitable, Callable, List, Optional
+
 
 
 @strawberry.type
@@ -34,6 +36,83 @@ class Company:
     updated_at: datetime
 
 
+@strawberry.type
+class CompanySuggestion:
+    id: str
+    companyName: str
+    companyNameKana: str
+    companyCode: str
+
+
+@strawberry.type
+class ImportRowResult:
+    row: int
+    status: str
+    companyCode: Optional[str] = None
+    id: Optional[str] = None
+    errors: List[str] = strawberry.field(default_factory=list)
+
+
+@strawberry.type
+class CompanyImportReport:
+    total: int
+    created: int
+    duplicates: int
+    invalid: int
+    failed: int
+    rows: List[ImportRowResult]
+    errors: List[str]
+
+
+@strawberry.type
+class PageInfo:
+    hasNextPage: bool
+    hasPreviousPage: bool
+    startCursor: Optional[str] = None
+    endCursor: Optional[str] = None
+
+
+@strawberry.type
+class CompanyEdge:
+    cursor: str
+    node: Company
+
+
+@strawberry.type
+class CompanyConnection:
+    edges: List[CompanyEdge]
+    pageInfo: PageInfo
+    # totalCount を数える関数（リゾルバーが絞り込み条件で作成、カーソル条件は含まない）
+    count: strawberry.Private[Callable[[], Awaitable[int]]]
+
+    @strawberry.field
+    async def totalCount(self) -> int:
+        # 選択された場合のみ数える
+        return await self.count()
+
+
+@strawberry.input
+class CompanyFilter:
+    prefecture: Optional[str] = None
+    months: Optional[str] = None
+    appIntegrationEnabled: Optional[bool] = None
+    safetyConfirmationEnabled: Optional[bool] = None
+    occupationalDoctorIntegrationEnabled: Optional[bool] = None
+    employeeChatEnabled: Optional[bool] = None
+    # 作成日時の範囲（createdFrom を含み createdTo を含まない）
+    createdFrom: Optional[datetime] = None
+    createdTo: Optional[datetime] = None
+
+
+@strawberry.enum
+class CompanySort(Enum):
+    # 値は REST の sort パラメータと同じ
+    CREATED_AT_ASC = "created_at"
+    CREATED_AT_DESC = "-created_at"
+    COMPANY_NAME_KANA_ASC = "companyNameKana"
+    COMPANY_NAME_KANA_DESC = "-companyNameKana"
+
+
 @strawberry.input
 class LocationInput:
     prefecture: str
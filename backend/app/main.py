@@ -2,9 +2,20 @@ from fastapi import FastAPI
 import os
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import api_router
+from app.api.routes import metrics as metrics_routes
+from app.api.routes import profiles as profile_routes
+from app.config import METRICS_ENABLED, PROFILING_ENABLED
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
 from .database import init_db, close_db
-from strawberry.fastapi import GraphQLRouter
+from app.services.keycloak_service import keycloak_service
+from app.services.company_cache import company_cache
+from app.services.group_commit import company_writer
+from app.services.password_service import import_password_service, password_service
+from app.services.postal_index import postal_service
+from app.graphql.router import FastJSONGraphQLRouter
 from app.graphql.schema import schema
+from app.graphql.context import get_context
 
 app = FastAPI(
     title="Add-Rec-Tool API",
@@ -21,16 +32,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# リクエスト単位のプロファイリング（無効時はミドルウェア自体を追加しない）
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(profile_routes.router)
+
+# 計測（ルーティング後の scope からテンプレートを読むため、全体を包む）
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_routes.router)
+
 # APIルーター登録（企業のみ含む）
 app.include_router(api_router, prefix="/api/v1")
 
 # GraphQL Router
-graphql_app = GraphQLRouter(schema, graphiql=True)
+graphql_app = FastJSONGraphQLRouter(schema, graphiql=True, context_getter=get_context)
 app.include_router(graphql_app, prefix="/graphql")
 
 
 @app.on_event("startup")
 async def on_startup():
+    await keycloak_service.startup()
     # Allow skipping DB init for local dev or CI when MongoDB isn't available
     skip_db = os.getenv("SKIP_DB_INIT", "false").lower() in {"1", "true", "yes"}
     if skip_db:
@@ -48,7 +70,13 @@ async def on_startup():
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    await company_writer.close()
+    await company_cache.close()
     await close_db()
+    await keycloak_service.shutdown()
+    password_service.shutdown()
+    import_password_service.shutdown()
+    postal_service.close()
 
 
 if __name__ == "__main__":
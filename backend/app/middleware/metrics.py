@@ -0,0 +1,70 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from app.services.metrics import HTTP_REQUEST_SECONDS
+from app.utils.metrics import Histogram
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+def _with_prefix(path: str, path_format: str) -> str:
+    parts = [p for p in path.split("/") if p]
+    template = [p for p in path_format.split("/") if p]
+    prefix = len(parts) - len(template)
+    if prefix <= 0:
+        return path_format
+    trailing = "/" if path_format.endswith("/") else ""
+    return "/" + "/".join(parts[:prefix] + template) + trailing
+
+
+def route_template(scope: Scope) -> str:
+    """ルーティング済みの scope からパスのテンプレートを返します（未一致は "unmatched"）。
+
+    一致したルートの path_format（/api/v1/companies/{company_id}）を使うため、ID ごとに系列が増えることはありません。
+    path_format が include_router のプレフィックスを含まない場合（FastAPI のバージョンによる）は、
+    実際のパスの先頭からプレフィックス分のセグメントを補います。ルートを持たない場合のみ、
+    パスパラメータの値をパラメータ名に戻して復元します。
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+    path_format = getattr(scope.get("route"), "path_format", None)
+    if path_format is not None:
+        return _with_prefix(scope["path"], path_format)
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    if not names:
+        return scope["path"]
+    return "/".join("{" + names[segment] + "}" if segment in names else segment for segment in scope["path"].split("/"))
+
+
+class MetricsMiddleware:
+    """HTTP リクエストの所要時間をルートのテンプレートごとに記録する ASGI ミドルウェア
+
+    BaseHTTPMiddleware を使わず、応答の開始メッセージからステータスだけを読み取ります。
+    ラベルはパスそのものではなくテンプレート（/api/v1/companies/{company_id}）を使います。
+    """
+
+    def __init__(self, app: Callable, histogram: Histogram = HTTP_REQUEST_SECONDS):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.histogram.observe(time.perf_counter() - start, scope["method"], route_template(scope), str(status))
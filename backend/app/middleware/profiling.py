@@ -0,0 +1,106 @@
+import asyncio
+import hmac
+import secrets
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import PROFILING_ALL_REQUESTS, PROFILING_SAMPLE_INTERVAL_MS, PROFILING_TOKEN
+from app.middleware.metrics import route_template
+from app.services.profiling import ProfileStore, profile_store
+from app.utils.profiling import StackSampler, collapsed, profiled
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+# 保存済みプロファイルの取得自体は対象にしない
+PROFILES_PATH = "/debug/profiles/"
+
+
+class ProfilingMiddleware:
+    """指定されたリクエストだけをプロファイルする ASGI ミドルウェア（PROFILING_ENABLED のときのみ追加）
+
+    対象のリクエストでは
+    - イベントループのスレッドのスタックをサンプリングし、collapsed stacks として保存
+    - フェーズ別の所要時間（auth / db / serialization など）を Server-Timing ヘッダーで返し、保存
+    します。保存した結果は X-Profile-Id の ID で GET /debug/profiles/{id} から取得できます。
+    サンプラーは同時に1つだけ動かし、実行中に届いた対象リクエストはフェーズ別の時間のみ記録します。
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        token: str = PROFILING_TOKEN,
+        all_requests: bool = PROFILING_ALL_REQUESTS,
+        interval: float = PROFILING_SAMPLE_INTERVAL_MS / 1000,
+        store: ProfileStore = profile_store,
+    ):
+        self.app = app
+        self.token = token.encode()
+        self.all_requests = all_requests
+        self.interval = interval
+        self.store = store
+        self._sampling = threading.Lock()
+
+    def _requested(self, scope: Scope) -> bool:
+        if scope["path"].startswith(PROFILES_PATH):
+            return False
+        if self.all_requests:
+            return True
+        if not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = secrets.token_hex(8)
+        status = 500
+        sampler: Optional[StackSampler] = None
+        if self._sampling.acquire(blocking=False):
+            sampler = StackSampler(threading.get_ident(), self.interval).start()
+
+        with profiled() as profile:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    # ヘッダー送信までの内訳（ストリーミング応答の本文送信は含まない）
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", profile.server_timing().encode()))
+                    headers.append((b"x-profile-id", profile_id.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                total = profile.elapsed()
+                stacks = None
+                if sampler is not None:
+                    stacks = sampler.stop()
+                    self._sampling.release()
+                summary = {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_template(scope),
+                    "status": status,
+                    "startedAt": time.time() - total,
+                    "totalMs": round(total * 1000, 3),
+                    "phasesMs": {name: round(seconds * 1000, 3) for name, seconds in profile.phases.items()},
+                    "samples": sum(stacks.values()) if stacks is not None else None,
+                }
+                try:
+                    await asyncio.to_thread(self.store.save, profile_id, collapsed(stacks or {}), summary)
+                except OSError as e:
+                    print(f"[Profiling] failed to save {profile_id}: {e}")
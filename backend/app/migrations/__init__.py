@@ -0,0 +1 @@
+# Migrations Package
\ No newline at end of file
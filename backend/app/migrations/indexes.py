@@ -0,0 +1,88 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Type
+
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+
+from app.models.company_document import Company
+
+# 適用済みの索引定義（の指紋）を記録するコレクション
+MIGRATIONS_COLLECTION = "schema_migrations"
+
+# このモジュールが管理する索引の名前の接頭辞（それ以外の索引には触れない）
+MANAGED_PREFIX = "idx_"
+
+# 比較対象にする索引オプション
+_OPTION_KEYS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _spec(index: Dict[str, Any]) -> Dict[str, Any]:
+    """IndexModel.document / list_indexes の結果を比較用の形にします。"""
+    spec = {"key": [[field, direction] for field, direction in dict(index["key"]).items()]}
+    for option in _OPTION_KEYS:
+        if index.get(option):
+            spec[option] = index[option]
+    return spec
+
+
+def declared_indexes(model: Type[Document]) -> Dict[str, Dict[str, Any]]:
+    return {m.document["name"]: _spec(m.document) for m in model.Settings.indexes}
+
+
+def fingerprint(model: Type[Document]) -> str:
+    body = json.dumps(declared_indexes(model), sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()[:16]
+
+
+async def sync_indexes(db: AsyncIOMotorDatabase, model: Type[Document]) -> Dict[str, List[str]]:
+    """宣言された索引とコレクションの差分を適用します。
+
+    - 宣言にない idx_* 索引（例: 旧 idx_owner_email）は削除
+    - 定義が変わった索引は削除して作り直し、未作成の索引は作成
+    """
+    collection = db[model.Settings.name]
+    declared = declared_indexes(model)
+    existing = {i["name"]: _spec(i) async for i in collection.list_indexes()}
+
+    dropped, created = [], []
+    for name, spec in existing.items():
+        if not name.startswith(MANAGED_PREFIX):
+            continue
+        if name not in declared or declared[name] != spec:
+            await collection.drop_index(name)
+            dropped.append(name)
+
+    missing = [
+        m for m in model.Settings.indexes
+        if m.document["name"] not in existing or m.document["name"] in dropped
+    ]
+    if missing:
+        await collection.create_indexes(missing)
+        created = [m.document["name"] for m in missing]
+    return {"dropped": dropped, "created": created}
+
+
+async def apply_index_migrations(db: AsyncIOMotorDatabase, model: Type[Document] = Company) -> bool:
+    """宣言された索引定義の指紋が記録と異なる場合だけ差分を適用し、適用結果を記録します。
+
+    Settings.indexes を変更すれば指紋が変わるため、手動で管理する版数はありません。
+    記録済みの場合（ウォームスタート）は find_one 1回で終わります。適用した場合は True。
+    """
+    migrations = db[MIGRATIONS_COLLECTION]
+    key = f"{model.Settings.name}.indexes"
+    current = {"fingerprint": fingerprint(model)}
+    applied = await migrations.find_one({"_id": key})
+    if applied and all(applied.get(k) == v for k, v in current.items()):
+        return False
+
+    changes = await sync_indexes(db, model)
+    await migrations.update_one(
+        {"_id": key},
+        {"$set": {**current, "applied_at": datetime.utcnow(), **changes}},
+        upsert=True,
+    )
+    print(f"[DB] Applied index migration {key} ({current['fingerprint']}): {changes}")
+    return True
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Any, Dict, List, Type
+
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from app.migrations.indexes import MIGRATIONS_COLLECTION
+from app.models.company_document import Company, CURRENT_SCHEMA_VERSION, INCOMPATIBLE_SCHEMA_VERSION
+from app.services.company_reader import COMPATIBILITY_CHECK, INCOMPATIBLE_MARKER, is_compatible
+from app.services.company_serializer import READ_PROJECTION
+
+# 未チェックのドキュメント: 現行バージョンでなく、現行の判定基準での非互換の記録もない
+UNCHECKED_QUERY = {"schemaVersion": {"$ne": CURRENT_SCHEMA_VERSION}, "$nor": [INCOMPATIBLE_MARKER]}
+
+
+async def _mark(collection: AsyncIOMotorCollection, batch: List[Dict[str, Any]], counts: Dict[str, int]) -> None:
+    compatible, incompatible = [], []
+    for raw in batch:
+        (compatible if is_compatible(raw) else incompatible).append(raw["_id"])
+    if compatible:
+        await collection.update_many(
+            {"_id": {"$in": compatible}},
+            {"$set": {"schemaVersion": CURRENT_SCHEMA_VERSION}, "$unset": {"schemaCheck": ""}},
+        )
+    if incompatible:
+        await collection.update_many(
+            {"_id": {"$in": incompatible}},
+            {"$set": {"schemaVersion": INCOMPATIBLE_SCHEMA_VERSION, "schemaCheck": COMPATIBILITY_CHECK}},
+        )
+    counts["compatible"] += len(compatible)
+    counts["incompatible"] += len(incompatible)
+
+
+async def apply_schema_checks(
+    db: AsyncIOMotorDatabase,
+    model: Type[Document] = Company,
+    batch_size: int = 500,
+) -> bool:
+    """未チェックの従来ドキュメントを検証し、結果を schemaVersion に記録します。
+
+    互換なら現行バージョン、非互換なら INCOMPATIBLE_SCHEMA_VERSION と判定基準の指紋（schemaCheck）を書き込みます。
+    検証ルールを変えると指紋が変わるため、古い記録の行は次の起動で再検証されます（データを直した行も同様）。
+    判定基準ごとに1回だけ実行し、記録済みの場合（ウォームスタート）は find_one 1回で終わります。実行した場合は True。
+    """
+    migrations = db[MIGRATIONS_COLLECTION]
+    key = f"{model.Settings.name}.schema"
+    current = {"schemaVersion": CURRENT_SCHEMA_VERSION, "check": COMPATIBILITY_CHECK}
+    applied = await migrations.find_one({"_id": key})
+    if applied and all(applied.get(k) == v for k, v in current.items()):
+        return False
+
+    collection = db[model.Settings.name]
+    counts = {"compatible": 0, "incompatible": 0}
+    batch: List[Dict[str, Any]] = []
+    async for raw in collection.find(UNCHECKED_QUERY, READ_PROJECTION, batch_size=batch_size):
+        batch.append(raw)
+        if len(batch) >= batch_size:
+            await _mark(collection, batch, counts)
+            batch = []
+    if batch:
+        await _mark(collection, batch, counts)
+
+    await migrations.update_one(
+        {"_id": key},
+        {"$set": {**current, "applied_at": datetime.utcnow(), **counts}},
+        upsert=True,
+    )
+    print(f"[DB] Checked schema compatibility of {key}: {counts}")
+    return True
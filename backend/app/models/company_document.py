@@ -1,10 +1,32 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Mapping, Optional
 
-from beanie import Document
+from beanie import Document, Insert, Replace, Save, before_event
 from pydantic import BaseModel, Field, EmailStr
 from pymongo import IndexModel
 
+from app.utils.kana import normalize_kana
+from app.utils.ngram import index_tokens
+
+# 応答スキーマとの互換性を示すバージョン（書き込み時に現行値を保存）
+CURRENT_SCHEMA_VERSION = 1
+# 現行の応答スキーマで返せないと判定済みのドキュメント（判定基準の指紋を schemaCheck に添える）
+INCOMPATIBLE_SCHEMA_VERSION = -1
+
+# 全文検索トークンの生成元フィールド
+SEARCH_TOKEN_FIELDS = ("companyName", "companyNameKana", "companyCode")
+# 前方一致（オートコンプリート）キーの生成元フィールド
+SEARCH_KEY_FIELDS = ("companyNameKana", "companyName", "contactNameKana")
+
+
+def search_fields(values: Mapping[str, Any]) -> Dict[str, List[str]]:
+    """書き込み時に保存する検索用フィールドを生成します。"""
+    keys = (normalize_kana(values.get(f)) for f in SEARCH_KEY_FIELDS)
+    return {
+        "searchTokens": index_tokens(*(values.get(f) for f in SEARCH_TOKEN_FIELDS)),
+        "searchKeys": list(dict.fromkeys(k for k in keys if k)),
+    }
+
 
 class LocationModel(BaseModel):
     prefecture: str = Field(..., description="都道府県")
@@ -42,8 +64,64 @@ class Company(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    # 互換性チェック済みのスキーマバージョン（従来ドキュメントには存在しない）
+    schemaVersion: int = Field(CURRENT_SCHEMA_VERSION, description="スキーマバージョン")
+
+    # Search (書き込み時に生成)
+    searchTokens: List[str] = Field(default_factory=list, description="検索用 n-gram トークン")
+    searchKeys: List[str] = Field(default_factory=list, description="前方一致用の正規化カナキー")
+
+    @before_event(Insert, Replace, Save)
+    def refresh_search_fields(self) -> None:
+        for name, value in search_fields(self.__dict__).items():
+            setattr(self, name, value)
+
     class Settings:
         name = "companies"
+        # 索引は起動時に app/migrations/indexes.py が差分適用する（init_beanie では作成しない）。
+        # 定義の指紋で変更を検出するため、ここを変更するだけで次の起動時に反映される。
         indexes = [
             IndexModel([("companyCode", 1)], name="idx_company_code", unique=True),
+            # 一覧のキーセットページネーション・created_at 範囲用 (created_at, _id)
+            IndexModel([("created_at", 1), ("_id", 1)], name="idx_created_at_id"),
+            # 都道府県での絞り込み + 作成日時順（+ created_at 範囲）
+            IndexModel(
+                [("location.prefecture", 1), ("created_at", 1), ("_id", 1)],
+                name="idx_prefecture_created_at_id",
+            ),
+            # 年度設定での絞り込み + 作成日時順
+            IndexModel([("months", 1), ("created_at", 1), ("_id", 1)], name="idx_months_created_at_id"),
+            # 機能フラグでの絞り込み + 作成日時順（フラグごと）
+            IndexModel(
+                [("appIntegrationEnabled", 1), ("created_at", 1), ("_id", 1)],
+                name="idx_app_integration_created_at_id",
+            ),
+            IndexModel(
+                [("safetyConfirmationEnabled", 1), ("created_at", 1), ("_id", 1)],
+                name="idx_safety_confirmation_created_at_id",
+            ),
+            IndexModel(
+                [("occupationalDoctorIntegrationEnabled", 1), ("created_at", 1), ("_id", 1)],
+                name="idx_occupational_doctor_created_at_id",
+            ),
+            IndexModel(
+                [("employeeChatEnabled", 1), ("created_at", 1), ("_id", 1)],
+                name="idx_employee_chat_created_at_id",
+            ),
+            # 企業名（カナ）順の一覧（全件 / 都道府県で絞り込み）
+            IndexModel([("companyNameKana", 1), ("_id", 1)], name="idx_company_name_kana_id"),
+            IndexModel(
+                [("location.prefecture", 1), ("companyNameKana", 1), ("_id", 1)],
+                name="idx_prefecture_company_name_kana_id",
+            ),
+            # companies(search:) 用のマルチキー索引
+            IndexModel([("searchTokens", 1)], name="idx_search_tokens"),
+            # オートコンプリート用の前方一致範囲スキャン
+            IndexModel([("searchKeys", 1)], name="idx_search_keys"),
+            # 非互換と判定済みのドキュメントだけを載せる部分索引（条件なしの件数から差し引く）
+            IndexModel(
+                [("schemaVersion", 1)],
+                name="idx_incompatible_schema_version",
+                partialFilterExpression={"schemaVersion": INCOMPATIBLE_SCHEMA_VERSION},
+            ),
         ]
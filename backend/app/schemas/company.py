@@ -1,8 +1,23 @@
 from pydantic import BaseModel, Field, EmailStr, validator, root_validator
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 import regex as re
 
+from app.config import POSTAL_ADDRESS_CHECK_ENABLED
+from app.services.postal_index import postal_service
+
+# 事前コンパイル済みの検証パターン（バリデータ呼び出しごとのパターン解決を避ける）
+COMPANY_NAME_RE = re.compile(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}ー]+$')
+COMPANY_NAME_KANA_RE = re.compile(r'^[\p{Script=Katakana}ー]+$')
+COMPANY_CODE_RE = re.compile(r'^[A-Z0-9-]+$')
+CONTACT_NAME_RE = re.compile(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}ー・ 　]+$')
+CONTACT_NAME_KANA_RE = re.compile(r'^[\p{Script=Katakana}ー・ 　]+$')
+DIGITS_RE = re.compile(r'^[0-9]+$')
+FISCAL_MONTHS_RE = re.compile(r'^[0-9]{2}-[0-9]{2}$')
+PASSWORD_RE = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*[0-9])[!-~]{6,12}$')
+STREET_ADDRESS_RE = re.compile(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}0-9\-ー―－ 　]+$')
+ADDRESS_LINE_RE = re.compile(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}A-Z0-9\-ー―－ 　]+$')
+
 
 class Location(BaseModel):
     prefecture: str = Field(..., description="都道府県")
@@ -31,34 +46,34 @@ class CompanyBase(BaseModel):
     @validator('companyName')
     def validate_company_name(cls, v: str):
         # 会社名: ひらがな・カタカナ・漢字のみ（スペースは不可）
-        if not re.match(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}ー]+$', v):
+        if not COMPANY_NAME_RE.match(v):
             raise ValueError('企業名はカタカナ・漢字・ひらがなのみ使用可能です')
         return v
 
     @validator('companyNameKana')
     def validate_company_name_kana(cls, v: str):
         # 会社名（カナ）: 全角カタカナのみ
-        if not re.match(r'^[\p{Script=Katakana}ー]+$', v):
+        if not COMPANY_NAME_KANA_RE.match(v):
             raise ValueError('企業名（カナ）はカタカナのみ使用可能です')
         return v
 
     @validator('companyCode')
     def validate_company_code(cls, v):
-        if not re.match(r'^[A-Z0-9-]+$', v):
+        if not COMPANY_CODE_RE.match(v):
             raise ValueError('半角英大文字・数字・ハイフンのみ使用可能です')
         return v
 
     @validator('contactName')
     def validate_contact_name(cls, v: str):
         # 氏名: ひらがな・カタカナ・漢字・中黒・スペース(半角/全角)を許可
-        if not re.match(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}ー・ 　]+$', v):
+        if not CONTACT_NAME_RE.match(v):
             raise ValueError('担当者名はカタカナ・漢字・ひらがな・スペースのみ使用可能です')
         return v
 
     @validator('contactNameKana')
     def validate_katakana(cls, v):
         # セイ/メイ連結のためスペース(半角/全角)・中黒を許可
-        if not re.match(r'^[\p{Script=Katakana}ー・ 　]+$', v):
+        if not CONTACT_NAME_KANA_RE.match(v):
             raise ValueError('担当者名（カナ）はカタカナのみ使用可能です')
         return v
 
@@ -67,19 +82,19 @@ class CompanyBase(BaseModel):
         if v is None:
             return v
         v = v.strip()
-        if v and not re.match(r'^[0-9]+$', v):
+        if v and not DIGITS_RE.match(v):
             raise ValueError('数字のみ使用可能です')
         return v
 
     @validator('postalCode')
     def validate_postal_code(cls, v):
-        if not re.match(r'^[0-9]+$', v):
+        if not DIGITS_RE.match(v):
             raise ValueError('数字のみ使用可能です')
         return v
 
     @validator('months')
     def validate_fiscal_year(cls, v):
-        if not re.match(r'^[0-9]{2}-[0-9]{2}$', v):
+        if not FISCAL_MONTHS_RE.match(v):
             raise ValueError('MM-MM形式で入力してください (例: 02-03)')
         start_month, end_month = map(int, v.split('-'))
         # 月は 01-12 の範囲、かつ 終了月 > 開始月
@@ -91,8 +106,7 @@ class CompanyBase(BaseModel):
 
     @validator('ownerLoginPassword')
     def validate_password(cls, v):
-        pattern = r'^(?=.*[a-z])(?=.*[A-Z])(?=.*[0-9])[!-~]{6,12}$'
-        if not re.match(pattern, v):
+        if not PASSWORD_RE.match(v):
             raise ValueError('6-12文字で英大小文字・数字を各1種以上含む必要があります')
         return v
 
@@ -106,11 +120,11 @@ class CompanyBase(BaseModel):
     def validate_location(cls, v: 'Location'):
         # streetAddress は 現実的な住所表記を許容: 和文(かな/カナ/漢字)・数字・スペース・ハイフン（半角/全角）
         street = v.streetAddress
-        if not re.match(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}0-9\-ー―－ 　]+$', street):
+        if not STREET_ADDRESS_RE.match(street):
             raise ValueError('番地は日本語・数字・ハイフン（半角/全角）・スペースのみ使用可能です')
         # addressLine は 任意: カタカナ・漢字・ひらがな・英大文字・数字・ハイフン（半角/全角）、スペースを許容（例: "XXビル 10F"）
         if v.addressLine is not None:
-            if not re.match(r'^[\p{Script=Hiragana}\p{Script=Katakana}\p{Script=Han}A-Z0-9\-ー―－ 　]+$', v.addressLine):
+            if not ADDRESS_LINE_RE.match(v.addressLine):
                 raise ValueError('建物部屋番号はカタカナ・漢字・ひらがな・英大文字・数字・ハイフン（半角/全角）・スペースのみ使用可能です')
         return v
 
@@ -124,8 +138,28 @@ class CompanyBase(BaseModel):
         return values
 
 
+def _same_city(city: str, indexed: str) -> bool:
+    # 郡名・政令市の区の有無など表記の差を許容する（例: "奥多摩町" と "西多摩郡奥多摩町"）
+    city = re.sub(r'[ 　]', '', city)
+    return bool(city) and (city in indexed or indexed in city)
+
+
 class CompanyCreate(CompanyBase):
-    pass
+    @root_validator(skip_on_failure=True)
+    def validate_postal_address(cls, values):
+        # 郵便番号と住所の整合（POSTAL_ADDRESS_CHECK_ENABLED かつ索引がある場合のみ）
+        if not POSTAL_ADDRESS_CHECK_ENABLED or not postal_service.available:
+            return values
+        entries = postal_service.lookup(values['postalCode'])
+        if not entries:
+            raise ValueError('郵便番号に該当する住所が見つかりません')
+        location = values['location']
+        entries = [e for e in entries if e.prefecture == location.prefecture]
+        if not entries:
+            raise ValueError('郵便番号と都道府県が一致しません')
+        if not any(_same_city(location.city, e.city) for e in entries):
+            raise ValueError('郵便番号と市区町村が一致しません')
+        return values
 
 
 class CompanyResponse(CompanyBase):
@@ -133,4 +167,34 @@ class CompanyResponse(CompanyBase):
     ownerLoginPassword: Optional[str] = Field(None, exclude=True)
     id: str
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+class CompanyPage(BaseModel):
+    items: List[CompanyResponse]
+    next_cursor: Optional[str] = Field(None, description="次ページ取得用カーソル（最終ページでは null）")
+
+
+class CompanySuggestion(BaseModel):
+    id: str
+    companyName: str
+    companyNameKana: str
+    companyCode: str
+
+
+class ImportRowResult(BaseModel):
+    row: int = Field(..., description="行番号（1始まり、CSV ヘッダーを除く）")
+    status: Literal["created", "duplicate", "invalid", "failed"]
+    companyCode: Optional[str] = None
+    id: Optional[str] = None
+    errors: List[str] = Field(default_factory=list)
+
+
+class CompanyImportReport(BaseModel):
+    total: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    failed: int = 0
+    rows: List[ImportRowResult] = Field(default_factory=list)
+    # 行に属さないエラー（途中で読めなくなったファイルなど）
+    errors: List[str] = Field(default_factory=list)
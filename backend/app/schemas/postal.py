@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class PostalAddress(BaseModel):
+    prefecture: str = Field(..., description="都道府県")
+    city: str = Field(..., description="市区町村")
+    town: str = Field(..., description="町域（市区町村のみで決まる郵便番号は空文字）")
+
+
+class PostalLookupResponse(BaseModel):
+    postalCode: str = Field(..., description="郵便番号（7桁の数字）")
+    addresses: List[PostalAddress]
@@ -0,0 +1,164 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import bson
+
+from app.config import (
+    COMPANY_CACHE_BACKEND,
+    COMPANY_CACHE_MAX_ENTRIES,
+    COMPANY_CACHE_REDIS_URL,
+    COMPANY_CACHE_TTL_SECONDS,
+)
+from app.services.company_reader import get_company_row, get_company_rows
+from app.utils.etag import strong_etag
+
+
+class MemoryCacheBackend:
+    """プロセス内のキャッシュ（件数上限付き LRU + エントリごとの有効期限）"""
+
+    def __init__(self, max_entries: int = COMPANY_CACHE_MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """共有キャッシュ（redis.asyncio.Redis 互換のクライアント: get / mget / set(px=) / delete）"""
+
+    def __init__(self, client: Any, prefix: str = "add-rec-tool:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return list(await self.client.mget([self.prefix + key for key in keys]))
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*[self.prefix + key for key in keys])
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_cache_backend(kind: str = COMPANY_CACHE_BACKEND):
+    if kind == "redis":
+        # 任意依存: redis バックエンドを選んだ場合のみ必要
+        import redis.asyncio as redis
+
+        return RedisCacheBackend(redis.Redis.from_url(COMPANY_CACHE_REDIS_URL))
+    if kind != "memory":
+        raise ValueError(f"unknown COMPANY_CACHE_BACKEND: {kind}")
+    return MemoryCacheBackend()
+
+
+def company_etag(raw: Mapping[str, Any]) -> str:
+    """ID と updated_at から強い ETag を作ります（更新されない限り同じ値）。"""
+    updated_at = raw.get("updated_at")
+    return strong_etag(raw["_id"], updated_at.isoformat() if updated_at is not None else "")
+
+
+class CompanyCache:
+    """企業1件取得の read-through キャッシュ（ID をキーに、応答用の生ドキュメントを BSON で保持）
+
+    作成・更新時は invalidate() で該当 ID を破棄します。
+    キャッシュの読み書きに失敗した場合は MongoDB から直接返します。
+    """
+
+    def __init__(self, backend: Any, ttl: float = COMPANY_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def key(company_id: str) -> str:
+        return f"company:{company_id}"
+
+    async def _read(self, keys: List[str]) -> List[Optional[bytes]]:
+        try:
+            return await self.backend.get_many(keys)
+        except Exception as e:
+            print(f"[Cache] read failed: {e}")
+            return [None] * len(keys)
+
+    async def _write(self, rows: Mapping[str, Dict[str, Any]]) -> None:
+        try:
+            for company_id, raw in rows.items():
+                await self.backend.set(self.key(company_id), bson.encode(raw), self.ttl)
+        except Exception as e:
+            print(f"[Cache] write failed: {e}")
+
+    async def get(self, company_id: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return await get_company_row(company_id)
+        rows = await self.get_many([company_id])
+        return rows.get(company_id)
+
+    async def get_many(self, company_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """ID 文字列 → 生ドキュメント（未存在の ID は含まない）。キャッシュにない ID だけをまとめて取得します。"""
+        ids = list(dict.fromkeys(company_ids))
+        if not self.enabled:
+            return await get_company_rows(ids)
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for company_id, cached in zip(ids, await self._read([self.key(i) for i in ids])):
+            if cached is None:
+                missing.append(company_id)
+            else:
+                found[company_id] = bson.decode(cached)
+        if missing:
+            fetched = await get_company_rows(missing)
+            await self._write(fetched)
+            found.update(fetched)
+        return found
+
+    async def invalidate(self, *company_ids: str) -> None:
+        if not company_ids:
+            return
+        try:
+            await self.backend.delete(*[self.key(i) for i in company_ids])
+        except Exception as e:
+            print(f"[Cache] invalidate failed: {e}")
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+# シングルトンインスタンス
+company_cache = CompanyCache(create_cache_backend())
@@ -0,0 +1,73 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Mapping, Optional, Tuple
+
+from app.config import COMPANY_COUNT_CACHE_TTL_SECONDS
+from app.models.company_document import Company as CompanyDoc
+from app.services.company_reader import INCOMPATIBLE_MARKER, readable
+
+
+class CountCache:
+    """絞り込み条件ごとの件数を短時間だけ保持するキャッシュ（件数上限付き LRU）"""
+
+    def __init__(
+        self,
+        ttl: float = COMPANY_COUNT_CACHE_TTL_SECONDS,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+
+    @staticmethod
+    def key(query: Mapping[str, Any]) -> str:
+        # datetime / ObjectId を含む条件も同じ内容なら同じキーになる
+        return json.dumps(query, sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, count = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return count
+
+    def set(self, key: str, count: int) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (self.clock() + self.ttl, count)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+company_count_cache = CountCache()
+
+
+async def count_companies(query: Mapping[str, Any], cache: CountCache = company_count_cache) -> int:
+    """企業の件数を返します。
+
+    条件なしはコレクションのメタデータから推定件数（estimated_document_count）を取り、
+    現行の判定基準で非互換と記録済みの件数（部分索引で数える）を差し引いて返します。
+    条件ありは count_documents の結果を TTL の間キャッシュします。
+    """
+    collection = CompanyDoc.get_motor_collection()
+    if not query:
+        estimated = await collection.estimated_document_count()
+        incompatible = await collection.count_documents(INCOMPATIBLE_MARKER)
+        return max(0, estimated - incompatible)
+    key = cache.key(query)
+    count = cache.get(key)
+    if count is None:
+        count = await collection.count_documents(readable(query))
+        cache.set(key, count)
+    return count
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Mapping, Optional
+
+from app.models.company_document import Company as CompanyDoc
+from app.utils.pagination import KEYSET_SORT
+
+# 出力列（CSV ヘッダー = ドキュメントパス）。ヘッダーはそのまま一括登録の CSV として読み込めます。
+# ownerLoginPassword と検索用フィールドは出力しません。
+EXPORT_COLUMNS = [
+    "id",
+    "companyName",
+    "companyNameKana",
+    "companyCode",
+    "contactName",
+    "contactNameKana",
+    "phoneNumber",
+    "postalCode",
+    "location.prefecture",
+    "location.city",
+    "location.streetAddress",
+    "location.addressLine",
+    "months",
+    "ownerLoginEmail",
+    "appIntegrationEnabled",
+    "safetyConfirmationEnabled",
+    "occupationalDoctorIntegrationEnabled",
+    "employeeChatEnabled",
+    "created_at",
+    "updated_at",
+]
+
+EXPORT_PROJECTION = {"_id": 1, **{c: 1 for c in EXPORT_COLUMNS if c != "id"}}
+
+FEATURE_FLAGS = (
+    "appIntegrationEnabled",
+    "safetyConfirmationEnabled",
+    "occupationalDoctorIntegrationEnabled",
+    "employeeChatEnabled",
+)
+
+# この大きさまで溜めてから書き出す（1行ごとの送信を避ける）
+FLUSH_BYTES = 64 * 1024
+
+
+def build_export_filter(
+    prefecture: Optional[str] = None,
+    flags: Optional[Mapping[str, Optional[bool]]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    months: Optional[str] = None,
+) -> Dict[str, Any]:
+    """エクスポート条件を MongoDB のフィルタにします（None の条件は無視）。
+
+    created_at は created_from 以上・created_to 未満です。
+    """
+    query: Dict[str, Any] = {}
+    if prefecture:
+        query["location.prefecture"] = prefecture
+    if months:
+        query["months"] = months
+    for name, value in (flags or {}).items():
+        if name not in FEATURE_FLAGS:
+            raise ValueError(f"unknown feature flag: {name}")
+        if value is not None:
+            query[name] = value
+    created: Dict[str, datetime] = {}
+    if created_from is not None:
+        created["$gte"] = created_from
+    if created_to is not None:
+        created["$lt"] = created_to
+    if created:
+        query["created_at"] = created
+    return query
+
+
+def iter_export_rows(query: Mapping[str, Any], batch_size: int = 1000) -> AsyncIterable[Dict[str, Any]]:
+    """projection 付きの Motor カーソルを返します（取得は batch_size 件ずつ）。"""
+    return (
+        CompanyDoc.get_motor_collection()
+        .find(query, EXPORT_PROJECTION, batch_size=batch_size)
+        .sort(KEYSET_SORT)
+    )
+
+
+def _lookup(raw: Mapping[str, Any], column: str) -> Any:
+    if column == "id":
+        return raw.get("_id")
+    value: Any = raw
+    for key in column.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _record(raw: Mapping[str, Any]) -> Dict[str, Any]:
+    # EXPORT_COLUMNS の順序で、location.* だけを入れ子に戻す
+    record: Dict[str, Any] = {}
+    for column in EXPORT_COLUMNS:
+        value = _lookup(raw, column)
+        if column == "id":
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        if column.startswith("location."):
+            record.setdefault("location", {})[column.split(".", 1)[1]] = value
+        else:
+            record[column] = value
+    return record
+
+
+async def csv_stream(rows: AsyncIterable[Mapping[str, Any]]) -> AsyncIterator[bytes]:
+    """ヘッダー付き CSV (UTF-8) として逐次書き出します。"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerow(EXPORT_COLUMNS)
+    async for raw in rows:
+        writer.writerow([_text(_lookup(raw, c)) for c in EXPORT_COLUMNS])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def ndjson_export_stream(rows: AsyncIterable[Mapping[str, Any]]) -> AsyncIterator[bytes]:
+    """1行1企業の NDJSON として逐次書き出します（location は入れ子のまま）。"""
+    chunk: List[bytes] = []
+    size = 0
+    async for raw in rows:
+        line = json.dumps(_record(raw), ensure_ascii=False).encode() + b"\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b"".join(chunk)
@@ -0,0 +1,182 @@
+import asyncio
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import COMPANY_IMPORT_CHUNK_SIZE
+from app.models.company_document import Company as CompanyDoc
+from app.schemas.company import CompanyImportReport, ImportRowResult
+from app.services.company_cache import company_cache
+from app.services.company_export import FEATURE_FLAGS
+from app.services.company_validation import (
+    RowValidation,
+    build_company_document,
+    format_field_errors,
+    validate_many,
+)
+from app.services.password_service import import_password_service
+
+DUPLICATE_KEY_ERROR = 11000
+
+# (行番号, 行データ or 解析エラー)
+ParsedRow = Tuple[int, Union[Dict[str, Any], ValueError]]
+
+_BOOL_VALUES = {
+    "true": True, "1": True, "yes": True,
+    "false": False, "0": False, "no": False,
+}
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    """NDJSON を1行ずつ解析します（空行は無視、行番号は空行を含めた位置）。"""
+    for row_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_no, ValueError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            yield row_no, ValueError("each line must be a JSON object")
+            continue
+        yield row_no, data
+
+
+def _csv_value(column: str, value: Optional[str]) -> Any:
+    if value is None:
+        return None
+    value = value.strip()
+    if value == "":
+        return None
+    # 真偽値に変換するのは機能フラグの列だけ（companyCode の "1" や番地の "0" はそのまま残す）
+    if column in FEATURE_FLAGS:
+        return _BOOL_VALUES.get(value.lower(), value)
+    return value
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    """ヘッダー付き CSV を解析します。`location.prefecture` のようなドット区切り列は入れ子にします。"""
+    for row_no, record in enumerate(csv.DictReader(lines), start=1):
+        data: Dict[str, Any] = {}
+        for column, value in record.items():
+            if column is None:
+                continue
+            column = column.strip()
+            target = data
+            *parents, leaf = column.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = _csv_value(column, value)
+        yield row_no, data
+
+
+def _read_chunk(iterator: Iterator[ParsedRow], chunk_size: int) -> List[ParsedRow]:
+    return list(islice(iterator, chunk_size))
+
+
+def _validate_chunk(chunk: List[ParsedRow]) -> Tuple[List[ImportRowResult], List[RowValidation]]:
+    """解析エラー・検証エラーの行の結果と、検証を通った行に分けます。"""
+    invalid: List[ImportRowResult] = []
+    parsed = []
+    for row_no, data in chunk:
+        if isinstance(data, ValueError):
+            invalid.append(ImportRowResult(row=row_no, status="invalid", errors=[str(data)]))
+        else:
+            parsed.append((row_no, data))
+
+    codes = {row_no: data.get("companyCode") for row_no, data in parsed}
+    valid = []
+    for result in validate_many(parsed):
+        if result.ok:
+            valid.append(result)
+            continue
+        invalid.append(ImportRowResult(
+            row=result.row,
+            status="invalid",
+            companyCode=codes[result.row],
+            errors=format_field_errors(result.errors),
+        ))
+    return invalid, valid
+
+
+async def _import_chunk(chunk: List[ParsedRow], report: CompanyImportReport) -> None:
+    now = datetime.utcnow()
+    # 検証（正規表現・Pydantic）は CPU を使うため、イベントループの外で行う
+    invalid, valid = await run_in_threadpool(_validate_chunk, chunk)
+    report.rows.extend(invalid)
+
+    # チャンク内のパスワードハッシュはインポート用のワーカープールで並行に計算する
+    hashes = await asyncio.gather(*(import_password_service.hash(r.company.ownerLoginPassword) for r in valid))
+    docs: List[CompanyDoc] = []
+    pending: List[ImportRowResult] = []
+    for result, hashed in zip(valid, hashes):
+        # insert_many はイベントフックを通らないため、ID をここで確定させる（検索用フィールドは組み立て時に計算済み）
+        doc = build_company_document(result.company, now, id=PydanticObjectId(), ownerLoginPassword=hashed)
+        docs.append(doc)
+        pending.append(ImportRowResult(
+            row=result.row, status="created", companyCode=doc.companyCode, id=str(doc.id),
+        ))
+
+    if docs:
+        try:
+            await CompanyDoc.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # 失敗した行だけを書き換え、残りは作成済みのまま報告する
+            for err in e.details.get("writeErrors", []):
+                result = pending[err["index"]]
+                result.id = None
+                if err.get("code") == DUPLICATE_KEY_ERROR:
+                    result.status = "duplicate"
+                    result.errors = ["Company code already exists"]
+                else:
+                    result.status = "failed"
+                    result.errors = [err.get("errmsg", "write failed")]
+        await company_cache.invalidate(*[r.id for r in pending if r.id is not None])
+    report.rows.extend(pending)
+
+
+async def import_companies(
+    rows: Iterable[ParsedRow],
+    chunk_size: int = COMPANY_IMPORT_CHUNK_SIZE,
+) -> CompanyImportReport:
+    """行をチャンク単位で検証し、順序なし insert_many で書き込みます。
+
+    1行の失敗で処理を止めず、行ごとの結果を返します。ファイルの読み込み・解析もイベントループの外で行います。
+    最初のチャンクを読む前に UnicodeDecodeError になった場合（まだ何も書き込んでいない）はそのまま送出し、
+    途中のチャンクで読めなくなった場合は、それまでに書き込んだ行の結果にエラーを添えて返します。
+    """
+    report = CompanyImportReport()
+    iterator = iter(rows)
+    while True:
+        try:
+            chunk = await run_in_threadpool(_read_chunk, iterator, chunk_size)
+        except UnicodeDecodeError:
+            if not report.rows:
+                raise
+            last_row = max(r.row for r in report.rows)
+            report.errors.append(f"File must be UTF-8 encoded; import stopped after row {last_row}")
+            break
+        if not chunk:
+            break
+        await _import_chunk(chunk, report)
+
+    report.rows.sort(key=lambda r: r.row)
+    report.total = len(report.rows)
+    for r in report.rows:
+        if r.status == "created":
+            report.created += 1
+        elif r.status == "duplicate":
+            report.duplicates += 1
+        elif r.status == "invalid":
+            report.invalid += 1
+        else:
+            report.failed += 1
+    return report
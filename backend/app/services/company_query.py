@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Mapping, Optional, Tuple, get_args
+
+from app.services.company_export import FEATURE_FLAGS, build_export_filter
+from app.utils.pagination import encode_sort_cursor, keyset_sort, sort_keyset_filter
+
+# 一覧で指定できる並び順（先頭の "-" は降順）
+SortOption = Literal["created_at", "-created_at", "companyNameKana", "-companyNameKana"]
+SORT_OPTIONS: Tuple[str, ...] = get_args(SortOption)
+
+
+class UnsupportedQueryShape(ValueError):
+    """索引で処理できない絞り込み・並び順の組み合わせ"""
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """一覧クエリの形（等価条件のフィールド + 並び順）と、それを処理する複合索引"""
+    equality: Optional[str]
+    sort: str
+    index: str
+    # created_at の範囲条件を併用できるか（created_at 順の索引のみ）
+    created_range: bool = False
+
+
+QUERY_SHAPES: Tuple[QueryShape, ...] = (
+    QueryShape(None, "created_at", "idx_created_at_id", created_range=True),
+    QueryShape("location.prefecture", "created_at", "idx_prefecture_created_at_id", created_range=True),
+    QueryShape("months", "created_at", "idx_months_created_at_id", created_range=True),
+    QueryShape("appIntegrationEnabled", "created_at", "idx_app_integration_created_at_id", created_range=True),
+    QueryShape("safetyConfirmationEnabled", "created_at", "idx_safety_confirmation_created_at_id", created_range=True),
+    QueryShape(
+        "occupationalDoctorIntegrationEnabled", "created_at", "idx_occupational_doctor_created_at_id",
+        created_range=True,
+    ),
+    QueryShape("employeeChatEnabled", "created_at", "idx_employee_chat_created_at_id", created_range=True),
+    QueryShape(None, "companyNameKana", "idx_company_name_kana_id"),
+    QueryShape("location.prefecture", "companyNameKana", "idx_prefecture_company_name_kana_id"),
+)
+
+
+@dataclass(frozen=True)
+class ListQuery:
+    filter: Dict[str, Any]
+    field: str
+    direction: int
+    shape: QueryShape
+
+    @property
+    def sort(self) -> List[Tuple[str, int]]:
+        return keyset_sort(self.field, self.direction)
+
+    def after(self, cursor: Optional[str]) -> Dict[str, Any]:
+        """カーソル位置より後ろを選択する条件を加えます（不正なカーソルは ValueError）。"""
+        if not cursor:
+            return dict(self.filter)
+        return {**self.filter, **sort_keyset_filter(self.field, self.direction, cursor)}
+
+    def cursor_for(self, row: Mapping[str, Any]) -> str:
+        return encode_sort_cursor(self.field, row[self.field], row["_id"], self.direction)
+
+
+def _describe(shape: QueryShape) -> str:
+    filters = shape.equality or "no filter"
+    if shape.created_range:
+        filters += " (+created_at range)"
+    return f"{filters} sorted by {shape.sort}"
+
+
+def supported_shapes() -> List[str]:
+    return [_describe(s) for s in QUERY_SHAPES]
+
+
+def build_list_query(
+    prefecture: Optional[str] = None,
+    months: Optional[str] = None,
+    flags: Optional[Mapping[str, Optional[bool]]] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "created_at",
+) -> ListQuery:
+    """絞り込み・並び順を検証し、対応する複合索引がある形だけを受け付けます。
+
+    等価条件は1つまで、created_at の範囲は created_at 順のときだけ指定できます。
+    それ以外は UnsupportedQueryShape（全件走査になるため拒否）。
+    """
+    if sort not in SORT_OPTIONS:
+        raise UnsupportedQueryShape(f"unsupported sort: {sort}")
+    direction = -1 if sort.startswith("-") else 1
+    field = sort.lstrip("-")
+
+    query = build_export_filter(
+        prefecture=prefecture,
+        months=months,
+        flags=flags,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    equality = [name for name in ("location.prefecture", "months", *FEATURE_FLAGS) if name in query]
+    has_range = "created_at" in query
+    for shape in QUERY_SHAPES:
+        if (
+            shape.sort == field
+            and [shape.equality] == (equality or [None])
+            and (shape.created_range or not has_range)
+        ):
+            return ListQuery(filter=query, field=field, direction=direction, shape=shape)
+    raise UnsupportedQueryShape(
+        "unsupported filter/sort combination; supported: " + ", ".join(supported_shapes())
+    )
@@ -0,0 +1,164 @@
+import hashlib
+import inspect
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from beanie import PydanticObjectId
+from pydantic import ValidationError
+
+from app.models.company_document import (
+    Company as CompanyDoc,
+    CURRENT_SCHEMA_VERSION,
+    INCOMPATIBLE_SCHEMA_VERSION,
+)
+from app.schemas import company as company_schemas
+from app.schemas.company import CompanyResponse
+from app.services.company_serializer import READ_PROJECTION
+from app.utils.pagination import KEYSET_SORT
+from app.utils.singleflight import SingleFlight
+
+_DEFAULT_MONTHS = CompanyDoc.model_fields["months"].default
+_RESPONSE_FIELDS = [name for name in CompanyResponse.model_fields if name not in ("id", "ownerLoginPassword")]
+
+
+def _check_fingerprint() -> str:
+    """互換性の判定基準（応答スキーマの検証ルールと months の既定値）の指紋"""
+    try:
+        source = inspect.getsource(company_schemas)
+    except (OSError, TypeError):
+        # ソースのない配布形態ではスキーマ定義で代用する（独自の validator の変更は検出できない）
+        source = repr(CompanyResponse.model_json_schema())
+    return hashlib.sha256(f"{source}\n{_DEFAULT_MONTHS}".encode()).hexdigest()[:16]
+
+
+# 非互換の記録に添える判定基準の指紋。検証ルールを変えると変わり、古い記録の行は再検証される
+COMPATIBILITY_CHECK = _check_fingerprint()
+# 現行の判定基準で非互換と記録済みのドキュメント
+INCOMPATIBLE_MARKER = {"schemaVersion": INCOMPATIBLE_SCHEMA_VERSION, "schemaCheck": COMPATIBILITY_CHECK}
+
+
+def readable(query: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """現行の判定基準で非互換と記録済みのドキュメントを除外する条件を加えます。"""
+    return {**(query or {}), "$nor": [INCOMPATIBLE_MARKER]}
+
+
+def is_compatible(raw: Mapping[str, Any]) -> bool:
+    """現行の CompanyResponse として返せるかを検証します。"""
+    values = {name: raw.get(name) for name in _RESPONSE_FIELDS}
+    if values["months"] is None:
+        values["months"] = _DEFAULT_MONTHS
+    try:
+        CompanyResponse.model_validate({**values, "id": str(raw.get("_id"))})
+    except ValidationError:
+        return False
+    return True
+
+
+def is_projected(projection: Optional[Mapping[str, Any]]) -> bool:
+    """含めるフィールドを列挙した projection か（応答の一部のフィールドしか取得しない）"""
+    return bool(projection) and all(projection.values())
+
+
+def versioned(projection: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+    """含めるフィールドを列挙した projection に schemaVersion を加えます（互換性の確認に使う）。"""
+    if is_projected(projection):
+        return {**projection, "schemaVersion": 1}
+    return dict(projection) if projection else None
+
+
+async def ensure_compatible(rows: List[Dict[str, Any]], projected: bool = False) -> List[Dict[str, Any]]:
+    """未チェック（schemaVersion が現行でない）の行だけを検証し、非互換の行を除外して返します。
+
+    読み取りの経路では書き込みません。検証結果の記録は起動時の移行
+    （app/migrations/schema_versions.py）が判定基準ごとに1回だけ行うため、通常は未チェックの行は届きません。
+    projected=True（GraphQL など一部のフィールドだけを取得した行）の場合、未チェックの行は
+    全フィールドを取り直して検証します。
+    """
+    unchecked = [raw for raw in rows if raw.get("schemaVersion") != CURRENT_SCHEMA_VERSION]
+    if not unchecked:
+        return rows
+    if projected:
+        ids = [raw["_id"] for raw in unchecked]
+        query = {"_id": {"$in": ids}}
+        unchecked = await CompanyDoc.get_motor_collection().find(query, READ_PROJECTION).to_list(length=None)
+    incompatible = {raw["_id"] for raw in unchecked if not is_compatible(raw)}
+    if not incompatible:
+        return rows
+    return [raw for raw in rows if raw["_id"] not in incompatible]
+
+
+async def find_company_rows(
+    query: Mapping[str, Any],
+    limit: Optional[int] = None,
+    sort: Sequence[Tuple[str, int]] = KEYSET_SORT,
+) -> List[Dict[str, Any]]:
+    """応答用の生ドキュメントを取得します（既定は (created_at, _id) 順）。"""
+    cursor = CompanyDoc.get_motor_collection().find(readable(query), READ_PROJECTION).sort(list(sort))
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    return await ensure_compatible(await cursor.to_list(length=limit))
+
+
+async def find_company_page(
+    query: Mapping[str, Any],
+    limit: int,
+    sort: Sequence[Tuple[str, int]] = KEYSET_SORT,
+    projection: Optional[Mapping[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]], bool]:
+    """キーセットの1ページ分を (互換な行, ページ末尾の行, 次ページの有無) で返します。
+
+    1件多く取得して次ページの有無を判定します。末尾の行と次ページの有無は互換性で除外する前の
+    取得結果から決めるため、非互換の行を含むページは limit 件未満になりますが、一覧は途中で終わりません。
+    """
+    projected = is_projected(projection)
+    projection = versioned(projection) if projected else (projection or READ_PROJECTION)
+    cursor = CompanyDoc.get_motor_collection().find(readable(query), projection).sort(list(sort)).limit(limit + 1)
+    rows = await cursor.to_list(length=limit + 1)
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    page_end = rows[-1] if rows else None
+    return await ensure_compatible(rows, projected=projected), page_end, has_next
+
+
+async def get_company_row(company_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        oid = PydanticObjectId(company_id)
+    except Exception:
+        return None
+    raw = await CompanyDoc.get_motor_collection().find_one(readable({"_id": oid}), READ_PROJECTION)
+    if raw is None:
+        return None
+    rows = await ensure_compatible([raw])
+    return rows[0] if rows else None
+
+
+async def get_company_rows(company_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """複数の ID を1回の $in クエリで取得します（ID 文字列 → 生ドキュメント、不正な ID・未存在は含まない）。"""
+    oids = []
+    for company_id in company_ids:
+        try:
+            oids.append(PydanticObjectId(company_id))
+        except Exception:
+            continue
+    if not oids:
+        return {}
+    query = readable({"_id": {"$in": list(dict.fromkeys(oids))}})
+    rows = await CompanyDoc.get_motor_collection().find(query, READ_PROJECTION).to_list(length=None)
+    return {str(raw["_id"]): raw for raw in await ensure_compatible(rows)}
+
+
+async def iter_company_rows(batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+    """全件を Motor カーソルから batch_size 件ずつ取得し、バッチ単位で互換性を確認します。"""
+    cursor = CompanyDoc.get_motor_collection().find(readable(), READ_PROJECTION, batch_size=batch_size).sort(KEYSET_SORT)
+    batch: List[Dict[str, Any]] = []
+    async for raw in cursor:
+        batch.append(raw)
+        if len(batch) >= batch_size:
+            for row in await ensure_compatible(batch):
+                yield row
+            batch = []
+    for row in await ensure_compatible(batch):
+        yield row
+
+
+# 同時に届いた同じ読み取り（一覧・1件取得）を1回の実行にまとめる（シングルトンインスタンス）
+company_reads = SingleFlight()
@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.company_document import Company as CompanyDoc
+from app.schemas.company import CompanySuggestion
+from app.services.company_reader import ensure_compatible, is_projected, readable, versioned
+from app.utils.kana import normalize_kana, prefix_upper_bound
+from app.utils.ngram import normalize_text, query_tokens
+
+SUGGESTION_PROJECTION = {"companyName": 1, "companyNameKana": 1, "companyCode": 1}
+# 候補は企業名カナ順（同じカナは _id 順）で返す（前方一致の範囲内で並べ替える）
+AUTOCOMPLETE_SORT = [("companyNameKana", 1), ("_id", 1)]
+# 並び順のキーで idx_company_name_kana_id が選ばれると前方一致の範囲で絞れず全件を走査するため、範囲の索引を指定する
+# （範囲内の候補は limit 件の上位ソートで並べる）
+AUTOCOMPLETE_INDEX = "idx_search_keys"
+
+
+# 関連度の重み（フィールドごとの 完全一致 / 前方一致 / 部分一致）。企業名 > 企業名カナ > 企業コードの順
+SEARCH_WEIGHTS: Dict[str, Tuple[int, int, int]] = {
+    "companyName": (100, 40, 10),
+    "companyNameKana": (60, 30, 6),
+    "companyCode": (80, 20, 4),
+}
+SEARCH_SCORE_FIELD = "searchScore"
+
+
+def _field_text(field: str) -> Dict[str, Any]:
+    # 欠けたフィールドは空文字として扱う（$toLower は英字の大文字小文字だけをそろえる）
+    return {"$toLower": {"$ifNull": [f"${field}", ""]}}
+
+
+def _score_expression(search: str) -> Dict[str, Any]:
+    """フィールドごとの一致度を合計する式。$regex を使わず $split で前方一致・部分一致を判定します。"""
+    terms = list(dict.fromkeys(t for t in (search.strip().lower(), normalize_text(search)) if t))
+    parts: List[Dict[str, Any]] = []
+    for field, (exact, prefix, contains) in SEARCH_WEIGHTS.items():
+        text = _field_text(field)
+        for term in terms:
+            pieces = {"$split": [text, term]}
+            found = {"$gt": [{"$size": pieces}, 1]}
+            parts.append({"$cond": [{"$eq": [text, term]}, exact, {"$cond": [
+                {"$and": [found, {"$eq": [{"$arrayElemAt": [pieces, 0]}, ""]}]}, prefix, {"$cond": [found, contains, 0]},
+            ]}]})
+    return {"$add": parts}
+
+
+def build_search_pipeline(
+    search: str,
+    offset: int,
+    limit: int,
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """n-gram 索引を使う検索パイプラインを組み立てます。
+
+    検索語のトークン（bi-gram）をすべて含むドキュメントだけに索引で絞り込み（いずれか1つの一致では
+    「株式会社」のようなありふれた語でほぼ全件が対象になるため）、その候補を関連度順に並べます。
+    関連度は 完全一致 > 前方一致 > 部分一致 をフィールドの重み（SEARCH_WEIGHTS）で合計したもので、同点は _id 順です。
+    検索語は正規表現として解釈されないため、インジェクションの余地はありません。
+    """
+    tokens = query_tokens(search)
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": readable({"searchTokens": {"$all": tokens}})},
+        {"$addFields": {SEARCH_SCORE_FIELD: _score_expression(search)}},
+        {"$sort": {SEARCH_SCORE_FIELD: -1, "_id": 1}},
+        {"$skip": offset},
+        {"$limit": limit},
+    ]
+    fields = {k: v for k, v in (projection or {}).items() if k != "_id"}
+    if fields and all(fields.values()):
+        pipeline.append({"$project": projection})
+    else:
+        # 除外形式の projection（または指定なし）では関連度のフィールドも除く
+        pipeline.append({"$project": {**(projection or {}), SEARCH_SCORE_FIELD: 0}})
+    return pipeline
+
+
+async def search_company_rows(
+    search: str,
+    offset: int = 0,
+    limit: int = 20,
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """検索結果を生ドキュメント（projection 適用済み、非互換のドキュメントは除外）で返します。"""
+    if not query_tokens(search):
+        return []
+    pipeline = build_search_pipeline(search, offset, limit, versioned(projection))
+    rows = await CompanyDoc.get_motor_collection().aggregate(pipeline).to_list(length=limit)
+    return await ensure_compatible(rows, projected=is_projected(projection))
+
+
+def build_autocomplete_filter(q: str) -> Dict[str, Any]:
+    """正規化済みキーに対する前方一致の範囲条件を組み立てます。
+
+    $elemMatch で範囲を1要素に閉じることで、マルチキー索引の境界を [prefix, upper) に絞ります。
+    """
+    prefix = normalize_kana(q)
+    if not prefix:
+        return {}
+    return {"searchKeys": {"$elemMatch": {"$gte": prefix, "$lt": prefix_upper_bound(prefix)}}}
+
+
+async def autocomplete_companies(q: str, limit: int = 10) -> List[CompanySuggestion]:
+    query = build_autocomplete_filter(q)
+    if not query:
+        return []
+    cursor = (
+        CompanyDoc.get_motor_collection()
+        .find(readable(query), versioned(SUGGESTION_PROJECTION))
+        .sort(AUTOCOMPLETE_SORT)
+        .hint(AUTOCOMPLETE_INDEX)
+        .limit(limit)
+    )
+    rows = await ensure_compatible(await cursor.to_list(length=limit), projected=True)
+    return [
+        CompanySuggestion(
+            id=str(raw["_id"]),
+            companyName=raw["companyName"],
+            companyNameKana=raw["companyNameKana"],
+            companyCode=raw["companyCode"],
+        )
+        for raw in rows
+    ]
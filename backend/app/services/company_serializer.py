@@ -0,0 +1,79 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from pydantic.networks import validate_email
+
+from app.models.company_document import Company as CompanyDoc
+from app.utils.fast_json import dumps
+from app.utils.profiling import phase
+
+# 応答に使わないフィールドは読み込まない
+READ_PROJECTION = {"ownerLoginPassword": 0, "searchTokens": 0, "searchKeys": 0}
+
+# 従来ドキュメントで months が欠けている場合の既定値（CompanyDoc のフィールド既定値に合わせる）
+_DEFAULT_MONTHS = CompanyDoc.model_fields["months"].default
+
+
+def normalize_email(value: str) -> str:
+    """EmailStr と同じ正規化（ドメインの小文字化など）。保存済みの値は通常すでに正規化済みなので検証を省略します。"""
+    _, _, domain = value.rpartition("@")
+    if value.isascii() and "<" not in value and domain == domain.lower():
+        return value
+    return validate_email(value)[1]
+
+
+def company_response_dict(raw: Mapping[str, Any]) -> Dict[str, Any]:
+    """生ドキュメントを CompanyResponse と同じキー順・同じ値の dict にします。
+
+    互換性チェック済み（company_reader 参照）のドキュメントを前提に再検証はせず、
+    CompanyResponse が応答時に適用する変換（電話番号の前後空白除去、メールアドレスの正規化、
+    アプリ連携無効時のフラグ強制、パスワード除外）だけを行います。
+    """
+    location = raw["location"]
+    phone = raw.get("phoneNumber")
+    app_enabled = raw["appIntegrationEnabled"]
+    return {
+        "companyName": raw["companyName"],
+        "companyNameKana": raw["companyNameKana"],
+        "companyCode": raw["companyCode"],
+        "contactName": raw["contactName"],
+        "contactNameKana": raw["contactNameKana"],
+        "phoneNumber": phone.strip() if phone is not None else None,
+        "postalCode": raw["postalCode"],
+        "location": {
+            "prefecture": location["prefecture"],
+            "city": location["city"],
+            "streetAddress": location["streetAddress"],
+            "addressLine": location.get("addressLine"),
+        },
+        "months": raw.get("months", _DEFAULT_MONTHS),
+        "ownerLoginEmail": normalize_email(raw["ownerLoginEmail"]),
+        "appIntegrationEnabled": app_enabled,
+        # appIntegrationEnabled が false の場合、従属フラグは false（CompanyBase と同じ）
+        "safetyConfirmationEnabled": raw["safetyConfirmationEnabled"] if app_enabled is not False else False,
+        "occupationalDoctorIntegrationEnabled": raw["occupationalDoctorIntegrationEnabled"],
+        "employeeChatEnabled": raw["employeeChatEnabled"] if app_enabled is not False else False,
+        "id": str(raw["_id"]),
+        "created_at": raw["created_at"],
+        "updated_at": raw["updated_at"],
+    }
+
+
+def company_response_dicts(rows: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    return [company_response_dict(raw) for raw in rows]
+
+
+def company_json(raw: Mapping[str, Any]) -> bytes:
+    with phase("serialization"):
+        return dumps(company_response_dict(raw))
+
+
+def company_list_json(rows: Iterable[Mapping[str, Any]]) -> bytes:
+    """List[CompanyResponse] と同じ JSON を返します。"""
+    with phase("serialization"):
+        return dumps(company_response_dicts(rows))
+
+
+def company_page_json(rows: Iterable[Mapping[str, Any]], next_cursor: Optional[str]) -> bytes:
+    """CompanyPage と同じ JSON を返します。"""
+    with phase("serialization"):
+        return dumps({"items": company_response_dicts(rows), "next_cursor": next_cursor})
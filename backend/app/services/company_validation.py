@@ -0,0 +1,73 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.company_document import Company as CompanyDoc, LocationModel, search_fields
+from app.schemas.company import CompanyCreate
+
+# フィールドパス（例: "location.streetAddress"）→ エラーメッセージ一覧
+FieldErrors = Dict[str, List[str]]
+
+
+@dataclass
+class RowValidation:
+    row: int
+    company: Optional[CompanyCreate] = None
+    errors: FieldErrors = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.company is not None
+
+
+def field_errors(e: ValidationError) -> FieldErrors:
+    errors: FieldErrors = {}
+    for err in e.errors():
+        path = ".".join(str(p) for p in err.get("loc", [])) or "__root__"
+        errors.setdefault(path, []).append(err.get("msg", "invalid"))
+    return errors
+
+
+def format_field_errors(errors: FieldErrors) -> List[str]:
+    return [f"{path}: {msg}" for path, messages in errors.items() for msg in messages]
+
+
+def validate_company(data: Mapping[str, Any]) -> CompanyCreate:
+    """CompanyCreate のルールで1件検証します（失敗時は ValidationError）。"""
+    return CompanyCreate.model_validate(data)
+
+
+def validate_many(rows: Iterable[Tuple[int, Mapping[str, Any]]]) -> List[RowValidation]:
+    """複数行を検証し、行ごと・フィールドごとのエラーを返します（途中で止まらない）。"""
+    results: List[RowValidation] = []
+    for row_no, data in rows:
+        try:
+            results.append(RowValidation(row=row_no, company=CompanyCreate.model_validate(data)))
+        except ValidationError as e:
+            results.append(RowValidation(row=row_no, errors=field_errors(e)))
+    return results
+
+
+def build_company_document(
+    company: CompanyCreate,
+    now: Optional[datetime] = None,
+    **overrides: Any,
+) -> CompanyDoc:
+    """検証済みの CompanyCreate からドキュメントを組み立てます。
+
+    値は検証済みのため model_construct で再検証（EmailStr 等）を省きます。
+    default_factory を持つフィールドも明示的に渡します（model_construct での解決が遅いため）。
+    """
+    now = now or datetime.utcnow()
+    values = {
+        name: getattr(company, name)
+        for name in CompanyCreate.model_fields
+        if name != "location"
+    }
+    values["location"] = LocationModel.model_construct(**company.location.model_dump())
+    values.update(search_fields(values))
+    values.update(created_at=now, updated_at=now)
+    values.update(overrides)
+    return CompanyDoc.model_construct(**values)
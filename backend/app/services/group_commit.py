@@ -0,0 +1,105 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+
+from app.config import (
+    COMPANY_GROUP_COMMIT_ENABLED,
+    COMPANY_GROUP_COMMIT_MAX_BATCH,
+    COMPANY_GROUP_COMMIT_WINDOW_MS,
+)
+from app.models.company_document import Company as CompanyDoc
+
+DUPLICATE_KEY_ERROR = 11000
+
+InsertMany = Callable[[List[Any]], Awaitable[Any]]
+
+
+async def _insert_companies(docs: List[CompanyDoc]) -> None:
+    await CompanyDoc.insert_many(docs, ordered=False)
+
+
+class GroupCommitWriter:
+    """同時に届いた insert を、時間窓または件数上限でまとめて順序なし insert_many にします。
+
+    呼び出し元にはそれぞれのドキュメントの結果（成功、または DuplicateKeyError などの例外）を返します。
+    insert_many はイベントフックを通らないため、ドキュメントは検索用フィールド計算済みであること。
+    """
+
+    def __init__(
+        self,
+        insert_many: InsertMany = _insert_companies,
+        window_ms: float = COMPANY_GROUP_COMMIT_WINDOW_MS,
+        max_batch: int = COMPANY_GROUP_COMMIT_MAX_BATCH,
+    ):
+        self.insert_many = insert_many
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: set = set()
+        self.batches = 0
+
+    async def insert(self, doc: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if getattr(doc, "id", None) is None:
+            doc.id = PydanticObjectId()
+        future = loop.create_future()
+        self._pending.append((doc, future))
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+        return await future
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._write(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _write(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        errors = {}
+        try:
+            await self.insert_many([doc for doc, _ in batch])
+        except BulkWriteError as e:
+            # 失敗した行だけを対応する呼び出し元に返す
+            for err in e.details.get("writeErrors", []):
+                error_cls = DuplicateKeyError if err.get("code") == DUPLICATE_KEY_ERROR else WriteError
+                errors[err["index"]] = error_cls(err.get("errmsg", "write failed"), err.get("code"), err)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for index, (doc, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(doc)
+
+    async def close(self) -> None:
+        """保留中の insert を書き込んでから終了します。"""
+        self._schedule_flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+
+# シングルトンインスタンス
+company_writer = GroupCommitWriter()
+
+
+async def insert_company(doc: CompanyDoc) -> CompanyDoc:
+    """企業ドキュメントを1件書き込みます（COMPANY_GROUP_COMMIT_ENABLED の場合はグループコミット）。"""
+    if COMPANY_GROUP_COMMIT_ENABLED:
+        return await company_writer.insert(doc)
+    await doc.insert()
+    return doc
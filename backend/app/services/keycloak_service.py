@@ -1,96 +1,284 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
 import httpx
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
 from fastapi import HTTPException
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
-from app.config import KEYCLOAK_URL, KEYCLOAK_REALM, KEYCLOAK_CLIENT_ID
+from app.config import (
+    KEYCLOAK_URL,
+    KEYCLOAK_REALM,
+    KEYCLOAK_CLIENT_ID,
+    KEYCLOAK_TOKEN_CACHE_SIZE,
+    KEYCLOAK_HTTP_MAX_CONNECTIONS,
+    KEYCLOAK_HTTP_MAX_KEEPALIVE,
+    KEYCLOAK_HTTP_TIMEOUT_SECONDS,
+    KEYCLOAK_JWKS_TTL_SECONDS,
+    KEYCLOAK_JWKS_REFRESH_MARGIN_SECONDS,
+    KEYCLOAK_JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+)
 from app.schemas.auth import TokenResponse, UserInfo
+from app.services.metrics import KEYCLOAK_JWKS_LOOKUPS, KEYCLOAK_REQUEST_SECONDS
+from app.utils.profiling import phase
 
 class KeycloakService:
-    def __init__(self):
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
         self.base_url = KEYCLOAK_URL
         self.realm = KEYCLOAK_REALM
         self.client_id = KEYCLOAK_CLIENT_ID
         self.token_url = f"{self.base_url}/realms/{self.realm}/protocol/openid-connect/token"
         self.certs_url = f"{self.base_url}/realms/{self.realm}/protocol/openid-connect/certs"
-        self.public_key_cache: Optional[str] = None
-        self.public_key_cache_time: Optional[datetime] = None
+        # JWKS: kid -> 検証用の鍵オブジェクト（取得時に一度だけ構築）
+        self._keys: Dict[str, Key] = {}
+        self._keys_fetched_at: Optional[datetime] = None
+        # 未知の kid による強制更新のレート制限
+        self.jwks_min_refresh_interval = KEYCLOAK_JWKS_MIN_REFRESH_INTERVAL_SECONDS
+        self._last_forced_refresh: Optional[float] = None
+        self.jwks_ttl = timedelta(seconds=KEYCLOAK_JWKS_TTL_SECONDS)
+        self.jwks_refresh_margin = timedelta(seconds=KEYCLOAK_JWKS_REFRESH_MARGIN_SECONDS)
+        # 検証済みトークンのキャッシュ: sha256(token) -> (exp, UserInfo)
+        self.token_cache_size = KEYCLOAK_TOKEN_CACHE_SIZE
+        self._token_cache: "OrderedDict[str, Tuple[float, UserInfo]]" = OrderedDict()
+        self.token_cache_hits = 0
+        self.token_cache_misses = 0
+        # 共有 HTTP クライアント（startup で生成、shutdown で破棄）
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        # JWKS 取得の single-flight 用（同時に複数の /certs 取得を走らせない）
+        self._jwks_inflight: Optional[asyncio.Task] = None
+        self._jwks_refresher: Optional[asyncio.Task] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=KEYCLOAK_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=KEYCLOAK_HTTP_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(KEYCLOAK_HTTP_TIMEOUT_SECONDS),
+            transport=self._transport,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # startup 前（テストやスクリプト）でも使えるよう遅延生成
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    async def startup(self) -> None:
+        self._client = self._create_client()
+        self._jwks_refresher = asyncio.create_task(self._refresh_jwks_periodically())
+
+    async def shutdown(self) -> None:
+        if self._jwks_refresher is not None:
+            self._jwks_refresher.cancel()
+            try:
+                await self._jwks_refresher
+            except asyncio.CancelledError:
+                pass
+            self._jwks_refresher = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, operation: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        # Keycloak 呼び出しの所要時間を記録（接続エラー等は status="error"）
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = str(response.status_code)
+            return response
+        finally:
+            KEYCLOAK_REQUEST_SECONDS.observe(time.perf_counter() - start, operation, status)
 
     async def get_token(self, username: str, password: str) -> TokenResponse:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data={
-                    "grant_type": "password",
-                    "client_id": self.client_id,
-                    "username": username,
-                    "password": password,
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
+        response = await self._request(
+            "token",
+            "POST",
+            self.token_url,
+            data={
+                "grant_type": "password",
+                "client_id": self.client_id,
+                "username": username,
+                "password": password,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid username or password"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=401,
-                    detail="Invalid username or password"
-                )
-            
-            data = response.json()
-            return TokenResponse(**data)
+
+        data = response.json()
+        return TokenResponse(**data)
 
     async def refresh_token(self, refresh_token: str) -> TokenResponse:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.token_url,
-                data={
-                    "grant_type": "refresh_token",
-                    "client_id": self.client_id,
-                    "refresh_token": refresh_token,
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
+        response = await self._request(
+            "refresh",
+            "POST",
+            self.token_url,
+            data={
+                "grant_type": "refresh_token",
+                "client_id": self.client_id,
+                "refresh_token": refresh_token,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid refresh token"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=401,
-                    detail="Invalid refresh token"
-                )
-            
-            data = response.json()
-            return TokenResponse(**data)
-
-    async def get_public_key(self) -> str:
-        if self.public_key_cache and self.public_key_cache_time:
-            if datetime.utcnow() - self.public_key_cache_time < timedelta(hours=1):
-                return self.public_key_cache
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.certs_url)
-            keys = response.json()["keys"]
-            
-            for key in keys:
-                if key.get("alg") == "RS256":
-                    from jose.backends import RSAKey
-                    rsa_key = RSAKey(key, algorithm="RS256")
-                    self.public_key_cache = rsa_key.to_pem().decode()
-                    self.public_key_cache_time = datetime.utcnow()
-                    return self.public_key_cache
-        
-        raise HTTPException(status_code=500, detail="Unable to get Keycloak public key")
+
+        data = response.json()
+        return TokenResponse(**data)
+
+    def _jwks_age(self) -> Optional[timedelta]:
+        if not self._keys or not self._keys_fetched_at:
+            return None
+        return datetime.utcnow() - self._keys_fetched_at
+
+    def load_jwks(self, jwks: Dict[str, Any]) -> None:
+        """JWKS を kid ごとの鍵オブジェクトに変換して差し替えます。"""
+        keys: Dict[str, Key] = {}
+        for key in jwks.get("keys", []):
+            if key.get("kty") != "RSA" or key.get("use", "sig") != "sig":
+                continue
+            if key.get("alg", "RS256") != "RS256":
+                continue
+            keys[key.get("kid", "")] = jwk.construct(key, "RS256")
+        if not keys:
+            raise HTTPException(status_code=500, detail="Unable to get Keycloak public key")
+        if set(keys) != set(self._keys):
+            # 鍵がローテーションされたら旧鍵で検証済みのトークンを破棄
+            self.clear_token_cache()
+        self._keys = keys
+        self._keys_fetched_at = datetime.utcnow()
+
+    async def get_signing_key(self, kid: Optional[str]) -> Key:
+        age = self._jwks_age()
+        if age is None or age >= self.jwks_ttl:
+            KEYCLOAK_JWKS_LOOKUPS.inc("refresh")
+            await self.refresh_jwks()
+        elif kid not in self._keys and self._may_force_refresh():
+            # 未知の kid: ローテーション直後の可能性があるため即時更新（レート制限付き）
+            KEYCLOAK_JWKS_LOOKUPS.inc("refresh")
+            await self.refresh_jwks()
+        else:
+            KEYCLOAK_JWKS_LOOKUPS.inc("hit")
+
+        if kid is None and len(self._keys) == 1:
+            return next(iter(self._keys.values()))
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key: {kid}")
+        return key
+
+    def _may_force_refresh(self) -> bool:
+        now = time.monotonic()
+        if (
+            self._last_forced_refresh is not None
+            and now - self._last_forced_refresh < self.jwks_min_refresh_interval
+        ):
+            return False
+        self._last_forced_refresh = now
+        return True
+
+    async def refresh_jwks(self) -> None:
+        # 取得中のリクエストがあれば相乗りする（thundering herd 対策）
+        if self._jwks_inflight is None or self._jwks_inflight.done():
+            self._jwks_inflight = asyncio.create_task(self._fetch_jwks())
+        await asyncio.shield(self._jwks_inflight)
+
+    async def _fetch_jwks(self) -> None:
+        response = await self._request("jwks", "GET", self.certs_url)
+        # エラー応答の本文を JWKS として読まない（httpx.HTTPStatusError として呼び出し側へ）
+        response.raise_for_status()
+        self.load_jwks(response.json())
+
+    def _next_jwks_refresh_delay(self) -> float:
+        age = self._jwks_age()
+        if age is None:
+            return 0.0
+        delay = (self.jwks_ttl - self.jwks_refresh_margin - age).total_seconds()
+        # 余裕が TTL 以上に設定されていても、取得直後に再取得を繰り返さないよう最小間隔は空ける
+        return max(delay, self.jwks_min_refresh_interval, 1)
+
+    async def _refresh_jwks_periodically(self) -> None:
+        # 有効期限の少し前にバックグラウンドで更新し、リクエスト経路での取得を避ける
+        while True:
+            delay = self._next_jwks_refresh_delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.refresh_jwks()
+            except Exception as e:
+                print(f"[Keycloak] JWKS refresh failed: {e}")
+                await asyncio.sleep(min(60, self.jwks_refresh_margin.total_seconds()) or 1)
+
+    def clear_token_cache(self) -> None:
+        self._token_cache.clear()
+
+    def token_cache_stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.token_cache_hits,
+            "misses": self.token_cache_misses,
+            "size": len(self._token_cache),
+        }
+
+    def _get_cached_user(self, cache_key: str) -> Optional[UserInfo]:
+        entry = self._token_cache.get(cache_key)
+        if entry is None:
+            return None
+        exp, user = entry
+        if exp <= time.time():
+            # 有効期限切れ: 破棄して通常検証へ（jwt.decode が期限切れエラーを返す）
+            del self._token_cache[cache_key]
+            return None
+        self._token_cache.move_to_end(cache_key)
+        return user
+
+    def _cache_user(self, cache_key: str, exp: Any, user: UserInfo) -> None:
+        if self.token_cache_size <= 0 or exp is None:
+            return
+        self._token_cache[cache_key] = (float(exp), user)
+        self._token_cache.move_to_end(cache_key)
+        while len(self._token_cache) > self.token_cache_size:
+            self._token_cache.popitem(last=False)
 
     async def verify_token(self, token: str) -> UserInfo:
+        # プロファイル対象のリクエストでは "auth" フェーズとして計測する
+        with phase("auth"):
+            return await self._verify_token(token)
+
+    async def _verify_token(self, token: str) -> UserInfo:
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+        user = self._get_cached_user(cache_key)
+        if user is not None:
+            self.token_cache_hits += 1
+            return user
+        self.token_cache_misses += 1
+
         try:
-            public_key = await self.get_public_key()
-            
+            kid = jwt.get_unverified_header(token).get("kid")
+            signing_key = await self.get_signing_key(kid)
+
             payload = jwt.decode(
                 token,
-                public_key,
+                signing_key,
                 algorithms=["RS256"],
                 audience=None,
                 options={"verify_aud": False}
             )
             
-            return UserInfo(
+            user = UserInfo(
                 sub=payload.get("sub", ""),
                 username=payload.get("preferred_username", ""),
                 email=payload.get("email"),
@@ -98,6 +286,8 @@ class KeycloakService:
                 given_name=payload.get("given_name"),
                 family_name=payload.get("family_name")
             )
+            self._cache_user(cache_key, payload.get("exp"), user)
+            return user
         except JWTError as e:
             raise HTTPException(
                 status_code=401,
@@ -0,0 +1,138 @@
+from typing import Dict
+
+from pymongo import monitoring
+
+from app.utils.metrics import LabelValues, MetricsRegistry
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# シングルトンインスタンス
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+GRAPHQL_OPERATION_SECONDS = metrics.histogram(
+    "graphql_operation_duration_seconds",
+    "GraphQL operation latency by operation name",
+    ["operation", "type", "status"],
+)
+MONGODB_COMMAND_SECONDS = metrics.histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency reported by pymongo command monitoring",
+    ["command", "status"],
+)
+MONGODB_POOL_EVENTS = metrics.counter(
+    "mongodb_pool_events_total",
+    "MongoDB connection pool events reported by pymongo pool monitoring",
+    ["event"],
+)
+MONGODB_POOL_CHECKOUT_SECONDS = metrics.histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled MongoDB connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+KEYCLOAK_REQUEST_SECONDS = metrics.histogram(
+    "keycloak_request_duration_seconds",
+    "Keycloak HTTP call latency",
+    ["operation", "status"],
+)
+KEYCLOAK_JWKS_LOOKUPS = metrics.counter(
+    "keycloak_jwks_lookups_total",
+    "Signing key lookups served from the cached JWKS (hit) or after a refresh (refresh)",
+    ["result"],
+)
+
+
+def _pool_gauges() -> Dict[LabelValues, float]:
+    events = {key[0]: value for key, value in MONGODB_POOL_EVENTS.values().items()}
+    return {
+        ("open",): events.get("connection_created", 0) - events.get("connection_closed", 0),
+        ("in_use",): events.get("connection_checked_out", 0) - events.get("connection_checked_in", 0),
+    }
+
+
+metrics.callback(
+    "mongodb_pool_connections",
+    "MongoDB connections currently open / checked out (derived from pool events)",
+    "gauge",
+    _pool_gauges,
+    ["state"],
+)
+
+
+def _token_cache_stats() -> Dict[LabelValues, float]:
+    # 循環 import を避けるため出力時に参照する
+    from app.services.keycloak_service import keycloak_service
+
+    stats = keycloak_service.token_cache_stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+metrics.callback(
+    "keycloak_token_cache_lookups_total",
+    "Verified-token cache lookups",
+    "counter",
+    _token_cache_stats,
+    ["result"],
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo のコマンド監視: 完了・失敗したコマンドの所要時間を記録します。"""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGODB_COMMAND_SECONDS.observe(event.duration_micros / 1e6, event.command_name, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGODB_COMMAND_SECONDS.observe(event.duration_micros / 1e6, event.command_name, "error")
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """pymongo の接続プール監視: 接続の作成・破棄・貸し出しを数えます。"""
+
+    def pool_created(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("pool_created")
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("pool_cleared")
+
+    def pool_closed(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("pool_closed")
+
+    def connection_created(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("connection_created")
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("connection_closed")
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_check_out_failed(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("connection_check_out_failed")
+
+    def connection_checked_out(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("connection_checked_out")
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            MONGODB_POOL_CHECKOUT_SECONDS.observe(duration)
+
+    def connection_checked_in(self, event) -> None:
+        MONGODB_POOL_EVENTS.inc("connection_checked_in")
+
+
+def mongo_event_listeners() -> list:
+    """MongoClient(event_listeners=...) に渡す監視リスナー"""
+    return [MongoCommandMetrics(), MongoPoolMetrics()]
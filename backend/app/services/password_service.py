@@ -0,0 +1,61 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from app.config import PASSWORD_BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_IMPORT_HASH_WORKERS
+
+
+class PasswordService:
+    """bcrypt によるパスワードハッシュを専用スレッドプールで計算します。
+
+    bcrypt は1回あたり数百 ms かかるため、イベントループ上で直接実行すると他のリクエストが止まります。
+    ワーカー数で同時に計算する件数の上限を決めます。
+    """
+
+    def __init__(
+        self,
+        rounds: int = PASSWORD_BCRYPT_ROUNDS,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        thread_name_prefix: str = "password-hash",
+    ):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix)
+        return self._executor
+
+    def hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    def verify_sync(self, password: str, hashed: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode(), hashed.encode())
+        except ValueError:
+            # ハッシュ形式でない値（平文で保存された従来データ等）
+            return False
+
+    async def hash(self, password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.hash_sync, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.verify_sync, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# シングルトンインスタンス
+password_service = PasswordService()
+# 一括インポート用（1チャンク分のハッシュ計算が対話的な作成・ログインのワーカーを占有しないよう分ける）
+import_password_service = PasswordService(max_workers=PASSWORD_IMPORT_HASH_WORKERS, thread_name_prefix="import-password-hash")
@@ -0,0 +1,210 @@
+import csv
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import POSTAL_INDEX_PATH
+
+# バイナリ索引の形式（リトルエンディアン、4バイト境界）
+#   ヘッダー: magic(4) / レコード数 / 文字列数 / 文字列データのバイト数
+#   codes:   uint32[レコード数]         郵便番号（数値、昇順）
+#   fields:  uint32[レコード数 * 3]     (都道府県, 市区町村, 町域) の文字列番号
+#   offsets: uint32[文字列数 + 1]       文字列データ内の開始位置
+#   strings: UTF-8 の連結（同じ文字列は1回だけ格納）
+MAGIC = b"PCX1"
+_HEADER = struct.Struct("<4sIII")
+
+# KEN_ALL.CSV の列位置
+_COL_CODE, _COL_PREFECTURE, _COL_CITY, _COL_TOWN = 2, 6, 7, 8
+# 町域として扱わない表記（市区町村のみで住所が決まる）
+_NO_TOWN = "以下に掲載がない場合"
+_NO_TOWN_SUFFIX = "の次に番地がくる場合"
+
+# (郵便番号, 都道府県, 市区町村, 町域)
+PostalRecord = Tuple[str, str, str, str]
+
+
+@dataclass(frozen=True)
+class PostalEntry:
+    postalCode: str
+    prefecture: str
+    city: str
+    town: str
+
+
+def normalize_postal_code(code: str) -> Optional[str]:
+    """"530-0001" / "〒5300001" などを7桁の数字にします（不正な値は None）。"""
+    code = code.strip().lstrip("〒").replace("-", "").replace("－", "")
+    if len(code) != 7 or not code.isascii() or not code.isdigit():
+        return None
+    return code
+
+
+def _town(town: str) -> str:
+    if town == _NO_TOWN or town.endswith(_NO_TOWN_SUFFIX):
+        return ""
+    return town
+
+
+def parse_ken_all(lines: Iterable[str]) -> Iterator[PostalRecord]:
+    """KEN_ALL 形式の CSV を (郵便番号, 都道府県, 市区町村, 町域) にします。
+
+    町域が長く複数行に分割された行（括弧が閉じていない行）は1件に連結します。
+    """
+    pending: Optional[List[str]] = None
+    for row in csv.reader(lines):
+        if len(row) <= _COL_TOWN:
+            continue
+        if pending is not None and row[_COL_CODE] == pending[_COL_CODE]:
+            pending[_COL_TOWN] += row[_COL_TOWN]
+        else:
+            if pending is not None:
+                yield pending[_COL_CODE], pending[_COL_PREFECTURE], pending[_COL_CITY], _town(pending[_COL_TOWN])
+            pending = row
+        if pending[_COL_TOWN].count("（") <= pending[_COL_TOWN].count("）"):
+            yield pending[_COL_CODE], pending[_COL_PREFECTURE], pending[_COL_CITY], _town(pending[_COL_TOWN])
+            pending = None
+    if pending is not None:
+        yield pending[_COL_CODE], pending[_COL_PREFECTURE], pending[_COL_CITY], _town(pending[_COL_TOWN])
+
+
+def build_index(records: Iterable[PostalRecord]) -> bytes:
+    """レコードを郵便番号順に並べ、バイナリ索引を組み立てます。
+
+    同じ郵便番号の町域は元の並び順を保ち、重複したレコードは1件にまとめます。
+    """
+    unique = dict.fromkeys((int(code), pref, city, town) for code, pref, city, town in records)
+    rows = sorted(unique, key=lambda row: row[0])
+    strings: Dict[str, int] = {}
+    codes = array("I")
+    fields = array("I")
+    for code, *names in rows:
+        codes.append(code)
+        for name in names:
+            fields.append(strings.setdefault(name, len(strings)))
+
+    offsets = array("I", [0])
+    data = bytearray()
+    for name in strings:
+        data += name.encode()
+        offsets.append(len(data))
+    data += b"\0" * (-len(data) % 4)
+
+    if sys.byteorder != "little":
+        for values in (codes, fields, offsets):
+            values.byteswap()
+    header = _HEADER.pack(MAGIC, len(codes), len(strings), len(data))
+    return header + codes.tobytes() + fields.tobytes() + offsets.tobytes() + bytes(data)
+
+
+def _uint32_view(buffer: memoryview, start: int, count: int) -> Tuple[Iterable[int], int]:
+    end = start + count * 4
+    if sys.byteorder == "little":
+        # コピーせずに mmap 上の配列として参照する
+        return buffer[start:end].cast("I"), end
+    values = array("I", buffer[start:end].tobytes())
+    values.byteswap()
+    return values, end
+
+
+class PostalIndex:
+    """郵便番号の二分探索索引（mmap したファイルを直接参照し、プロセスごとのコピーを持たない）"""
+
+    def __init__(self, buffer: memoryview):
+        magic, count, string_count, data_size = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("not a postal index file")
+        self._buffer = buffer
+        self._codes, pos = _uint32_view(buffer, _HEADER.size, count)
+        self._fields, pos = _uint32_view(buffer, pos, count * 3)
+        self._offsets, pos = _uint32_view(buffer, pos, string_count + 1)
+        self._strings = buffer[pos:pos + data_size]
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def open(cls, path: str) -> "PostalIndex":
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        index = cls(memoryview(mapped))
+        index._mmap = mapped
+        return index
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _string(self, i: int) -> str:
+        return bytes(self._strings[self._offsets[i]:self._offsets[i + 1]]).decode()
+
+    def lookup(self, code: str) -> List[PostalEntry]:
+        """郵便番号に該当する住所（複数の町域がある場合はすべて）を返します。"""
+        normalized = normalize_postal_code(code)
+        if normalized is None:
+            return []
+        key = int(normalized)
+        lo = bisect_left(self._codes, key)
+        hi = bisect_right(self._codes, key, lo)
+        return [
+            PostalEntry(
+                postalCode=normalized,
+                prefecture=self._string(self._fields[i * 3]),
+                city=self._string(self._fields[i * 3 + 1]),
+                town=self._string(self._fields[i * 3 + 2]),
+            )
+            for i in range(lo, hi)
+        ]
+
+    def close(self) -> None:
+        # mmap を閉じる前に参照中の memoryview を解放する
+        for view in (self._codes, self._fields, self._offsets, self._strings, self._buffer):
+            if isinstance(view, memoryview):
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class PostalService:
+    """郵便番号索引を初回利用時に開きます（ファイルがない場合は利用不可として扱う）。"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: Optional[PostalIndex] = None
+        self._missing = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Optional[PostalIndex]:
+        if self._index is None and not self._missing:
+            with self._lock:
+                if self._index is None and not self._missing:
+                    if os.path.exists(self.path):
+                        self._index = PostalIndex.open(self.path)
+                        print(f"[Postal] loaded {len(self._index)} records from {self.path}")
+                    else:
+                        self._missing = True
+                        print(f"[Postal] index not found: {self.path}")
+        return self._index
+
+    @property
+    def available(self) -> bool:
+        return self._load() is not None
+
+    def lookup(self, code: str) -> List[PostalEntry]:
+        index = self._load()
+        return index.lookup(code) if index is not None else []
+
+    def close(self) -> None:
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+            self._index = None
+            self._missing = False
+
+
+# シングルトンインスタンス
+postal_service = PostalService(POSTAL_INDEX_PATH)
@@ -0,0 +1,73 @@
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+
+from pymongo import monitoring
+
+from app.config import PROFILING_MAX_STORED, PROFILING_OUTPUT_DIR
+from app.utils.profiling import record_phase
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+
+
+class ProfileStore:
+    """プロファイル結果をディレクトリに保存します（<id>.folded と <id>.json、古いものから削除）。"""
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    def save(self, profile_id: str, folded: str, summary: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile_id, "folded"), "w", encoding="utf-8") as f:
+            f.write(folded)
+        with open(self._path(profile_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        self._prune()
+
+    def _prune(self) -> None:
+        summaries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in summaries[: max(0, len(summaries) - self.max_profiles)]:
+            profile_id = entry.name[: -len(".json")]
+            for ext in ("json", "folded"):
+                try:
+                    os.remove(self._path(profile_id, ext))
+                except FileNotFoundError:
+                    pass
+
+    def load(self, profile_id: str, ext: str) -> Optional[str]:
+        """保存済みの結果（ext は "folded" または "json"）。不正な ID・未保存は None"""
+        if not _PROFILE_ID.match(profile_id) or ext not in ("folded", "json"):
+            return None
+        try:
+            with open(self._path(profile_id, ext), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+class MongoProfileListener(monitoring.CommandListener):
+    """プロファイル中のリクエストで実行された MongoDB コマンドの時間を "db" フェーズに加算します。
+
+    Motor はワーカースレッドへコンテキストをコピーして渡すため、リスナーからも対象リクエストを参照できます。
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        record_phase("db", event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        record_phase("db", event.duration_micros / 1e6)
+
+
+# シングルトンインスタンス
+profile_store = ProfileStore(PROFILING_OUTPUT_DIR, PROFILING_MAX_STORED)
@@ -0,0 +1,23 @@
+import hashlib
+from typing import Any, Optional
+
+
+def strong_etag(*parts: Any) -> str:
+    """値の組から強い ETag（引用符付き）を作ります。"""
+    digest = hashlib.blake2b(":".join(str(p) for p in parts).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match が etag に一致するか（弱い比較: W/ の有無は区別しない、"*" は常に一致）。"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,24 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+
+def dumps(obj: Any) -> bytes:
+    """orjson で UTF-8 の JSON バイト列にします。
+
+    出力は FastAPI の JSONResponse（ensure_ascii=False, 区切り文字に空白なし）と同じ形式です。
+    naive な datetime はタイムゾーンなしの ISO 8601 になります。
+    """
+    return orjson.dumps(obj)
+
+
+class FastJSONResponse(Response):
+    """シリアライズ済みのバイト列（または orjson で変換できる値）をそのまま返すレスポンス"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,35 @@
+import unicodedata
+from typing import Optional
+
+# 長音として扱う記号（NFKC 後に残るもの）
+_LONG_VOWEL_MARKS = "ー-‐‑‒–—―−〜~"
+# 区切りとして無視する記号
+_IGNORED_MARKS = "・･.,、。"
+
+_HIRAGANA_START = ord("ぁ")
+_HIRAGANA_END = ord("ゖ")
+_KATAKANA_OFFSET = ord("ァ") - ord("ぁ")
+
+_TRANSLATE = {ord(ch): None for ch in _LONG_VOWEL_MARKS + _IGNORED_MARKS}
+_TRANSLATE.update({cp: cp + _KATAKANA_OFFSET for cp in range(_HIRAGANA_START, _HIRAGANA_END + 1)})
+_TRANSLATE.update({ord("ゝ"): ord("ヽ"), ord("ゞ"): ord("ヾ")})
+
+
+def normalize_kana(text: Optional[str]) -> str:
+    """前方一致検索用のキーに正規化します。
+
+    - NFKC: 半角カナ→全角カナ（濁点の結合含む）、全角英数→半角
+    - ひらがな→カタカナ
+    - 長音・ハイフン類は除去（「サーバー」「サーバ」「さば」を同一視）
+    - 空白・中黒などの区切りは除去、英字は小文字化
+    """
+    if not text:
+        return ""
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    normalized = "".join(ch for ch in normalized if not ch.isspace())
+    return normalized.translate(_TRANSLATE)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """prefix で始まる文字列の範囲 [prefix, upper) の上限を返します。"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
@@ -0,0 +1,37 @@
+import unicodedata
+from typing import List, Optional
+
+NGRAM_SIZE = 2
+
+
+def normalize_text(text: str) -> str:
+    """NFKC 正規化（全角英数→半角・半角カナ→全角）＋小文字化し、空白を除去します。"""
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    return "".join(ch for ch in normalized if not ch.isspace())
+
+
+def _ngrams(text: str, n: int) -> List[str]:
+    if len(text) < n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def index_tokens(*values: Optional[str]) -> List[str]:
+    """書き込み時に保存するトークン（1文字 + bi-gram）を重複なしで返します。
+
+    1文字トークンも保持することで、1文字だけの検索語にも索引で応答できます。
+    """
+    tokens = set()
+    for value in values:
+        if not value:
+            continue
+        text = normalize_text(value)
+        tokens.update(text)
+        tokens.update(_ngrams(text, NGRAM_SIZE))
+    return sorted(tokens)
+
+
+def query_tokens(search: str) -> List[str]:
+    """検索語を索引トークンに分解します（2文字以上は bi-gram、1文字はそのまま）。"""
+    text = normalize_text(search)
+    return list(dict.fromkeys(_ngrams(text, NGRAM_SIZE)))
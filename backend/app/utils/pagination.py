@@ -0,0 +1,98 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def _encode(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Dict[str, Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(data, dict):
+        raise ValueError("cursor must be an object")
+    return data
+
+
+def encode_cursor(created_at: datetime, doc_id: Any, direction: int = 1) -> str:
+    """(created_at, _id) を不透明なカーソル文字列にエンコードします（降順のみ向きを記録）。"""
+    data: Dict[str, Any] = {"c": created_at.isoformat(), "i": str(doc_id)}
+    if direction < 0:
+        data["d"] = -1
+    return _encode(data)
+
+
+def _check_direction(data: Mapping[str, Any], direction: int) -> None:
+    # 向きのないカーソルは昇順（従来の created_at カーソル）
+    if data.get("d", 1) != (-1 if direction < 0 else 1):
+        raise ValueError("cursor was issued for a different sort direction")
+
+
+def decode_cursor(cursor: str, direction: int = 1) -> Tuple[datetime, ObjectId]:
+    """カーソル文字列を (created_at, _id) にデコードします。不正な値・逆向きのカーソルは ValueError。"""
+    try:
+        data = _decode(cursor)
+        _check_direction(data, direction)
+        return datetime.fromisoformat(data["c"]), ObjectId(data["i"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_sort_cursor(field: str, value: Any, doc_id: Any, direction: int = 1) -> str:
+    """任意のソートキー (field, _id) のカーソル。created_at は encode_cursor と同じ形式です。"""
+    if field == "created_at":
+        return encode_cursor(value, doc_id, direction)
+    return _encode({"f": field, "d": -1 if direction < 0 else 1, "v": value, "i": str(doc_id)})
+
+
+def decode_sort_cursor(field: str, cursor: str, direction: int = 1) -> Tuple[Any, ObjectId]:
+    """field 用のカーソルをデコードします。別のソートキー・逆向きのカーソルは ValueError。
+
+    created_at 以外のキー（companyNameKana）の値は文字列のみ受け付けます。
+    カーソルはクライアントが作れるため、dict 等をそのまま条件に入れると Mongo の演算子を注入できてしまいます。
+    """
+    if field == "created_at":
+        return decode_cursor(cursor, direction)
+    try:
+        data = _decode(cursor)
+        if data.get("f") != field:
+            raise ValueError("cursor was issued for a different sort")
+        _check_direction(data, direction)
+        value = data["v"]
+        if not isinstance(value, str):
+            raise ValueError("cursor value must be a string")
+        return value, ObjectId(data["i"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def sort_keyset_filter(field: str, direction: int, cursor: str) -> Dict[str, Any]:
+    """(field, _id) の並びでカーソル位置より後ろを選択する Mongo フィルタを返します。"""
+    value, doc_id = decode_sort_cursor(field, cursor, direction)
+    op = "$gt" if direction > 0 else "$lt"
+    return {
+        "$or": [
+            {field: {op: value}},
+            {field: value, "_id": {op: doc_id}},
+        ]
+    }
+
+
+def keyset_filter(cursor: str) -> Dict[str, Any]:
+    """カーソル位置より後ろの (created_at, _id) を選択する Mongo フィルタを返します。"""
+    return sort_keyset_filter("created_at", 1, cursor)
+
+
+def keyset_sort(field: str, direction: int = 1) -> List[Tuple[str, int]]:
+    """(field, _id) の並び順。_id で同値の順序を確定させます。"""
+    return [(field, direction), ("_id", direction)]
+
+
+# keyset_filter と同じ並び順 (idx_created_at_id と一致)
+KEYSET_SORT = keyset_sort("created_at")
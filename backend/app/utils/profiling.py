@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Mapping, Optional
+
+# プロファイル対象のリクエストでのみ設定される（それ以外は None のまま）
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+_NOOP = nullcontext()
+
+
+class RequestProfile:
+    """1リクエスト分のフェーズ別所要時間（秒）"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        # pymongo の監視イベントはワーカースレッドから届く
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: Optional[float] = None) -> str:
+        """Server-Timing ヘッダーの値（ミリ秒）"""
+        items = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        items.append(f"total;dur={(self.elapsed() if total is None else total) * 1000:.2f}")
+        return ", ".join(items)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+@contextmanager
+def profiled() -> Iterator[RequestProfile]:
+    """この区間（とそこから呼ばれる処理）をプロファイル対象にします。"""
+    profile = RequestProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+class _PhaseTimer:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.profile.add(self.name, time.perf_counter() - self.start)
+
+
+def phase(name: str):
+    """with phase("auth"): ... の区間をフェーズとして記録します。
+
+    プロファイル対象外のリクエストでは何もしない共有のコンテキストマネージャーを返します。
+    """
+    profile = _current.get()
+    if profile is None:
+        return _NOOP
+    return _PhaseTimer(profile, name)
+
+
+def record_phase(name: str, seconds: float) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.add(name, seconds)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """別スレッドから対象スレッドのスタックを一定間隔で採取します（collapsed stacks 形式で集計）。
+
+    イベントループのスレッドを対象にすると、採取時点で実行中のコルーチンのスタックが得られます。
+    同じループで並行して処理中の他のリクエストも採取に含まれます。
+    採取中は GIL の切り替え間隔を採取間隔まで短くします（既定の 5ms では採取スレッドが動けないため）。
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._switch_interval = sys.getswitchinterval()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self) -> "StackSampler":
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        return self.stacks
+
+
+def collapsed(stacks: Mapping[str, int]) -> str:
+    """flamegraph.pl / speedscope で読める collapsed stacks（1行 = "呼び出し元;...;関数 件数"）"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items(), key=lambda item: -item[1]))
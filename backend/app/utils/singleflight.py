@@ -0,0 +1,39 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+def flight_key(*parts: Any) -> str:
+    """引数の組を正規化したキーにします（dict のキー順・datetime / ObjectId の違いを吸収）。"""
+    return json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+class SingleFlight:
+    """同じキーで実行中の呼び出しに相乗りさせます（thundering herd 対策）。
+
+    最初の呼び出しだけが fn を実行し、完了までに届いた同じキーの呼び出しは同じ結果
+    （例外も含む）を受け取ります。完了後は結果を保持しません（キャッシュではない）。
+    結果は呼び出し元の間で共有されるため、変更しない値（bytes など）を返してください。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        # 相乗りした呼び出しの数（計測用）
+        self.shared = 0
+
+    def _forget(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.shared += 1
+        # 1つの呼び出し元がキャンセルされても、共有している実行は止めない
+        return await asyncio.shield(task)
@@ -0,0 +1,47 @@
+import zlib
+from typing import AsyncIterable, AsyncIterator, Union
+
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+GZIP_MEDIA_TYPE = "application/gzip"
+
+# モデル、またはシリアライズ済みの JSON バイト列
+StreamItem = Union[BaseModel, bytes]
+
+
+def _encode(item: StreamItem) -> bytes:
+    return item if isinstance(item, bytes) else item.model_dump_json().encode()
+
+
+async def ndjson_stream(items: AsyncIterable[StreamItem]) -> AsyncIterator[bytes]:
+    """モデルを1行1 JSON (NDJSON) として逐次書き出します。"""
+    async for item in items:
+        yield _encode(item) + b"\n"
+
+
+async def json_array_stream(items: AsyncIterable[StreamItem]) -> AsyncIterator[bytes]:
+    """モデルを JSON 配列として逐次書き出します（全件をメモリに保持しない）。"""
+    yield b"["
+    first = True
+    async for item in items:
+        body = _encode(item)
+        if first:
+            first = False
+            yield body
+        else:
+            yield b"," + body
+    yield b"]"
+
+
+async def gzip_stream(chunks: AsyncIterable[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """バイト列を逐次 gzip 圧縮します（圧縮器の内部バッファ以上は保持しない）。"""
+    # wbits=31: gzip ヘッダー・トレーラー付きで出力
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
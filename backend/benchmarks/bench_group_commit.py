@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+企業作成のスループット比較: 1件ずつ insert vs グループコミット (insert_many)
+
+- per-request: 各リクエストが doc.insert() で1往復
+- group:       GroupCommitWriter が時間窓・件数上限でまとめて insert_many
+
+--mongo-uri を指定すると実際の MongoDB（<db>_bench）を使います。省略時はインプロセス MongoDB に
+--latency-ms の往復遅延（書き込み確認待ちを含む）と --pool-size の同時接続数上限を加えて模擬します。
+
+使い方 (backend ディレクトリで実行):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_group_commit --requests 2000 --concurrency 200 --latency-ms 5 --pool-size 10
+    python -m benchmarks.bench_group_commit --mongo-uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import time
+
+from app.models.company_document import Company as CompanyDoc
+from app.services.company_validation import build_company_document, validate_company
+from app.services.group_commit import GroupCommitWriter
+from benchmarks.bench_validation import sample_row
+from benchmarks.common import init_models
+
+
+def make_docs(prefix: str, n: int) -> list:
+    company = validate_company(sample_row(0))
+    return [build_company_document(company, companyCode=f"{prefix}-{i:07d}") for i in range(n)]
+
+
+async def run_concurrently(docs: list, concurrency: int, insert) -> float:
+    queue = iter(docs)
+
+    async def worker():
+        for doc in queue:
+            await insert(doc)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(docs) / (time.perf_counter() - start)
+
+
+async def main(args) -> None:
+    await init_models(args.mongo_uri)
+    await CompanyDoc.get_motor_collection().delete_many({})
+    latency = 0 if args.mongo_uri else args.latency_ms / 1000
+    # Motor の接続プール（maxPoolSize）と同様に同時往復数を制限する
+    pool = asyncio.Semaphore(args.pool_size)
+
+    async def insert_one(doc):
+        async with pool:
+            await asyncio.sleep(latency)
+            await doc.insert()
+
+    async def insert_many(docs):
+        async with pool:
+            await asyncio.sleep(latency)
+            await CompanyDoc.insert_many(docs, ordered=False)
+
+    writer = GroupCommitWriter(insert_many=insert_many, window_ms=args.window_ms, max_batch=args.max_batch)
+
+    single = await run_concurrently(make_docs("S", args.requests), args.concurrency, insert_one)
+    await CompanyDoc.get_motor_collection().delete_many({})
+    grouped = await run_concurrently(make_docs("G", args.requests), args.concurrency, writer.insert)
+    await CompanyDoc.get_motor_collection().delete_many({})
+
+    print(f"per-request: {single:10.0f} creates/s")
+    print(f"group:       {grouped:10.0f} creates/s  ({grouped / single:.1f}x, {writer.batches} batches)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--window-ms", type=float, default=5)
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=5, help="インプロセス MongoDB 使用時の模擬往復遅延")
+    parser.add_argument("--pool-size", type=int, default=10, help="インプロセス MongoDB 使用時の同時往復数上限")
+    parser.add_argument("--mongo-uri", default=None)
+    asyncio.run(main(parser.parse_args()))
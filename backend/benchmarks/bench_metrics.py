@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+メトリクス記録のオーバーヘッド計測（observe 単体 / ASGI ミドルウェアあり・なし）
+
+使い方 (backend ディレクトリで実行、MongoDB 不要):
+    python -m benchmarks.bench_metrics --iterations 200000 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+
+from app.middleware.metrics import MetricsMiddleware
+from app.utils.metrics import MetricsRegistry
+
+
+async def plain_app(scope, receive, send):
+    scope["endpoint"] = plain_app
+    scope["path_params"] = {"company_id": scope["path"].rsplit("/", 1)[-1]}
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def bench_observe(iterations: int) -> float:
+    histogram = MetricsRegistry().histogram("bench_seconds", "bench", ["method", "route", "status"])
+    start = time.perf_counter()
+    for i in range(iterations):
+        histogram.observe(0.003, "GET", "/api/v1/companies/{company_id}", "200")
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+async def bench_asgi(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {"type": "http", "method": "GET", "path": f"/api/v1/companies/{i:024x}", "headers": []}
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(iterations: int, requests: int) -> None:
+    histogram = MetricsRegistry().histogram("http_seconds", "bench", ["method", "route", "status"])
+    observe_ns = bench_observe(iterations)
+    without = await bench_asgi(plain_app, requests)
+    with_metrics = await bench_asgi(MetricsMiddleware(plain_app, histogram), requests)
+    print(f"observe():          {observe_ns:8.0f} ns")
+    print(f"ASGI without:       {without:8.2f} us/request")
+    print(f"ASGI with metrics:  {with_metrics:8.2f} us/request  (+{with_metrics - without:.2f} us)")
+    print(f"series: {len(histogram.values())}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.requests))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+企業検索ベンチマーク: 従来の $regex 検索 vs n-gram 索引検索
+
+使い方 (backend ディレクトリで実行、MongoDB が必要):
+    python -m benchmarks.bench_search --size 100000 --queries 200
+
+MONGODB_URI の `<MONGODB_DB>_bench` データベースを使用し、終了時に削除します。
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
+
+from app.config import MONGODB_URI, MONGODB_DB
+from app.services.company_search import build_search_pipeline
+from app.utils.ngram import index_tokens
+
+KANJI = "大阪東京京都名古屋福岡札幌仙台横浜神戸広島商事物産建設工業電機製作所興業運輸産業"
+KATAKANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+
+
+def synthetic_company(i: int, rng: random.Random) -> dict:
+    name = "".join(rng.choice(KANJI) for _ in range(rng.randint(3, 8)))
+    kana = "".join(rng.choice(KATAKANA) for _ in range(rng.randint(4, 12)))
+    code = f"BENCH-{i:07d}"
+    return {
+        "companyName": name,
+        "companyNameKana": kana,
+        "companyCode": code,
+        "searchTokens": index_tokens(name, kana, code),
+        "created_at": datetime(2024, 1, 1) + timedelta(seconds=i),
+    }
+
+
+def regex_query(search: str) -> dict:
+    # 従来の list_companies と同じ非アンカー・大文字小文字無視の正規表現
+    return {
+        "$or": [
+            {"companyName": {"$regex": search, "$options": "i"}},
+            {"companyCode": {"$regex": search, "$options": "i"}},
+        ]
+    }
+
+
+async def seed(col, size: int, rng: random.Random) -> list:
+    await col.drop()
+    await col.create_indexes([
+        IndexModel([("companyCode", 1)], name="idx_company_code", unique=True),
+        IndexModel([("searchTokens", 1)], name="idx_search_tokens"),
+    ])
+    names = []
+    batch = []
+    for i in range(size):
+        doc = synthetic_company(i, rng)
+        names.append(doc["companyName"])
+        batch.append(doc)
+        if len(batch) == 5000:
+            await col.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await col.insert_many(batch, ordered=False)
+    return names
+
+
+async def timed(fn, queries) -> list:
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        await fn(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: list) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<8} mean={statistics.mean(samples):8.2f}ms  p50={statistics.median(samples):8.2f}ms  p95={p95:8.2f}ms")
+
+
+async def main(size: int, n_queries: int, limit: int) -> None:
+    rng = random.Random(42)
+    client = AsyncIOMotorClient(MONGODB_URI)
+    col = client[f"{MONGODB_DB}_bench"]["companies"]
+    try:
+        print(f"[Bench] seeding {size} companies ...")
+        names = await seed(col, size, rng)
+        queries = []
+        for _ in range(n_queries):
+            name = rng.choice(names)
+            start = rng.randint(0, max(0, len(name) - 2))
+            queries.append(name[start:start + rng.randint(2, 4)])
+
+        async def run_regex(q):
+            await col.find(regex_query(q)).limit(limit).to_list(length=limit)
+
+        async def run_ngram(q):
+            await col.aggregate(build_search_pipeline(q, 0, limit)).to_list(length=limit)
+
+        report("regex", await timed(run_regex, queries))
+        report("ngram", await timed(run_ngram, queries))
+
+        sample = queries[0]
+        regex_plan = await col.find(regex_query(sample)).explain()
+        ngram_plan = await client[f"{MONGODB_DB}_bench"].command(
+            "explain",
+            {"aggregate": "companies", "pipeline": build_search_pipeline(sample, 0, limit), "cursor": {}},
+            verbosity="executionStats",
+        )
+        print(f"[Bench] regex docsExamined={regex_plan['executionStats']['totalDocsExamined']}")
+        ngram_uses_index = "idx_search_tokens" in str(ngram_plan)
+        print(f"[Bench] ngram uses idx_search_tokens={ngram_uses_index}")
+    finally:
+        await client.drop_database(f"{MONGODB_DB}_bench")
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.size, args.queries, args.limit))
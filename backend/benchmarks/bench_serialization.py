@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+企業ドキュメント1件あたりの読み出し・シリアライズコスト（µs/件）
+
+- legacy: 生ドキュメント → Beanie Company（検証）→ CompanyResponse（再検証）
+          → FastAPI の response_model 検証 → JSONResponse 描画
+- fast:   生ドキュメント → company_page_json（orjson、再検証なし）
+
+使い方 (backend ディレクトリで実行、インプロセス MongoDB を使用):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_serialization --docs 100 --rounds 50
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.routes.companies import _to_response_model
+from app.models.company_document import Company as CompanyDoc
+from app.schemas.company import CompanyPage
+from app.services.company_serializer import READ_PROJECTION, company_page_json
+from benchmarks.bench_validation import sample_row
+from benchmarks.common import init_models
+
+
+def raw_documents(n: int) -> list:
+    base = datetime(2024, 4, 1)
+    rows = []
+    for i in range(n):
+        row = sample_row(i)
+        row.update(_id=ObjectId(), created_at=base + timedelta(seconds=i), updated_at=base + timedelta(seconds=i))
+        rows.append({k: v for k, v in row.items() if k not in READ_PROJECTION})
+    return rows
+
+
+def legacy(rows: list) -> bytes:
+    docs = [CompanyDoc.model_validate({**r, "ownerLoginPassword": "x"}) for r in rows]
+    page = CompanyPage(items=[_to_response_model(d) for d in docs], next_cursor=None)
+    # FastAPI は response_model で戻り値を再検証してから描画する
+    page = CompanyPage.model_validate(page.model_dump())
+    return JSONResponse(content=jsonable_encoder(page)).body
+
+
+def fast(rows: list) -> bytes:
+    return company_page_json(rows, None)
+
+
+def per_doc_us(fn, rows: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(rows)
+    return (time.perf_counter() - start) / (rounds * len(rows)) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=100, help="1ページの件数")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    # Company の生成には Beanie の初期化が必要
+    asyncio.run(init_models())
+    rows = raw_documents(args.docs)
+    before = per_doc_us(legacy, rows, args.rounds)
+    after = per_doc_us(fast, rows, args.rounds)
+    print(f"legacy: {before:8.1f} µs/doc")
+    print(f"fast:   {after:8.1f} µs/doc  ({before / after:.1f}x)")
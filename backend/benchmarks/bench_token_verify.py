@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+KeycloakService.verify_token のマイクロベンチマーク（コールド vs ウォーム）
+
+使い方 (backend ディレクトリで実行、Keycloak 不要):
+    python -m benchmarks.bench_token_verify --iterations 2000
+"""
+import argparse
+import asyncio
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.services.keycloak_service import KeycloakService
+
+
+def make_jwks_and_token(kid: str = "bench"):
+    """RS256 の鍵を生成し、(JWKS, その鍵で署名したトークン) を返します。"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    jwks = {"keys": [{**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid}]}
+    token = jwt.encode(
+        {"sub": "bench", "preferred_username": "bench", "exp": int(time.time()) + 3600},
+        private_pem,
+        algorithm="RS256",
+        headers={"kid": kid},
+    )
+    return jwks, token
+
+
+def make_service_and_token():
+    jwks, token = make_jwks_and_token()
+    service = KeycloakService()
+    service.load_jwks(jwks)
+    return service, token
+
+
+async def run(service: KeycloakService, token: str, iterations: int, warm: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not warm:
+            service.clear_token_cache()
+        await service.verify_token(token)
+    return iterations / (time.perf_counter() - start)
+
+
+async def main(iterations: int) -> None:
+    service, token = make_service_and_token()
+    cold = await run(service, token, iterations, warm=False)
+    warm = await run(service, token, iterations, warm=True)
+    print(f"cold: {cold:12.0f} verifications/s")
+    print(f"warm: {warm:12.0f} verifications/s  (x{warm / cold:.1f})")
+    print(f"cache: {service.token_cache_stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
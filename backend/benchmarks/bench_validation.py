@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+企業データ検証のベンチマーク（rows/秒）
+
+- patterns: パターン文字列で毎回 regex.match（従来）vs 事前コンパイル済みパターン
+- create:   CompanyCreate 検証 + Company ドキュメント再検証（従来の作成経路）vs 1回だけ検証
+- batch:    validate_many による一括検証
+
+使い方 (backend ディレクトリで実行、インプロセス MongoDB を使用):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_validation --rows 5000
+"""
+import argparse
+import asyncio
+import time
+
+import regex as re
+
+from app.models.company_document import Company as CompanyDoc
+from app.schemas import company as company_schema
+from app.schemas.company import CompanyCreate
+from app.services.company_validation import build_company_document, validate_company, validate_many
+from benchmarks.common import init_models
+
+SAMPLE_VALUES = {
+    "COMPANY_NAME_RE": "大阪商事",
+    "COMPANY_NAME_KANA_RE": "オオサカショウジ",
+    "COMPANY_CODE_RE": "OSK-0001",
+    "CONTACT_NAME_RE": "山田 太郎",
+    "CONTACT_NAME_KANA_RE": "ヤマダ タロウ",
+    "DIGITS_RE": "0612345678",
+    "FISCAL_MONTHS_RE": "02-03",
+    "PASSWORD_RE": "Abc123!",
+    "STREET_ADDRESS_RE": "梅田1-1-1",
+    "ADDRESS_LINE_RE": "XXビル 10F",
+}
+
+
+def sample_row(i: int) -> dict:
+    return {
+        "companyName": "大阪商事",
+        "companyNameKana": "オオサカショウジ",
+        "companyCode": f"OSK-{i:06d}",
+        "contactName": "山田太郎",
+        "contactNameKana": "ヤマダタロウ",
+        "phoneNumber": "0612345678",
+        "postalCode": "5300001",
+        "location": {
+            "prefecture": "大阪府",
+            "city": "大阪市北区",
+            "streetAddress": "梅田1-1-1",
+            "addressLine": "XXビル 10F",
+        },
+        "months": "02-03",
+        "ownerLoginEmail": f"owner{i}@example.com",
+        "ownerLoginPassword": "Abc123!",
+        "appIntegrationEnabled": True,
+        "safetyConfirmationEnabled": True,
+        "occupationalDoctorIntegrationEnabled": False,
+        "employeeChatEnabled": True,
+    }
+
+
+def rate(fn, n: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def bench_patterns(n: int) -> None:
+    compiled = {name: getattr(company_schema, name) for name in SAMPLE_VALUES}
+
+    def by_string():
+        for _ in range(n):
+            for name, value in SAMPLE_VALUES.items():
+                re.match(compiled[name].pattern, value)
+
+    def precompiled():
+        for _ in range(n):
+            for name, value in SAMPLE_VALUES.items():
+                compiled[name].match(value)
+
+    print(f"patterns  string : {rate(by_string, n):10.0f} rows/s")
+    print(f"patterns  compiled: {rate(precompiled, n):10.0f} rows/s")
+
+
+def bench_create(rows: list) -> None:
+    def legacy():
+        # 従来: スキーマで検証した後、入力値から Company を組み立てて再検証
+        for row in rows:
+            CompanyCreate(**row)
+            CompanyDoc(**row)
+
+    def engine():
+        for row in rows:
+            build_company_document(validate_company(row))
+
+    print(f"create    legacy : {rate(legacy, len(rows)):10.0f} rows/s")
+    print(f"create    engine : {rate(engine, len(rows)):10.0f} rows/s")
+
+
+def bench_batch(rows: list) -> None:
+    numbered = list(enumerate(rows, start=1))
+    print(f"batch     validate_many: {rate(lambda: validate_many(numbered), len(rows)):10.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    # Company ドキュメントの生成には Beanie の初期化が必要
+    asyncio.run(init_models())
+    rows = [sample_row(i) for i in range(args.rows)]
+    bench_patterns(args.rows)
+    bench_create(rows)
+    bench_batch(rows)
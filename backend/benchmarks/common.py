@@ -0,0 +1,31 @@
+from typing import Optional
+
+from beanie import init_beanie
+
+from app.config import MONGODB_URI, MONGODB_DB
+from app.models.company_document import Company
+
+
+async def init_models(use_mongo: Optional[str] = None, skip_indexes: bool = False):
+    """Beanie を初期化します。
+
+    use_mongo に接続文字列を渡すと実際の MongoDB を使い、省略時は
+    mongomock-motor のインプロセス MongoDB を使います（benchmarks/requirements.txt）。
+    skip_indexes=True の場合は索引を作成しません（大量投入の後で作成する場合）。
+    """
+    if use_mongo:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(use_mongo)
+        database = client[f"{MONGODB_DB}_bench"]
+        await init_beanie(database=database, document_models=[Company], skip_indexes=skip_indexes)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+
+        client = AsyncMongoMockClient()
+        database = client[f"{MONGODB_DB}_bench"]
+        await init_beanie(database=database, document_models=[Company], skip_indexes=skip_indexes)
+    return client, database
+
+
+DEFAULT_MONGODB_URI = MONGODB_URI
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+API のホットパスのベンチマークスイート（結果を JSON で保存し、コミット間で比較する）
+
+- validation: CompanyCreate（app/schemas/company.py のバリデーター）/ validate_company
+- conversion: _to_response_model / _to_gql_company（Beanie ドキュメントから）と生ドキュメントからの変換
+- auth:       KeycloakService.verify_token（偽の JWKS サーバー）
+              cold = JWKS 取得から / key = 鍵はキャッシュ済み / cached = 検証済みトークンのキャッシュ
+- api:        ASGI アプリ経由の一覧・1件取得（キャッシュあり/なし）・作成（--sizes の件数ごと）
+
+MongoDB・Keycloak は不要です（mongomock-motor と httpx.MockTransport を使用）。
+インプロセス MongoDB は索引を使わず全件を走査するため、api の値は同じ環境でのコミット間比較に使ってください。
+作成の計測では bcrypt のコストを --bcrypt-rounds（既定 4）に下げます。
+
+使い方 (backend ディレクトリで実行):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.suite --sizes 100 1000 10000 --output benchmarks/results/head.json
+    python -m benchmarks.suite --compare benchmarks/results/base.json benchmarks/results/head.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.api.routes.companies import _to_response_model
+from app.graphql.resolvers.company import _to_gql_company, _to_gql_company_from_raw
+from app.main import app
+from app.migrations.indexes import apply_index_migrations
+from app.models.company_document import Company as CompanyDoc
+from app.schemas.company import CompanyCreate
+from app.services.company_cache import company_cache
+from app.services.company_serializer import company_response_dict
+from app.services.company_validation import build_company_document, validate_company
+from app.services.keycloak_service import KeycloakService, keycloak_service
+from app.services.password_service import password_service
+from benchmarks.bench_serialization import raw_documents
+from benchmarks.bench_token_verify import make_jwks_and_token
+from benchmarks.bench_validation import sample_row
+from benchmarks.common import init_models
+
+# 計測結果: ケース名 -> {group, params, iterations, mean_us, p50_us, p95_us, ops_per_sec}
+Results = Dict[str, Dict[str, Any]]
+
+
+def summarize(group: str, params: Dict[str, Any], samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    return {
+        "group": group,
+        "params": params,
+        "iterations": len(samples),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 3),
+        "p95_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e6, 3),
+        "ops_per_sec": round(len(samples) / sum(samples), 1),
+    }
+
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int) -> List[float]:
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def measure_async(fn: Callable[[int], Awaitable[Any]], iterations: int, warmup: int) -> List[float]:
+    for i in range(warmup):
+        await fn(i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_validation(results: Results, iterations: int) -> None:
+    rows = [sample_row(i) for i in range(iterations)]
+    cases = {
+        "validation.schema": lambda i: CompanyCreate(**rows[i % len(rows)]),
+        "validation.engine": lambda i: validate_company(rows[i % len(rows)]),
+    }
+    for name, fn in cases.items():
+        results[name] = summarize("validation", {}, measure(fn, iterations, warmup=iterations // 10))
+
+
+def bench_conversion(results: Results, iterations: int) -> None:
+    raws = raw_documents(100)
+    docs = [CompanyDoc.model_validate({**raw, "ownerLoginPassword": "x"}) for raw in raws]
+    cases = {
+        "conversion.response_model": lambda i: _to_response_model(docs[i % len(docs)]),
+        "conversion.gql_company": lambda i: _to_gql_company(docs[i % len(docs)]),
+        "conversion.response_dict_raw": lambda i: company_response_dict(raws[i % len(raws)]),
+        "conversion.gql_company_raw": lambda i: _to_gql_company_from_raw(raws[i % len(raws)]),
+    }
+    for name, fn in cases.items():
+        results[name] = summarize("conversion", {}, measure(fn, iterations, warmup=iterations // 10))
+
+
+def fake_jwks_transport(jwks: Dict[str, Any]) -> httpx.MockTransport:
+    """Keycloak の /certs だけに応答する偽のサーバー"""
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/protocol/openid-connect/certs"):
+            return httpx.Response(200, json=jwks)
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handle)
+
+
+async def bench_auth(results: Results, iterations: int) -> None:
+    jwks, token = make_jwks_and_token()
+
+    async def cold(i: int) -> None:
+        # 毎回新しいサービス: JWKS の取得・鍵の構築から
+        service = KeycloakService(transport=fake_jwks_transport(jwks))
+        await service.verify_token(token)
+        await service.shutdown()
+
+    service = KeycloakService(transport=fake_jwks_transport(jwks))
+
+    async def key_cached(i: int) -> None:
+        service.clear_token_cache()
+        await service.verify_token(token)
+
+    async def token_cached(i: int) -> None:
+        await service.verify_token(token)
+
+    cases = {"auth.verify_cold": cold, "auth.verify_key_cached": key_cached, "auth.verify_token_cached": token_cached}
+    for name, fn in cases.items():
+        n = max(1, iterations // 10) if fn is cold else iterations
+        results[name] = summarize("auth", {}, await measure_async(fn, n, warmup=max(1, n // 10)))
+    await service.shutdown()
+
+
+async def seed(size: int) -> List[str]:
+    company = validate_company(sample_row(0))
+    hashed = password_service.hash_sync(company.ownerLoginPassword)
+    docs = [
+        build_company_document(company, companyCode=f"SEED-{i:07d}", ownerLoginPassword=hashed)
+        for i in range(size)
+    ]
+    result = await CompanyDoc.insert_many(docs)
+    return [str(i) for i in result.inserted_ids]
+
+
+async def bench_api(results: Results, sizes: List[int], iterations: int) -> None:
+    # 認証は実際の検証経路（JWKS は偽のサーバーから読み込み済みとする）
+    jwks, token = make_jwks_and_token()
+    keycloak_service.load_jwks(jwks)
+    headers = {"Authorization": f"Bearer {token}"}
+    cache_ttl = company_cache.ttl
+
+    for size in sizes:
+        # 索引は投入後に作成する（インプロセス MongoDB は1件ごとの一意制約チェックが遅い）
+        _, database = await init_models(skip_indexes=True)
+        ids = await seed(size)
+        await apply_index_migrations(database)
+        target = ids[len(ids) // 2]
+        params = {"size": size}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def list_page(i: int) -> None:
+                response = await client.get("/api/v1/companies/", params={"limit": 20}, headers=headers)
+                response.raise_for_status()
+
+            async def get_one(i: int) -> None:
+                response = await client.get(f"/api/v1/companies/{target}", headers=headers)
+                response.raise_for_status()
+
+            codes = itertools.count()
+
+            async def create(i: int) -> None:
+                # ウォームアップと本計測で companyCode が重複しないよう通し番号を使う
+                row = sample_row(i)
+                row["companyCode"] = f"NEW-{size:06d}-{next(codes):06d}"
+                response = await client.post("/api/v1/companies/", json=row, headers=headers)
+                response.raise_for_status()
+
+            warmup = max(1, iterations // 10)
+            results[f"api.list[size={size}]"] = summarize("api", params, await measure_async(list_page, iterations, warmup))
+            company_cache.ttl = 0
+            results[f"api.get_uncached[size={size}]"] = summarize("api", params, await measure_async(get_one, iterations, warmup))
+            company_cache.ttl = cache_ttl
+            results[f"api.get[size={size}]"] = summarize("api", params, await measure_async(get_one, iterations, warmup))
+            # 作成は件数を増やすため最後に計測する
+            results[f"api.create[size={size}]"] = summarize("api", params, await measure_async(create, iterations, warmup))
+        print(f"[Bench] api size={size} done", file=sys.stderr)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+async def run_suite(sizes: List[int], iterations: int, api_iterations: int, groups: List[str]) -> Results:
+    results: Results = {}
+    # Company ドキュメントの生成には Beanie の初期化が必要
+    await init_models()
+    if "validation" in groups:
+        bench_validation(results, iterations)
+    if "conversion" in groups:
+        bench_conversion(results, iterations)
+    if "auth" in groups:
+        await bench_auth(results, iterations)
+    if "api" in groups:
+        await bench_api(results, sizes, api_iterations)
+    return results
+
+
+def compare(base_path: str, head_path: str, threshold: float) -> int:
+    """2つの結果の mean_us を比較します（threshold を超えて遅くなったケースがあれば 1 を返す）。"""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(head_path, encoding="utf-8") as f:
+        head = json.load(f)
+    print(f"base: {base['meta'].get('revision')}  head: {head['meta'].get('revision')}")
+    regressions = 0
+    for name, case in head["results"].items():
+        before = base["results"].get(name)
+        if before is None:
+            print(f"{name:40s} {'':>12s} {case['mean_us']:12.1f} µs  (new)")
+            continue
+        change = case["mean_us"] / before["mean_us"] - 1
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressions += 1
+        print(f"{name:40s} {before['mean_us']:12.1f} {case['mean_us']:12.1f} µs  {change:+7.1%}{mark}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="api の計測時のコレクション件数")
+    parser.add_argument("--iterations", type=int, default=2000, help="マイクロベンチマークの回数")
+    parser.add_argument("--api-iterations", type=int, default=50, help="api の各ケースの回数")
+    parser.add_argument("--groups", nargs="+", default=["validation", "conversion", "auth", "api"])
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    parser.add_argument("--output", help="結果の JSON（省略時は benchmarks/results/<revision>.json）")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="保存済みの2つの結果を比較")
+    parser.add_argument("--threshold", type=float, default=0.2, help="回帰とみなす mean_us の増加率")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare, threshold=args.threshold)
+
+    password_service.rounds = args.bcrypt_rounds
+    revision = git_revision()
+    results = asyncio.run(run_suite(args.sizes, args.iterations, args.api_iterations, args.groups))
+    report = {
+        "meta": {
+            "revision": revision,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "api_iterations": args.api_iterations,
+            "sizes": args.sizes,
+            "bcrypt_rounds": args.bcrypt_rounds,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join("benchmarks", "results", f"{(revision or 'local')[:12]}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    for name, case in results.items():
+        print(f"{name:40s} {case['mean_us']:12.1f} µs  p95 {case['p95_us']:12.1f} µs  {case['ops_per_sec']:10.0f}/s")
+    print(f"saved: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+既存の企業ドキュメントに検索用フィールドを一括付与するワンショットスクリプト
+
+使い方 (backend ディレクトリで実行):
+    python -m scripts.backfill_search
+"""
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.database import init_db, close_db
+from app.models.company_document import (
+    Company,
+    SEARCH_KEY_FIELDS,
+    SEARCH_TOKEN_FIELDS,
+    search_fields,
+)
+
+BATCH_SIZE = 1000
+
+
+async def backfill() -> int:
+    collection = Company.get_motor_collection()
+    projection = {f: 1 for f in SEARCH_TOKEN_FIELDS + SEARCH_KEY_FIELDS}
+    updated = 0
+    ops = []
+    async for raw in collection.find({}, projection, batch_size=BATCH_SIZE):
+        ops.append(UpdateOne({"_id": raw["_id"]}, {"$set": search_fields(raw)}))
+        if len(ops) >= BATCH_SIZE:
+            updated += (await collection.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await collection.bulk_write(ops, ordered=False)).modified_count
+    return updated
+
+
+async def main() -> None:
+    await init_db()
+    try:
+        updated = await backfill()
+        print(f"[Backfill] updated {updated} documents")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+KEN_ALL 形式の CSV（日本郵便の郵便番号データ）から郵便番号索引を生成するスクリプト
+
+使い方 (backend ディレクトリで実行):
+    python -m scripts.build_postal_index KEN_ALL.CSV
+    python -m scripts.build_postal_index app/data/ken_all_sample.csv --encoding utf-8
+
+日本郵便配布の KEN_ALL.CSV は Shift_JIS (cp932) です。UTF-8 版は --encoding utf-8 を指定してください。
+出力先の既定は POSTAL_INDEX_PATH です（稼働中のプロセスは再起動後に新しい索引を読み込みます）。
+"""
+import argparse
+import os
+
+from app.config import POSTAL_INDEX_PATH
+from app.services.postal_index import PostalIndex, build_index, parse_ken_all
+
+
+def build(source: str, output: str, encoding: str) -> int:
+    with open(source, encoding=encoding, newline="") as f:
+        data = build_index(parse_ken_all(f))
+    # 書き込み途中の索引を読まれないよう、一時ファイルから置き換える
+    tmp = output + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, output)
+    index = PostalIndex.open(output)
+    try:
+        return len(index)
+    finally:
+        index.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="KEN_ALL 形式の CSV")
+    parser.add_argument("-o", "--output", default=POSTAL_INDEX_PATH, help="出力する索引ファイル")
+    parser.add_argument("--encoding", default="cp932", help="CSV の文字コード（既定: cp932）")
+    args = parser.parse_args()
+    count = build(args.source, args.output, args.encoding)
+    print(f"[Postal] wrote {count} records to {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
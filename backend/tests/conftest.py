@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+# 登録時の入力（CompanyCreate / 一括登録の1行）
+COMPANY_INPUT = {
+    "companyName": "大阪商事",
+    "companyNameKana": "オオサカショウジ",
+    "companyCode": "OSK-0001",
+    "contactName": "山田太郎",
+    "contactNameKana": "ヤマダタロウ",
+    "phoneNumber": "0612345678",
+    "postalCode": "5300001",
+    "location": {"prefecture": "大阪府", "city": "大阪市北区", "streetAddress": "梅田1-1-1", "addressLine": "XXビル 10F"},
+    "months": "02-03",
+    "ownerLoginEmail": "owner@example.com",
+    "ownerLoginPassword": "Abc123!",
+    "appIntegrationEnabled": True,
+    "safetyConfirmationEnabled": True,
+    "occupationalDoctorIntegrationEnabled": False,
+    "employeeChatEnabled": True,
+}
+
+
+def _company_input(**overrides):
+    data = {**COMPANY_INPUT, "location": dict(COMPANY_INPUT["location"])}
+    data.update(overrides)
+    return data
+
+
+def _raw_company(**overrides):
+    raw = _company_input(
+        _id=ObjectId(),
+        ownerLoginPassword="$2b$12$hash",
+        created_at=datetime(2024, 4, 1, 9, 30, 15, 123000),
+        updated_at=datetime(2024, 4, 1),
+    )
+    raw.update(overrides)
+    return raw
+
+
+@pytest.fixture(scope="session")
+def company_input():
+    """登録時の入力を作る関数（キーワード引数で項目を上書き）"""
+    return _company_input
+
+
+@pytest.fixture(scope="session")
+def raw_company():
+    """MongoDB に保存された状態の生ドキュメントを作る関数（キーワード引数で項目を上書き）"""
+    return _raw_company
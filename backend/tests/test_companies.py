@@ -42,10 +42,21 @@ def test_create_and_get_company():
         assert data["companyCode"] == payload["companyCode"]
         assert "id" in data
 
-        # List
-        res_list = client.get("/api/v1/companies/")
-        assert res_list.status_code == 200
-        assert any(c["companyCode"] == payload["companyCode"] for c in res_list.json())
+        # List (cursor pagination)
+        codes = []
+        cursor = None
+        while True:
+            params = {"limit": 100}
+            if cursor:
+                params["cursor"] = cursor
+            res_list = client.get("/api/v1/companies/", params=params)
+            assert res_list.status_code == 200
+            page = res_list.json()
+            codes.extend(c["companyCode"] for c in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert payload["companyCode"] in codes
 
         # Duplicate code/email should fail
         res_dup = client.post("/api/v1/companies/", json=payload)
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.services import company_cache as cache_module
+from app.services.company_cache import CompanyCache, MemoryCacheBackend, RedisCacheBackend, company_etag
+from app.utils.etag import not_modified
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """redis.asyncio.Redis の代わり（get / mget / set(px=) / delete のみ、期限は clock で判定）"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+
+    async def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.clock():
+            del self.data[key]
+            return None
+        return value
+
+    async def mget(self, keys):
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key, value, px=None):
+        assert isinstance(value, bytes)
+        self.data[key] = (value, self.clock() + px / 1000 if px else None)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture()
+def db(monkeypatch):
+    rows = {}
+    calls = []
+
+    async def get_company_rows(ids):
+        calls.append(list(ids))
+        return {i: rows[i] for i in ids if i in rows}
+
+    monkeypatch.setattr(cache_module, "get_company_rows", get_company_rows)
+    return rows, calls
+
+
+@pytest.mark.parametrize("backend_kind", ["memory", "redis"])
+def test_read_through_ttl_and_invalidation(db, backend_kind, raw_company):
+    rows, calls = db
+    raw = raw_company()
+    company_id = str(raw["_id"])
+    rows[company_id] = raw
+    clock = FakeClock()
+    if backend_kind == "memory":
+        backend = MemoryCacheBackend(clock=clock)
+    else:
+        backend = RedisCacheBackend(FakeRedis(clock))
+    cache = CompanyCache(backend, ttl=60)
+
+    async def run():
+        assert await cache.get(company_id) == raw
+        # 2回目以降は DB を読まない（BSON から ObjectId / datetime を復元）
+        assert await cache.get(company_id) == raw
+        assert len(calls) == 1
+        await cache.invalidate(company_id)
+        await cache.get(company_id)
+        assert len(calls) == 2
+        clock.now = 61
+        await cache.get(company_id)
+        assert len(calls) == 3
+        # 未存在の ID はキャッシュしない
+        assert await cache.get("000000000000000000000000") is None
+
+    asyncio.run(run())
+
+
+def test_get_many_fetches_only_misses(db, raw_company):
+    rows, calls = db
+    a, b = raw_company(), raw_company(companyCode="OSK-0002")
+    rows.update({str(a["_id"]): a, str(b["_id"]): b})
+    cache = CompanyCache(MemoryCacheBackend(), ttl=60)
+
+    async def run():
+        await cache.get(str(a["_id"]))
+        found = await cache.get_many([str(a["_id"]), str(b["_id"]), str(a["_id"])])
+        assert found == {str(a["_id"]): a, str(b["_id"]): b}
+
+    asyncio.run(run())
+    assert calls == [[str(a["_id"])], [str(b["_id"])]]
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryCacheBackend(max_entries=2)
+
+    async def run():
+        for key in ("a", "b"):
+            await backend.set(key, b"1", ttl=60)
+        await backend.get("a")
+        await backend.set("c", b"1", ttl=60)
+        # 最近使われていない "b" から追い出される
+        return [await backend.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [b"1", None, b"1"]
+
+
+def test_etag_changes_with_updated_at_and_matches_if_none_match(raw_company):
+    raw = raw_company()
+    etag = company_etag(raw)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert company_etag(dict(raw)) == etag
+    assert company_etag(raw_company(_id=raw["_id"], updated_at=raw["created_at"])) != etag
+    assert not_modified(etag, etag)
+    assert not_modified(f'"other", W/{etag}', etag)
+    assert not_modified("*", etag)
+    assert not not_modified(None, etag)
+    assert not not_modified('"other"', etag)
@@ -0,0 +1,58 @@
+import asyncio
+
+from app.services import company_count
+from app.services.company_count import CountCache, count_companies
+from app.services.company_reader import INCOMPATIBLE_MARKER
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingCollection:
+    def __init__(self):
+        self.estimated = 0
+        self.counted = []
+
+    async def estimated_document_count(self):
+        self.estimated += 1
+        return 1000
+
+    async def count_documents(self, query):
+        self.counted.append(query)
+        # 非互換と判定済みの件数（条件なしの推定件数から差し引かれる）
+        if query == INCOMPATIBLE_MARKER:
+            return 3
+        return 42
+
+
+def test_count_uses_estimate_without_filter_and_caches_filtered_counts(monkeypatch):
+    collection = CountingCollection()
+    monkeypatch.setattr(company_count.CompanyDoc, "get_motor_collection", classmethod(lambda cls: collection))
+    clock = FakeClock()
+    cache = CountCache(ttl=30, clock=clock)
+
+    async def run():
+        assert await count_companies({}, cache) == 997
+        for _ in range(3):
+            assert await count_companies({"location.prefecture": "大阪府"}, cache) == 42
+        clock.now = 31
+        assert await count_companies({"location.prefecture": "大阪府"}, cache) == 42
+
+    asyncio.run(run())
+    assert collection.estimated == 1
+    # TTL 内の2回目以降はキャッシュ、期限切れで再集計
+    assert collection.counted[0] == INCOMPATIBLE_MARKER
+    assert len(collection.counted) == 3
+
+
+def test_count_cache_is_bounded():
+    cache = CountCache(ttl=30, max_entries=2, clock=FakeClock())
+    for i in range(3):
+        cache.set(cache.key({"i": i}), i)
+    assert cache.get(cache.key({"i": 0})) is None
+    assert cache.get(cache.key({"i": 2})) == 2
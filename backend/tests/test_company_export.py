@@ -0,0 +1,93 @@
+import asyncio
+import gzip
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.services.company_export import build_export_filter, csv_stream, ndjson_export_stream
+from app.services.company_import import parse_csv
+from app.utils.streaming import gzip_stream
+
+BASE = datetime(2024, 4, 1)
+
+
+async def synthetic_cursor(raw_company, n):
+    # Motor カーソルの代わりに1件ずつ生成する（全件をメモリに持たない）
+    for i in range(n):
+        yield raw_company(
+            companyCode=f"OSK-{i:07d}",
+            ownerLoginEmail=f"owner{i}@example.com",
+            safetyConfirmationEnabled=False,
+            created_at=BASE + timedelta(seconds=i),
+            updated_at=BASE + timedelta(seconds=i),
+        )
+
+
+def consume(stream):
+    async def run():
+        total = 0
+        async for chunk in stream:
+            total += len(chunk)
+        return total
+
+    return asyncio.run(run())
+
+
+def collect(stream):
+    async def run():
+        return b"".join([chunk async for chunk in stream])
+
+    return asyncio.run(run())
+
+
+def test_build_export_filter():
+    query = build_export_filter(
+        prefecture="大阪府",
+        flags={"appIntegrationEnabled": True, "employeeChatEnabled": None},
+        created_from=BASE,
+        created_to=BASE + timedelta(days=1),
+    )
+    assert query == {
+        "location.prefecture": "大阪府",
+        "appIntegrationEnabled": True,
+        "created_at": {"$gte": BASE, "$lt": BASE + timedelta(days=1)},
+    }
+    assert build_export_filter() == {}
+
+
+def test_csv_export_can_be_imported_again(raw_company):
+    body = collect(csv_stream(synthetic_cursor(raw_company, 3))).decode()
+    rows = [data for _, data in parse_csv(body.splitlines())]
+    assert [r["companyCode"] for r in rows] == ["OSK-0000000", "OSK-0000001", "OSK-0000002"]
+    assert rows[0]["location"]["city"] == "大阪市北区"
+    assert rows[0]["safetyConfirmationEnabled"] is False
+    assert "ownerLoginPassword" not in rows[0]
+
+
+def test_gzip_ndjson_export_round_trips(raw_company):
+    body = gzip.decompress(collect(gzip_stream(ndjson_export_stream(synthetic_cursor(raw_company, 5)))))
+    records = [json.loads(line) for line in body.splitlines()]
+    assert len(records) == 5
+    assert records[4]["created_at"] == (BASE + timedelta(seconds=4)).isoformat()
+    assert records[0]["location"]["prefecture"] == "大阪府"
+
+
+def measure(stream):
+    tracemalloc.start()
+    try:
+        written = consume(stream)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return written, peak
+
+
+def test_export_memory_does_not_grow_with_row_count(raw_company):
+    rows = 20_000
+    written, peak = measure(csv_stream(synthetic_cursor(raw_company, rows)))
+    # 出力全体（数 MB）に対し、ピークは書き出しバッファ数個分に収まる
+    assert written > 5_000_000
+    assert peak < 1024 * 1024
+
+    _, gzip_peak = measure(gzip_stream(ndjson_export_stream(synthetic_cursor(raw_company, rows))))
+    assert gzip_peak < 1024 * 1024
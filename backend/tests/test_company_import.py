@@ -0,0 +1,149 @@
+import asyncio
+import io
+import json
+import threading
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.services import company_import
+from app.services.company_import import import_companies, parse_csv, parse_ndjson
+
+
+class RecordingInsert:
+    """CompanyDoc.insert_many の代わりに、呼び出しごとのドキュメントを記録する"""
+
+    def __init__(self, write_errors=None):
+        self.calls = []
+        self.write_errors = write_errors or []
+
+    async def __call__(self, docs, ordered=True):
+        self.calls.append([doc.companyCode for doc in docs])
+        if self.write_errors:
+            raise BulkWriteError({"writeErrors": self.write_errors, "nInserted": len(docs) - len(self.write_errors)})
+
+
+@pytest.fixture()
+def insert(monkeypatch):
+    recorder = RecordingInsert()
+
+    async def fast_hash(password):
+        return "$2b$12$hash"
+
+    async def invalidate(*ids):
+        pass
+
+    monkeypatch.setattr(company_import.CompanyDoc, "insert_many", recorder)
+    monkeypatch.setattr(company_import.import_password_service, "hash", fast_hash)
+    monkeypatch.setattr(company_import.company_cache, "invalidate", invalidate)
+    return recorder
+
+
+def test_parse_ndjson_reports_bad_lines_without_stopping():
+    rows = list(parse_ndjson(['{"companyCode": "A-1"}\n', "\n", "{oops\n", "[1]\n", '{"companyCode": "A-2"}']))
+    assert [r[0] for r in rows] == [1, 3, 4, 5]
+    assert rows[0][1] == {"companyCode": "A-1"}
+    assert isinstance(rows[1][1], ValueError)
+    assert isinstance(rows[2][1], ValueError)
+    assert rows[3][1] == {"companyCode": "A-2"}
+
+
+def test_parse_csv_nests_dotted_columns_and_parses_booleans():
+    lines = [
+        "companyCode,phoneNumber,location.prefecture,location.addressLine,appIntegrationEnabled\n",
+        "A-1,,大阪府,,false\n",
+        "A-2,0612345678,東京都,XXビル,TRUE\n",
+    ]
+    rows = list(parse_csv(lines))
+    assert rows == [
+        (1, {
+            "companyCode": "A-1",
+            "phoneNumber": None,
+            "location": {"prefecture": "大阪府", "addressLine": None},
+            "appIntegrationEnabled": False,
+        }),
+        (2, {
+            "companyCode": "A-2",
+            "phoneNumber": "0612345678",
+            "location": {"prefecture": "東京都", "addressLine": "XXビル"},
+            "appIntegrationEnabled": True,
+        }),
+    ]
+
+
+def test_parse_csv_only_coerces_feature_flag_columns():
+    rows = list(parse_csv(["companyCode,location.streetAddress,appIntegrationEnabled", "1,0,yes"]))
+    assert rows == [(1, {"companyCode": "1", "location": {"streetAddress": "0"}, "appIntegrationEnabled": True})]
+
+
+def test_import_companies_writes_one_insert_many_per_chunk(insert, company_input):
+    rows = [(i, company_input(companyCode=f"A-{i}")) for i in range(1, 6)]
+    rows.insert(2, (99, ValueError("invalid JSON")))
+    rows.append((100, company_input(companyCode="A-100", postalCode="x")))
+
+    report = asyncio.run(import_companies(rows, chunk_size=2))
+
+    # 解析エラー・検証エラーの行はチャンクに数えるが書き込みには含めない
+    assert insert.calls == [["A-1", "A-2"], ["A-3"], ["A-4", "A-5"]]
+    assert [r.row for r in report.rows] == [1, 2, 3, 4, 5, 99, 100]
+    assert (report.total, report.created, report.invalid) == (7, 5, 2)
+
+
+def test_bulk_write_errors_are_mapped_to_their_rows(insert, company_input):
+    insert.write_errors = [
+        {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"},
+        {"index": 2, "code": 121, "errmsg": "Document failed validation"},
+    ]
+    rows = [(10 + i, company_input(companyCode=f"B-{i}")) for i in range(4)]
+
+    report = asyncio.run(import_companies(rows, chunk_size=10))
+
+    by_row = {r.row: r for r in report.rows}
+    assert [by_row[row].status for row in (10, 11, 12, 13)] == ["created", "duplicate", "failed", "created"]
+    assert by_row[11].companyCode == "B-1" and by_row[11].id is None
+    assert by_row[11].errors == ["Company code already exists"]
+    assert by_row[12].errors == ["Document failed validation"]
+    assert by_row[10].id is not None and by_row[13].id is not None
+    assert (report.created, report.duplicates, report.failed) == (2, 1, 1)
+
+
+def _ndjson_file(payload: bytes) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8-sig", newline="")
+
+
+def test_decode_error_after_written_chunks_returns_partial_report(insert, company_input):
+    # TextIOWrapper は 8KB 単位でデコードするため、不正なバイトは先頭のブロックより後ろに置く
+    lines = [json.dumps(company_input(companyCode=f"C-{i}")) for i in range(1, 101)]
+    payload = "\n".join(lines).encode("utf-8") + b"\n\xff\xfe\n"
+    assert len(payload) > 3 * 8192
+
+    report = asyncio.run(import_companies(parse_ndjson(_ndjson_file(payload)), chunk_size=10))
+
+    assert insert.calls and report.created == report.total == sum(len(c) for c in insert.calls)
+    assert report.total < 100
+    assert report.errors == [f"File must be UTF-8 encoded; import stopped after row {report.total}"]
+
+
+def test_decode_error_before_any_write_is_raised(insert):
+    with pytest.raises(UnicodeDecodeError):
+        asyncio.run(import_companies(parse_ndjson(_ndjson_file(b'{"companyCode": "\xff"}\n')), chunk_size=10))
+    assert insert.calls == []
+
+
+def test_rows_are_read_and_validated_off_the_event_loop(insert, company_input, monkeypatch):
+    threads = []
+    validate_chunk = company_import._validate_chunk
+
+    def rows():
+        threads.append(threading.current_thread())
+        yield 1, company_input(companyCode="D-1")
+
+    def recording_validate(chunk):
+        threads.append(threading.current_thread())
+        return validate_chunk(chunk)
+
+    monkeypatch.setattr(company_import, "_validate_chunk", recording_validate)
+    report = asyncio.run(import_companies(rows()))
+
+    assert report.created == 1
+    assert threads and threading.main_thread() not in threads
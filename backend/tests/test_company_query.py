@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.company_document import Company as CompanyDoc
+from app.services.company_query import QUERY_SHAPES, UnsupportedQueryShape, build_list_query
+
+BASE = datetime(2024, 4, 1)
+
+
+def test_every_shape_is_backed_by_a_declared_index():
+    declared = {index.document["name"]: index.document["key"] for index in CompanyDoc.Settings.indexes}
+    for shape in QUERY_SHAPES:
+        keys = list(declared[shape.index])
+        # 等価条件 → 並び順のキー → _id の順（ESR）
+        expected = ([shape.equality] if shape.equality else []) + [shape.sort, "_id"]
+        assert keys == expected, shape
+
+
+def test_build_list_query_picks_the_matching_shape():
+    query = build_list_query(prefecture="大阪府", created_from=BASE, sort="-created_at")
+    assert query.shape.index == "idx_prefecture_created_at_id"
+    assert query.filter == {"location.prefecture": "大阪府", "created_at": {"$gte": BASE}}
+    assert query.sort == [("created_at", -1), ("_id", -1)]
+
+    assert build_list_query(months="04-03").shape.index == "idx_months_created_at_id"
+    assert build_list_query(flags={"employeeChatEnabled": False}).shape.index == "idx_employee_chat_created_at_id"
+    assert build_list_query(sort="companyNameKana").shape.index == "idx_company_name_kana_id"
+
+
+@pytest.mark.parametrize("kwargs", [
+    # 等価条件の組み合わせ（対応する複合索引がない）
+    {"prefecture": "大阪府", "months": "04-03"},
+    {"prefecture": "大阪府", "flags": {"appIntegrationEnabled": True}},
+    # カナ順と created_at の範囲 / フラグ
+    {"sort": "companyNameKana", "created_from": BASE},
+    {"sort": "-companyNameKana", "flags": {"appIntegrationEnabled": True}},
+    {"sort": "phoneNumber"},
+])
+def test_unsupported_shapes_are_rejected(kwargs):
+    with pytest.raises(UnsupportedQueryShape):
+        build_list_query(**kwargs)
+
+
+def test_cursor_round_trips_for_the_query_sort():
+    query = build_list_query(sort="-companyNameKana")
+    row = {"_id": "65f000000000000000000001", "companyNameKana": "オオサカショウジ"}
+    after = query.after(query.cursor_for(row))
+    assert after["$or"][0] == {"companyNameKana": {"$lt": "オオサカショウジ"}}
+    with pytest.raises(ValueError):
+        build_list_query().after(query.cursor_for(row))
+    # 同じキーでも逆向きの並び順には使えない
+    with pytest.raises(ValueError):
+        build_list_query(sort="companyNameKana").after(query.cursor_for(row))
@@ -0,0 +1,161 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.migrations.schema_versions import apply_schema_checks
+from app.models.company_document import CURRENT_SCHEMA_VERSION, INCOMPATIBLE_SCHEMA_VERSION
+from app.schemas.auth import UserInfo
+from app.services import company_reader
+from app.services.company_cache import company_cache
+from app.services.company_reader import (
+    COMPATIBILITY_CHECK,
+    INCOMPATIBLE_MARKER,
+    ensure_compatible,
+    is_compatible,
+    readable,
+)
+from app.services.keycloak_service import keycloak_service
+
+USER = UserInfo(sub="u", username="tester")
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.writes = []
+
+    async def update_many(self, query, update):
+        self.writes.append((query, update))
+
+
+def run_ensure(monkeypatch, rows):
+    collection = RecordingCollection()
+    monkeypatch.setattr(company_reader.CompanyDoc, "get_motor_collection", classmethod(lambda cls: collection))
+    return asyncio.run(ensure_compatible(rows)), collection
+
+
+def test_is_compatible(raw_company):
+    assert is_compatible(raw_company())
+    # months が欠けた従来ドキュメントは既定値で返せる
+    legacy = raw_company()
+    del legacy["months"]
+    assert is_compatible(legacy)
+    assert not is_compatible(raw_company(employeeChatEnabled=None))
+    assert not is_compatible(raw_company(companyCode="abc"))
+
+
+def test_current_version_rows_are_not_rechecked(monkeypatch, raw_company):
+    rows = [raw_company(schemaVersion=CURRENT_SCHEMA_VERSION) for _ in range(3)]
+    result, collection = run_ensure(monkeypatch, rows)
+    assert result == rows
+    assert collection.writes == []
+
+
+def test_unversioned_rows_are_filtered_without_writes(monkeypatch, raw_company):
+    ok, broken = raw_company(), raw_company(companyCode="abc")
+    result, collection = run_ensure(monkeypatch, [ok, broken])
+    assert result == [ok]
+    # 記録は起動時の移行が行い、読み取りの経路では書き込まない
+    assert collection.writes == []
+
+
+def test_readable_excludes_documents_marked_under_the_current_check():
+    assert readable({"a": 1}) == {"a": 1, "$nor": [INCOMPATIBLE_MARKER]}
+    assert INCOMPATIBLE_MARKER == {"schemaVersion": INCOMPATIBLE_SCHEMA_VERSION, "schemaCheck": COMPATIBILITY_CHECK}
+
+
+@pytest.fixture()
+def legacy_collection(monkeypatch, raw_company):
+    """5件のうち2件目が企業名の欠けた旧形式（schemaVersion なし）のコレクション"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["t"]["companies"]
+    start = datetime(2024, 4, 1)
+    rows = [raw_company(companyCode=f"OSK-{i:04d}", created_at=start + timedelta(minutes=i)) for i in range(5)]
+    del rows[1]["companyName"]
+    collection.rows = rows
+    monkeypatch.setattr(company_reader.CompanyDoc, "get_motor_collection", classmethod(lambda cls: collection))
+    monkeypatch.setattr(company_cache, "ttl", 0)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: USER)
+
+    async def verify_token(token):
+        return USER
+
+    monkeypatch.setattr(keycloak_service, "verify_token", verify_token)
+    return collection
+
+
+def run_client(collection, send, migrate=False):
+    async def run():
+        await collection.insert_many(collection.rows)
+        if migrate:
+            await apply_schema_checks(collection.database)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await send(client)
+
+    return asyncio.run(run())
+
+
+def test_rest_listing_continues_past_an_incompatible_row(legacy_collection):
+    async def pages(client):
+        result, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            body = (await client.get("/api/v1/companies/", params=params)).json()
+            result.append([item["companyCode"] for item in body["items"]])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                return result
+
+    # 1ページ目は旧形式の行を除いた1件だが、次ページのカーソルは失われない
+    assert run_client(legacy_collection, pages) == [["OSK-0000"], ["OSK-0002", "OSK-0003"], ["OSK-0004"]]
+
+
+def test_graphql_lists_skip_incompatible_rows(legacy_collection):
+    headers = {"Authorization": "Bearer x"}
+
+    async def send(client):
+        connection = await client.post("/graphql", json={
+            "query": "{ companiesConnection(first: 2) { edges { node { companyName } } pageInfo { hasNextPage endCursor } } }",
+        }, headers=headers)
+        listed = await client.post("/graphql", json={"query": "{ companies { companyName companyCode } }"}, headers=headers)
+        return listed.json(), connection.json()
+
+    listed, connection = run_client(legacy_collection, send)
+    assert "errors" not in listed
+    assert [c["companyCode"] for c in listed["data"]["companies"]] == ["OSK-0000", "OSK-0002", "OSK-0003", "OSK-0004"]
+    assert "errors" not in connection
+    page = connection["data"]["companiesConnection"]
+    assert [e["node"]["companyName"] for e in page["edges"]] == ["大阪商事"]
+    assert page["pageInfo"]["hasNextPage"] is True
+    assert page["pageInfo"]["endCursor"] is not None
+
+
+def test_projected_rows_are_checked_against_the_full_document(legacy_collection):
+    async def send(client):
+        # companyCode だけを選択しても、未チェックの行は全フィールドで検証する（互換な行は残し、旧形式は除外）
+        query = {"query": "{ companies { companyCode } }"}
+        return (await client.post("/graphql", json=query, headers={"Authorization": "Bearer x"})).json()
+
+    body = run_client(legacy_collection, send)
+    assert [c["companyCode"] for c in body["data"]["companies"]] == ["OSK-0000", "OSK-0002", "OSK-0003", "OSK-0004"]
+
+
+def test_connection_total_count_and_previous_page(legacy_collection):
+    headers = {"Authorization": "Bearer x"}
+    query = "query($after: String) { companiesConnection(first: 2, after: $after) { totalCount pageInfo { hasPreviousPage } } }"
+
+    async def send(client):
+        bodies = []
+        for after in (None, ""):
+            response = await client.post("/graphql", json={"query": query, "variables": {"after": after}}, headers=headers)
+            bodies.append(response.json()["data"]["companiesConnection"])
+        return bodies
+
+    first, empty_after = run_client(legacy_collection, send, migrate=True)
+    # 起動時の移行で旧形式の行が非互換と記録され、条件なしの件数からも除かれる
+    assert first == {"totalCount": 4, "pageInfo": {"hasPreviousPage": False}}
+    assert empty_after == {"totalCount": 4, "pageInfo": {"hasPreviousPage": False}}
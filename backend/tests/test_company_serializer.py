@@ -0,0 +1,46 @@
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas.company import CompanyPage, CompanyResponse
+from app.services.company_serializer import company_json, company_list_json, company_page_json
+
+
+def response_model(raw):
+    # 従来の経路: CompanyResponse を組み立てて FastAPI が JSONResponse で描画する
+    values = {k: v for k, v in raw.items() if k not in ("_id", "ownerLoginPassword")}
+    return CompanyResponse(id=str(raw["_id"]), **values)
+
+
+def rendered(content):
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+CASES = [
+    {},
+    {"phoneNumber": " 0612345678 "},
+    {"phoneNumber": None},
+    {"appIntegrationEnabled": False},
+    {"location": {"prefecture": "東京都", "city": "千代田区", "streetAddress": "丸の内1-1"}},
+    # EmailStr はドメインを小文字にそろえる（ローカル部はそのまま）
+    {"ownerLoginEmail": "Owner@Example.COM"},
+    {"ownerLoginEmail": "owner@ÉXAMPLE.jp"},
+    {"ownerLoginEmail": "山田 <Owner@example.com>"},
+]
+
+
+@pytest.fixture()
+def cases(raw_company):
+    return [raw_company(**overrides) for overrides in CASES]
+
+
+def test_company_json_matches_response_model_byte_for_byte(cases):
+    for raw in cases:
+        assert company_json(raw) == rendered(response_model(raw))
+
+
+def test_list_and_page_json_match_response_models(cases):
+    models = [response_model(raw) for raw in cases]
+    assert company_list_json(cases) == rendered(models)
+    page = CompanyPage(items=models, next_cursor="abc")
+    assert company_page_json(cases, "abc") == rendered(page)
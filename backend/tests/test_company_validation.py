@@ -0,0 +1,29 @@
+from app.services.company_validation import (
+    build_company_document,
+    format_field_errors,
+    validate_company,
+    validate_many,
+)
+
+
+def test_validate_many_reports_errors_per_row_and_field(company_input):
+    rows = [
+        (1, company_input()),
+        (2, company_input(postalCode="530-0001", location={"prefecture": "大阪府", "city": "大阪市", "streetAddress": "!!"})),
+    ]
+    ok, bad = validate_many(rows)
+    assert ok.ok and ok.row == 1
+    assert not bad.ok and bad.row == 2
+    assert set(bad.errors) == {"postalCode", "location"}
+    assert all(msg.startswith(("postalCode: ", "location: ")) for msg in format_field_errors(bad.errors))
+
+
+def test_build_company_document_uses_validated_values(company_input):
+    company = validate_company(company_input(appIntegrationEnabled=False, employeeChatEnabled=True))
+    doc = build_company_document(company)
+    # バリデータでの補正（アプリ連携無効時はチャットも無効）がそのまま反映される
+    assert doc.employeeChatEnabled is False
+    assert doc.location.city == "大阪市北区"
+    assert doc.created_at == doc.updated_at
+    assert "大阪" in doc.searchTokens
+    assert doc.searchKeys[0] == "オオサカショウジ"
@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.company_document import CURRENT_SCHEMA_VERSION
+from app.schemas.auth import UserInfo
+from app.services import company_cache as cache_module
+from app.services.keycloak_service import keycloak_service
+
+USER = UserInfo(sub="u", username="tester")
+
+
+class RecordingCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+
+class RecordingCollection:
+    def __init__(self, rows):
+        self.rows = {row["_id"]: row for row in rows}
+        self.queries = []
+
+    def find(self, query, projection=None, **kwargs):
+        self.queries.append((query, projection))
+        ids = query["_id"]["$in"]
+        return RecordingCursor([self.rows[i] for i in ids if i in self.rows])
+
+
+@pytest.fixture()
+def collection(monkeypatch, raw_company):
+    rows = [raw_company(schemaVersion=CURRENT_SCHEMA_VERSION, companyCode=f"OSK-{i:04d}") for i in range(3)]
+    collection = RecordingCollection(rows)
+    from app.graphql.resolvers import company as resolvers
+
+    monkeypatch.setattr(resolvers.CompanyDoc, "get_motor_collection", classmethod(lambda cls: collection))
+    # キャッシュを通さず、DataLoader のバッチ取得を直接確かめる
+    monkeypatch.setattr(cache_module.company_cache, "ttl", 0)
+    return collection
+
+
+@pytest.fixture()
+def verifications(monkeypatch):
+    calls = []
+
+    async def verify_token(token):
+        calls.append(token)
+        return USER
+
+    monkeypatch.setattr(keycloak_service, "verify_token", verify_token)
+    return calls
+
+
+def post_graphql(query, headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/graphql", json={"query": query}, headers=headers or {})
+
+    return asyncio.run(run()).json()
+
+
+def test_aliased_company_fields_are_loaded_with_one_in_query(collection, verifications):
+    a, b, c = (str(_id) for _id in collection.rows)
+    body = post_graphql(
+        f"""{{
+            a: company(id: "{a}") {{ companyName }}
+            b: company(id: "{b}") {{ companyCode location {{ city }} }}
+            c: company(id: "{c}") {{ id }}
+            missing: company(id: "000000000000000000000000") {{ id }}
+        }}""",
+        headers={"Authorization": "Bearer token-1"},
+    )
+    assert "errors" not in body
+    assert body["data"]["a"] == {"companyName": "大阪商事"}
+    assert body["data"]["b"] == {"companyCode": "OSK-0001", "location": {"city": "大阪市北区"}}
+    assert body["data"]["c"] == {"id": c}
+    assert body["data"]["missing"] is None
+
+    # 4つのフィールドで1回の $in、projection は選択されたフィールドの和集合（と互換性確認用の schemaVersion）
+    assert len(collection.queries) == 1
+    query, projection = collection.queries[0]
+    assert len(query["_id"]["$in"]) == 4
+    assert set(projection) == {"_id", "companyName", "companyCode", "location.city", "schemaVersion"}
+    # トークン検証はリクエストごとに1回
+    assert verifications == ["token-1"]
+
+
+def test_hello_does_not_require_authentication(verifications):
+    assert post_graphql("{ hello }") == {"data": {"hello": "world"}}
+    assert verifications == []
+
+
+def test_keycloak_outage_only_fails_fields_that_need_a_user(monkeypatch):
+    async def verify_token(token):
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(keycloak_service, "verify_token", verify_token)
+    headers = {"Authorization": "Bearer token-1"}
+
+    assert post_graphql("{ hello }", headers=headers) == {"data": {"hello": "world"}}
+    body = post_graphql('{ company(id: "000000000000000000000000") { id } }', headers=headers)
+    assert body["data"] == {"company": None}
+    assert "Authentication service unavailable" in body["errors"][0]["message"]
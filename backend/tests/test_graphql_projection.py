@@ -0,0 +1,45 @@
+from strawberry.types.nodes import FragmentSpread, SelectedField
+
+from app.graphql.projection import child_selections, projection_from_selections
+from app.graphql.schema import COMPANY_FIELD_MAP
+
+
+def field(name, *selections):
+    return SelectedField(name=name, directives={}, arguments={}, selections=list(selections))
+
+
+def test_field_map_uses_graphql_names_and_document_paths():
+    assert COMPANY_FIELD_MAP["id"].path == "_id"
+    assert COMPANY_FIELD_MAP["createdAt"].path == "created_at"
+    assert COMPANY_FIELD_MAP["location"].children["city"].path == "location.city"
+
+
+def test_projection_only_contains_selected_fields():
+    selections = [
+        field("id"),
+        field("companyName"),
+        field("location", field("prefecture")),
+        FragmentSpread(name="F", type_condition="Company", directives={}, selections=[
+            field("updatedAt"),
+            field("__typename"),
+        ]),
+    ]
+    assert projection_from_selections(selections, COMPANY_FIELD_MAP) == {
+        "_id": 1,
+        "companyName": 1,
+        "location.prefecture": 1,
+        "updated_at": 1,
+    }
+
+
+def test_unknown_field_falls_back_to_full_document():
+    assert projection_from_selections([field("unknown")], COMPANY_FIELD_MAP) is None
+
+
+def test_connection_node_selections_are_projected():
+    selections = [
+        field("totalCount"),
+        field("edges", field("cursor"), field("node", field("companyCode"))),
+    ]
+    nodes = child_selections(child_selections(selections, "edges"), "node")
+    assert projection_from_selections(nodes, COMPANY_FIELD_MAP) == {"_id": 1, "companyCode": 1}
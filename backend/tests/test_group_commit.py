@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.services.group_commit import GroupCommitWriter
+
+
+class FakeStore:
+    """insert_many の代わりに呼び出しを記録し、companyCode の重複を BulkWriteError にする"""
+
+    def __init__(self):
+        self.calls = []
+        self.codes = set()
+
+    async def insert_many(self, docs):
+        self.calls.append(len(docs))
+        await asyncio.sleep(0.001)
+        errors = []
+        for index, doc in enumerate(docs):
+            if doc.companyCode in self.codes:
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key"})
+            else:
+                self.codes.add(doc.companyCode)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+
+def doc(code):
+    return SimpleNamespace(id=None, companyCode=code)
+
+
+def run_inserts(writer, codes):
+    async def run():
+        return await asyncio.gather(*(writer.insert(doc(c)) for c in codes), return_exceptions=True)
+
+    return asyncio.run(run())
+
+
+def test_concurrent_inserts_are_merged_into_one_batch():
+    store = FakeStore()
+    writer = GroupCommitWriter(insert_many=store.insert_many, window_ms=5, max_batch=100)
+    results = run_inserts(writer, [f"C-{i}" for i in range(50)])
+    assert store.calls == [50]
+    assert [r.companyCode for r in results] == [f"C-{i}" for i in range(50)]
+    assert all(r.id is not None for r in results)
+
+
+def test_batches_are_capped_at_max_batch():
+    store = FakeStore()
+    writer = GroupCommitWriter(insert_many=store.insert_many, window_ms=50, max_batch=20)
+    run_inserts(writer, [f"C-{i}" for i in range(45)])
+    assert store.calls == [20, 20, 5]
+
+
+def test_duplicate_is_returned_only_to_its_caller():
+    store = FakeStore()
+    store.codes.add("C-1")
+    writer = GroupCommitWriter(insert_many=store.insert_many, window_ms=5, max_batch=100)
+    results = run_inserts(writer, ["C-0", "C-1", "C-2", "C-2"])
+    assert isinstance(results[1], DuplicateKeyError)
+    assert isinstance(results[3], DuplicateKeyError)
+    assert results[0].companyCode == "C-0" and results[2].companyCode == "C-2"
+
+
+def test_unexpected_errors_fail_the_whole_batch():
+    async def broken(docs):
+        raise RuntimeError("connection lost")
+
+    writer = GroupCommitWriter(insert_many=broken, window_ms=1, max_batch=10)
+    results = run_inserts(writer, ["A", "B"])
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.migrations.indexes import MIGRATIONS_COLLECTION, apply_index_migrations, declared_indexes, fingerprint
+from app.models.company_document import Company
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def test_indexes_are_applied_once_and_recorded():
+    db = mongomock_motor.AsyncMongoMockClient()["migrations_test"]
+
+    async def run():
+        companies = db[Company.Settings.name]
+        # 旧バージョンで作られた一意索引と、運用で追加された管理外の索引
+        await companies.create_index("ownerLoginEmail", name="idx_owner_email", unique=True)
+        await companies.create_index("contactName", name="ops_contact_name")
+
+        first = await apply_index_migrations(db)
+        second = await apply_index_migrations(db)
+        names = {i["name"] async for i in companies.list_indexes()}
+        record = await db[MIGRATIONS_COLLECTION].find_one({"_id": "companies.indexes"})
+        return first, second, names, record
+
+    first, second, names, record = asyncio.run(run())
+    assert first is True
+    # ウォームスタートでは何もしない
+    assert second is False
+    assert set(declared_indexes(Company)) <= names
+    assert "idx_owner_email" not in names
+    assert "ops_contact_name" in names
+    assert record["dropped"] == ["idx_owner_email"]
+
+
+def test_changed_index_definitions_are_detected_by_fingerprint():
+    db = mongomock_motor.AsyncMongoMockClient()["migrations_fingerprint_test"]
+
+    async def run():
+        await apply_index_migrations(db)
+        # 以前の定義で適用された記録（旧形式の version フィールドは無視される）
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": "companies.indexes"}, {"$set": {"fingerprint": "0" * 16, "version": 4}},
+        )
+        reapplied = await apply_index_migrations(db)
+        record = await db[MIGRATIONS_COLLECTION].find_one({"_id": "companies.indexes"})
+        return reapplied, record, await apply_index_migrations(db)
+
+    reapplied, record, warm = asyncio.run(run())
+    assert reapplied is True
+    assert record["fingerprint"] == fingerprint(Company)
+    assert warm is False
@@ -0,0 +1,177 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.config import MONGODB_DB, MONGODB_URI
+from app.migrations.indexes import apply_index_migrations
+from app.models.company_document import CURRENT_SCHEMA_VERSION, search_fields
+from app.services.company_export import FEATURE_FLAGS, build_export_filter
+from app.services.company_query import QUERY_SHAPES as LIST_SHAPES, build_list_query
+from app.services.company_reader import readable
+from app.services.company_search import (
+    AUTOCOMPLETE_INDEX,
+    AUTOCOMPLETE_SORT,
+    build_autocomplete_filter,
+    build_search_pipeline,
+)
+from app.utils.kana import normalize_kana, prefix_upper_bound
+from app.utils.pagination import KEYSET_SORT, encode_cursor, keyset_filter
+
+BASE = datetime(2024, 4, 1)
+PREFECTURES = ["大阪府", "東京都", "愛知県", "福岡県"]
+
+
+def indexed_company(raw_company, i):
+    # 索引の選択を確かめるため、絞り込み条件の値を分散させる
+    raw = raw_company(
+        companyCode=f"OSK-{i:05d}",
+        location={"prefecture": PREFECTURES[i % 4], "city": "市", "streetAddress": "1-1"},
+        ownerLoginEmail=f"owner{i}@example.com",
+        appIntegrationEnabled=i % 2 == 0,
+        safetyConfirmationEnabled=i % 3 == 0,
+        occupationalDoctorIntegrationEnabled=i % 5 == 0,
+        employeeChatEnabled=i % 7 == 0,
+        schemaVersion=CURRENT_SCHEMA_VERSION,
+        created_at=BASE + timedelta(minutes=i),
+    )
+    raw.update(search_fields(raw))
+    return raw
+
+
+@pytest.fixture(scope="module")
+def collection(raw_company):
+    client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip("MongoDB is not available")
+    db_name = f"{MONGODB_DB}_index_test"
+    client.drop_database(db_name)
+
+    async def migrate():
+        motor = AsyncIOMotorClient(MONGODB_URI)
+        await apply_index_migrations(motor[db_name])
+        motor.close()
+
+    asyncio.run(migrate())
+    companies = client[db_name]["companies"]
+    companies.insert_many([indexed_company(raw_company, i) for i in range(500)])
+    yield companies
+    client.drop_database(db_name)
+    client.close()
+
+
+def stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from stages(value)
+
+
+def index_names(plan):
+    if isinstance(plan, dict):
+        if "indexName" in plan:
+            yield plan["indexName"]
+        for value in plan.values():
+            yield from index_names(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from index_names(value)
+
+
+def find_plan(query, sort=KEYSET_SORT, limit=21, hint=None):
+    def explain(companies):
+        cursor = companies.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        if hint:
+            cursor = cursor.hint(hint)
+        return cursor.limit(limit).explain()["queryPlanner"]["winningPlan"]
+    return explain
+
+
+def aggregate_plan(pipeline):
+    def explain(companies):
+        return companies.database.command("aggregate", companies.name, pipeline=pipeline, explain=True)
+    return explain
+
+
+# API が発行するクエリの形（各ビルダーから生成）
+QUERY_SHAPES = {
+    "list first page": find_plan(readable({})),
+    "list after cursor": find_plan(readable(keyset_filter(encode_cursor(BASE + timedelta(hours=1), ObjectId())))),
+    "export by prefecture and created range": find_plan(readable(build_export_filter(
+        prefecture="大阪府", created_from=BASE, created_to=BASE + timedelta(days=1),
+    ))),
+    "export by created range": find_plan(readable(build_export_filter(
+        created_from=BASE, created_to=BASE + timedelta(hours=2),
+    ))),
+    **{
+        f"filter by {flag}": find_plan(readable(build_export_filter(flags={flag: True})))
+        for flag in FEATURE_FLAGS
+    },
+    "get by id": find_plan(readable({"_id": ObjectId()}), sort=None, limit=1),
+    "company code uniqueness": find_plan({"companyCode": "OSK-00001"}, sort=None, limit=1),
+    "autocomplete": find_plan(
+        readable(build_autocomplete_filter("おおさか")), sort=AUTOCOMPLETE_SORT, limit=10, hint=AUTOCOMPLETE_INDEX,
+    ),
+    "search": aggregate_plan(build_search_pipeline("大阪", offset=0, limit=20)),
+}
+
+
+@pytest.mark.parametrize("shape", list(QUERY_SHAPES))
+def test_query_shape_uses_an_index(collection, shape):
+    used = set(stages(QUERY_SHAPES[shape](collection)))
+    assert "IXSCAN" in used or "IDHACK" in used or "EXPRESS_IXSCAN" in used, used
+    assert "COLLSCAN" not in used, used
+
+
+def list_query_for(shape):
+    # 許可された形ごとに、代表的な値で一覧クエリを組み立てる
+    kwargs = {"sort": "-" + shape.sort}
+    if shape.equality == "location.prefecture":
+        kwargs["prefecture"] = "大阪府"
+    elif shape.equality == "months":
+        kwargs["months"] = "04-03"
+    elif shape.equality:
+        kwargs["flags"] = {shape.equality: True}
+    if shape.created_range:
+        kwargs.update(created_from=BASE, created_to=BASE + timedelta(days=1))
+    return build_list_query(**kwargs)
+
+
+@pytest.mark.parametrize("shape", LIST_SHAPES, ids=lambda s: s.index)
+def test_list_shape_uses_its_compound_index(collection, shape):
+    query = list_query_for(shape)
+    plan = find_plan(readable(query.filter), sort=query.sort)(collection)
+    assert "COLLSCAN" not in set(stages(plan))
+    assert "SORT" not in set(stages(plan)), "sort must be satisfied by the index"
+    assert shape.index in set(index_names(plan))
+
+
+def index_bounds(plan):
+    if isinstance(plan, dict):
+        if "indexBounds" in plan:
+            yield plan["indexBounds"]
+        for value in plan.values():
+            yield from index_bounds(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from index_bounds(value)
+
+
+def test_autocomplete_scans_only_the_prefix_range(collection):
+    # 実際のクエリ（readable・カナ順・limit）でも前方一致の範囲索引で絞り込む
+    plan = QUERY_SHAPES["autocomplete"](collection)
+    assert set(index_names(plan)) == {AUTOCOMPLETE_INDEX}
+    prefix = normalize_kana("おおさか")
+    assert [b["searchKeys"] for b in index_bounds(plan)] == [[f'["{prefix}", "{prefix_upper_bound(prefix)}")']]
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.models.company_document import CURRENT_SCHEMA_VERSION, search_fields
+from app.services import company_search
+from app.services.company_search import autocomplete_companies, build_autocomplete_filter
+from app.utils.kana import normalize_kana, prefix_upper_bound
+
+
+@pytest.mark.parametrize("text", ["おおさか", "オオサカ", "ｵｵｻｶ", "オオ サカ"])
+def test_normalize_kana_unifies_scripts_and_width(text):
+    assert normalize_kana(text) == "オオサカ"
+
+
+def test_normalize_kana_handles_voiced_marks_and_long_vowels():
+    assert normalize_kana("ｶﾞｽ") == "ガス"
+    assert normalize_kana("サーバー") == normalize_kana("さーば") == "サバ"
+    assert normalize_kana("ヤマダ・タロウ") == "ヤマダタロウ"
+
+
+def test_search_fields_store_normalized_keys():
+    fields = search_fields({
+        "companyName": "大阪商事",
+        "companyNameKana": "オオサカショウジ",
+        "companyCode": "OSK-1",
+        "contactNameKana": "ヤマダ タロウ",
+    })
+    assert fields["searchKeys"] == ["オオサカショウジ", "大阪商事", "ヤマダタロウ"]
+
+
+def test_autocomplete_filter_is_anchored_range():
+    assert prefix_upper_bound("オオサ") == "オオザ"
+    assert build_autocomplete_filter("おおさ") == {
+        "searchKeys": {"$elemMatch": {"$gte": "オオサ", "$lt": "オオザ"}}
+    }
+    assert build_autocomplete_filter(" ー ") == {}
+
+
+def test_autocomplete_is_ordered_by_kana(monkeypatch, raw_company):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["t"]["companies"]
+    names = [("大阪物産", "オオサカブッサン"), ("大阪商事", "オオサカショウジ"), ("大阪運輸", "オオサカウンユ")]
+
+    async def run():
+        await collection.insert_many([
+            raw_company(
+                companyName=name,
+                companyNameKana=kana,
+                companyCode=f"C-{i}",
+                schemaVersion=CURRENT_SCHEMA_VERSION,
+                **search_fields({"companyNameKana": kana}),
+            )
+            for i, (name, kana) in enumerate(names)
+        ])
+        return await autocomplete_companies("おおさか", limit=2)
+
+    monkeypatch.setattr(company_search.CompanyDoc, "get_motor_collection", classmethod(lambda cls: collection))
+    suggestions = asyncio.run(run())
+    assert [s.companyNameKana for s in suggestions] == ["オオサカウンユ", "オオサカショウジ"]
+
+
+def test_autocomplete_skips_incompatible_legacy_documents(monkeypatch, raw_company):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["t"]["companies"]
+    kana = "オオサカショウジ"
+    current = raw_company(schemaVersion=CURRENT_SCHEMA_VERSION, **search_fields({"companyNameKana": kana}))
+    # 旧形式: 企業名が欠けていて現行の応答にできない（schemaVersion なし）
+    legacy = raw_company(companyCode="OLD-1", **search_fields({"companyNameKana": kana}))
+    del legacy["companyName"]
+
+    async def run():
+        await collection.insert_many([current, legacy])
+        suggestions = await autocomplete_companies("おおさか")
+        return suggestions, await collection.find_one({"_id": legacy["_id"]})
+
+    monkeypatch.setattr(company_search.CompanyDoc, "get_motor_collection", classmethod(lambda cls: collection))
+    suggestions, stored = asyncio.run(run())
+    assert [s.companyCode for s in suggestions] == ["OSK-0001"]
+    # 読み取りの経路では記録しない（起動時の移行が記録する）
+    assert "schemaVersion" not in stored
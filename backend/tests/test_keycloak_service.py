@@ -0,0 +1,205 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from app.services.keycloak_service import KeycloakService
+
+
+class SigningKey:
+    def __init__(self, kid):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = kid
+        self.private_pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        self.jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid, "use": "sig"}
+
+    def token(self, exp_in=300, **claims):
+        payload = {"sub": "user-1", "preferred_username": "tester", "exp": int(time.time()) + exp_in}
+        payload.update(claims)
+        return jwt.encode(payload, self.private_pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+@pytest.fixture(scope="module")
+def key1():
+    return SigningKey("k1")
+
+
+@pytest.fixture(scope="module")
+def key2():
+    return SigningKey("k2")
+
+
+class KeycloakStandIn:
+    """/certs と /token だけを返すローカルの Keycloak 代替（httpx.MockTransport 用）"""
+
+    def __init__(self, *keys):
+        self.keys = list(keys)
+        self.requests = []
+
+    async def __call__(self, request):
+        self.requests.append(request.url.path)
+        if request.url.path.endswith("/certs"):
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"keys": [k.jwk for k in self.keys]})
+        return httpx.Response(200, json={
+            "access_token": "a",
+            "refresh_token": "r",
+            "token_type": "Bearer",
+            "expires_in": 300,
+            "refresh_expires_in": 1800,
+        })
+
+    def count(self, url):
+        return self.requests.count(httpx.URL(url).path)
+
+
+@pytest.fixture
+def service(key1):
+    svc = KeycloakService()
+    svc.load_jwks({"keys": [key1.jwk]})
+    return svc
+
+
+def test_verify_token_caches_verified_claims(service, key1):
+    token = key1.token()
+    first = asyncio.run(service.verify_token(token))
+    second = asyncio.run(service.verify_token(token))
+    assert first.username == second.username == "tester"
+    assert service.token_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_expired_cache_entry_is_not_served(service, key1):
+    token = key1.token()
+    asyncio.run(service.verify_token(token))
+    # キャッシュ上の有効期限を過去にすると再検証される
+    key, (exp, user) = next(iter(service._token_cache.items()))
+    service._token_cache[key] = (time.time() - 1, user)
+    asyncio.run(service.verify_token(token))
+    assert service.token_cache_hits == 0
+    assert service.token_cache_misses == 2
+
+
+def test_cache_is_bounded(service, key1):
+    service.token_cache_size = 2
+    for i in range(3):
+        asyncio.run(service.verify_token(key1.token(sub=f"user-{i}")))
+    assert service.token_cache_stats()["size"] == 2
+
+
+def test_invalid_token_is_not_cached(service):
+    # kid は k1 だが別の鍵で署名された偽トークン
+    forged = SigningKey("k1").token()
+    with pytest.raises(HTTPException):
+        asyncio.run(service.verify_token(forged))
+    assert service.token_cache_stats()["size"] == 0
+
+
+def test_key_rotation_clears_token_cache(service, key1, key2):
+    asyncio.run(service.verify_token(key1.token()))
+    service.load_jwks({"keys": [key2.jwk]})
+    assert service.token_cache_stats()["size"] == 0
+
+
+def test_unknown_kid_triggers_rate_limited_refresh(key1, key2):
+    stand_in = KeycloakStandIn(key1)
+    svc = KeycloakService(transport=httpx.MockTransport(stand_in))
+
+    async def run():
+        await svc.verify_token(key1.token())
+        # Keycloak 側で k2 が追加された直後に k2 署名のトークンが届く
+        stand_in.keys.append(key2)
+        user = await svc.verify_token(key2.token())
+        # 未知の kid が続いても、最小間隔内は再取得しない
+        with pytest.raises(HTTPException):
+            await svc.verify_token(SigningKey("k3").token())
+        await svc.shutdown()
+        return user
+
+    assert asyncio.run(run()).username == "tester"
+    assert stand_in.count(svc.certs_url) == 2
+
+
+def test_concurrent_jwks_fetches_are_collapsed(key1):
+    stand_in = KeycloakStandIn(key1)
+    svc = KeycloakService(transport=httpx.MockTransport(stand_in))
+    token = key1.token()
+
+    async def run():
+        users = await asyncio.gather(*(svc.verify_token(token) for _ in range(20)))
+        await svc.shutdown()
+        return users
+
+    assert len(asyncio.run(run())) == 20
+    assert stand_in.count(svc.certs_url) == 1
+
+
+def test_http_client_is_shared_between_calls(key1):
+    stand_in = KeycloakStandIn(key1)
+    svc = KeycloakService(transport=httpx.MockTransport(stand_in))
+
+    async def run():
+        await svc.startup()
+        client = svc.client
+        await svc.get_token("user", "pass")
+        await svc.refresh_token("r")
+        same = svc.client is client
+        await svc.shutdown()
+        return same
+
+    assert asyncio.run(run())
+    assert stand_in.count(svc.token_url) == 2
+
+
+def test_refresh_delay_is_never_shorter_than_min_interval(service):
+    service.jwks_ttl = timedelta(seconds=60)
+    service.jwks_refresh_margin = timedelta(seconds=300)
+    assert service._next_jwks_refresh_delay() == service.jwks_min_refresh_interval
+
+    service.jwks_refresh_margin = timedelta(seconds=10)
+    assert 30 <= service._next_jwks_refresh_delay() <= 50
+
+
+def test_background_refresh_does_not_spin_when_margin_exceeds_ttl(key1):
+    stand_in = KeycloakStandIn(key1)
+    svc = KeycloakService(transport=httpx.MockTransport(stand_in))
+    svc.jwks_ttl = timedelta(seconds=60)
+    svc.jwks_refresh_margin = timedelta(seconds=60)
+
+    async def run():
+        await svc.startup()
+        await asyncio.sleep(0.2)
+        await svc.shutdown()
+
+    asyncio.run(run())
+    assert stand_in.count(svc.certs_url) == 1
+
+
+def test_jwks_error_response_is_not_loaded_as_keys():
+    async def unavailable(request):
+        return httpx.Response(503, json={"error": "unavailable"})
+
+    svc = KeycloakService(transport=httpx.MockTransport(unavailable))
+
+    async def run():
+        try:
+            await svc.refresh_jwks()
+        finally:
+            await svc.shutdown()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+    assert svc._keys == {}
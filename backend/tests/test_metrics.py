@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from datetime import timedelta
+
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+from app.api.routes import metrics as metrics_routes
+from app.main import app
+from app.middleware.metrics import MetricsMiddleware, route_template
+from app.services.metrics import MongoCommandMetrics, MongoPoolMetrics, metrics
+from app.utils.metrics import OTHER, MetricsRegistry
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", ["kind"])
+    histogram = registry.histogram("job_seconds", "Job latency", ["kind"], buckets=(0.1, 1.0))
+    counter.inc("a")
+    counter.inc("a", amount=2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "a")
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 3' in text
+    assert "# TYPE job_seconds histogram" in text
+    # le は累積（境界値ちょうどはそのバケットに入る）
+    assert 'job_seconds_bucket{kind="a",le="0.1"} 2' in text
+    assert 'job_seconds_bucket{kind="a",le="1"} 3' in text
+    assert 'job_seconds_bucket{kind="a",le="+Inf"} 4' in text
+    assert 'job_seconds_count{kind="a"} 4' in text
+    assert 'job_seconds_sum{kind="a"} 3.65' in text
+    assert text.endswith("\n")
+
+
+def test_label_values_are_escaped_and_series_are_capped():
+    registry = MetricsRegistry()
+    counter = registry.counter("names_total", "Names", ["name"])
+    counter.max_series = 2
+    for name in ('a"b', "c", "d", "e"):
+        counter.inc(name)
+    assert counter.values() == {('a"b',): 1, ("c",): 1, (OTHER,): 2}
+    assert 'names_total{name="a\\"b"} 1' in registry.render()
+
+
+def test_observations_from_many_threads_are_all_counted():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("t_seconds", "T")
+
+    def work():
+        for _ in range(5000):
+            histogram.observe(0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    series = histogram.values()[()]
+    assert sum(series[:-1]) == 40000
+
+
+def test_route_template_replaces_path_params():
+    scope = {"path": "/api/v1/companies/abc", "endpoint": object(), "path_params": {"company_id": "abc"}}
+    assert route_template(scope) == "/api/v1/companies/{company_id}"
+    # 一致したルートがあればその path_format を使う（値が固定のセグメントと同じでも取り違えない）
+    route = APIRoute("/api/v1/companies/{company_id}", endpoint=lambda company_id: None)
+    scope = {"path": "/api/v1/companies/companies", "endpoint": object(), "route": route,
+             "path_params": {"company_id": "companies"}}
+    assert route_template(scope) == "/api/v1/companies/{company_id}"
+    # path_format がルーターのプレフィックスを含まない場合は実際のパスから補う
+    scope["route"] = APIRoute("/{company_id}", endpoint=lambda company_id: None)
+    assert route_template(scope) == "/api/v1/companies/{company_id}"
+    scope = {"path": "/api/v1/companies/", "endpoint": object(), "route": APIRoute("/", endpoint=lambda: None)}
+    assert route_template(scope) == "/api/v1/companies/"
+    assert route_template({"path": "/graphql", "endpoint": object()}) == "/graphql"
+    assert route_template({"path": "/anything/else"}) == "unmatched"
+
+
+def test_middleware_labels_requests_by_route_template():
+    histogram = MetricsRegistry().histogram("http_seconds", "HTTP", ["method", "route", "status"])
+    wrapped = MetricsMiddleware(app, histogram)
+
+    async def run():
+        transport = httpx.ASGITransport(app=wrapped)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/api/v1/companies/507f1f77bcf86cd799439011")
+            await client.get("/api/v1/companies/companies")
+            await client.get("/no/such/path")
+
+    asyncio.run(run())
+    series = histogram.values()
+    # 認証なしでも ID ごとではなくテンプレートで 1 系列になる
+    assert {key[:2] for key in series if key[1].startswith("/api/")} == {("GET", "/api/v1/companies/{company_id}")}
+    assert sum(sum(series[key][:-1]) for key in series if key[1].startswith("/api/")) == 2
+    assert ("GET", "unmatched", "404") in series
+
+
+def test_metrics_endpoint_is_disabled_by_default():
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics")
+
+    assert asyncio.run(run()).status_code == 404
+
+
+def test_metrics_endpoint_serves_registry():
+    # METRICS_ENABLED=true のときに main が登録するルーター
+    metrics_app = FastAPI()
+    metrics_app.include_router(metrics_routes.router)
+
+    async def run():
+        transport = httpx.ASGITransport(app=metrics_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics")
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "# TYPE mongodb_pool_connections gauge" in response.text
+
+
+def test_mongo_listeners_record_commands_and_pool_state():
+    command = metrics.get("mongodb_command_duration_seconds")
+    before = sum(command.values().get(("find", "ok"), [0])[:-1])
+    MongoCommandMetrics().succeeded(
+        monitoring.CommandSucceededEvent(timedelta(milliseconds=2), {"ok": 1}, "find", 1, ("localhost", 27017), None)
+    )
+    assert sum(command.values()[("find", "ok")][:-1]) == before + 1
+
+    gauges = metrics.get("mongodb_pool_connections")
+    opened = gauges.fn()[("in_use",)]
+    pool = MongoPoolMetrics()
+    pool.connection_checked_out(None)
+    assert gauges.fn()[("in_use",)] == opened + 1
+    pool.connection_checked_in(None)
+    assert gauges.fn()[("in_use",)] == opened
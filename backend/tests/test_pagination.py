@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.utils.pagination import (
+    _encode,
+    decode_cursor,
+    decode_sort_cursor,
+    encode_cursor,
+    encode_sort_cursor,
+    keyset_filter,
+    sort_keyset_filter,
+)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 4, 1, 9, 30, 15, 123000)
+    oid = ObjectId()
+    cursor = encode_cursor(created_at, oid)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, oid)
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    created_at = datetime(2024, 4, 1)
+    oid = ObjectId()
+    query = keyset_filter(encode_cursor(created_at, oid))
+    assert query == {
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": oid}},
+        ]
+    }
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "eyJjIjoxfQ"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_sort_cursor_for_other_fields():
+    oid = ObjectId()
+    cursor = encode_sort_cursor("companyNameKana", "オオサカショウジ", oid, -1)
+    assert decode_sort_cursor("companyNameKana", cursor, -1) == ("オオサカショウジ", oid)
+    assert sort_keyset_filter("companyNameKana", -1, cursor) == {
+        "$or": [
+            {"companyNameKana": {"$lt": "オオサカショウジ"}},
+            {"companyNameKana": "オオサカショウジ", "_id": {"$lt": oid}},
+        ]
+    }
+    # created_at のカーソルは従来の形式のまま
+    created_at = datetime(2024, 4, 1)
+    assert encode_sort_cursor("created_at", created_at, oid) == encode_cursor(created_at, oid)
+
+
+def test_cursor_from_another_sort_is_rejected():
+    cursor = encode_sort_cursor("companyNameKana", "ア", ObjectId())
+    with pytest.raises(ValueError):
+        decode_sort_cursor("created_at", cursor)
+    with pytest.raises(ValueError):
+        decode_sort_cursor("companyNameKana", encode_cursor(datetime(2024, 4, 1), ObjectId()))
+
+
+def test_cursor_for_the_opposite_direction_is_rejected():
+    oid = ObjectId()
+    with pytest.raises(ValueError):
+        sort_keyset_filter("companyNameKana", -1, encode_sort_cursor("companyNameKana", "ア", oid, 1))
+    with pytest.raises(ValueError):
+        sort_keyset_filter("created_at", -1, encode_cursor(datetime(2024, 4, 1), oid))
+    created_at = datetime(2024, 4, 1)
+    assert sort_keyset_filter("created_at", -1, encode_sort_cursor("created_at", created_at, oid, -1)) == {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": oid}},
+        ]
+    }
+
+
+@pytest.mark.parametrize("value", [{"$regex": ".*"}, {"$ne": None}, ["ア"], 1, None])
+def test_sort_cursor_value_must_be_a_string(value):
+    # クライアントが組み立てたカーソルで演算子を条件に入れられないこと
+    cursor = _encode({"f": "companyNameKana", "d": 1, "v": value, "i": str(ObjectId())})
+    with pytest.raises(ValueError):
+        sort_keyset_filter("companyNameKana", 1, cursor)
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+from app.services.password_service import PasswordService, import_password_service, password_service
+
+
+def test_hash_and_verify_use_configured_cost():
+    service = PasswordService(rounds=4, max_workers=2)
+
+    async def run():
+        hashed = await service.hash("Abc123!")
+        return hashed, await service.verify("Abc123!", hashed), await service.verify("wrong", hashed)
+
+    hashed, ok, wrong = asyncio.run(run())
+    service.shutdown()
+    assert hashed.startswith("$2b$04$")
+    assert ok and not wrong
+    # 平文で保存された従来データは一致しない扱い
+    assert not service.verify_sync("Abc123!", "Abc123!")
+
+
+def test_hashing_runs_on_the_worker_pool_not_the_event_loop(monkeypatch):
+    service = PasswordService(rounds=4, max_workers=2, thread_name_prefix="test-hash")
+    threads = []
+    hash_sync = service.hash_sync
+
+    def recording_hash_sync(password):
+        threads.append(threading.current_thread())
+        return hash_sync(password)
+
+    monkeypatch.setattr(service, "hash_sync", recording_hash_sync)
+
+    async def run():
+        await asyncio.gather(*(service.hash("Abc123!") for _ in range(6)))
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    service.shutdown()
+    # イベントループのスレッドでは計算せず、ワーカー数を上限にプールのスレッドで計算する
+    assert len(threads) == 6
+    assert loop_thread not in threads
+    assert all(t.name.startswith("test-hash") for t in threads)
+    assert len(set(threads)) <= 2
+
+
+def test_imports_hash_on_a_separate_pool():
+    assert import_password_service.executor is not password_service.executor
+    assert import_password_service.rounds == password_service.rounds
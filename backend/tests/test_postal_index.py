@@ -0,0 +1,85 @@
+import os
+
+import pytest
+from pydantic import ValidationError
+
+import app.schemas.company as company_schema
+from app.config import POSTAL_INDEX_PATH
+from app.schemas.company import CompanyCreate
+from app.services.postal_index import (
+    PostalIndex,
+    PostalService,
+    build_index,
+    normalize_postal_code,
+    parse_ken_all,
+)
+
+SAMPLE_CSV = os.path.join(os.path.dirname(POSTAL_INDEX_PATH), "ken_all_sample.csv")
+
+KEN_ALL = [
+    '27127,"530  ","5300001","ｵｵｻｶﾌ","ｵｵｻｶｼｷﾀｸ","ｳﾒﾀﾞ","大阪府","大阪市北区","梅田",0,0,1,0,0,0',
+    '13101,"100  ","1000000","ﾄｳｷｮｳﾄ","ﾁﾖﾀﾞｸ","ｲｶﾆｹｲｻｲｶﾞﾅｲﾊﾞｱｲ","東京都","千代田区","以下に掲載がない場合",0,0,0,0,0,0',
+    # 町域が2行に分割された行
+    '01101,"064  ","0640941","ﾎｯｶｲﾄﾞｳ","ｻｯﾎﾟﾛｼﾁｭｳｵｳｸ","ｱｻﾋｶﾞｵｶ","北海道","札幌市中央区","旭ケ丘（１～７丁目、",0,0,1,0,0,0',
+    '01101,"064  ","0640941","ﾎｯｶｲﾄﾞｳ","ｻｯﾎﾟﾛｼﾁｭｳｵｳｸ","ｱｻﾋｶﾞｵｶ","北海道","札幌市中央区","宮の森）",0,0,1,0,0,0',
+    # 1つの郵便番号に複数の町域
+    '04101,"989  ","9893201","ﾐﾔｷﾞｹﾝ","ｾﾝﾀﾞｲｼｱｵﾊﾞｸ","ｺｳｼﾞ","宮城県","仙台市青葉区","国見ケ丘",0,0,1,1,0,0',
+    '04101,"989  ","9893201","ﾐﾔｷﾞｹﾝ","ｾﾝﾀﾞｲｼｱｵﾊﾞｸ","ﾆｼｷｶﾞｵｶ","宮城県","仙台市青葉区","錦ケ丘",0,0,1,1,0,0',
+    '27127,"530  ","5300001","ｵｵｻｶﾌ","ｵｵｻｶｼｷﾀｸ","ｳﾒﾀﾞ","大阪府","大阪市北区","梅田",0,0,1,0,0,0',
+]
+
+
+@pytest.fixture()
+def index(tmp_path):
+    path = tmp_path / "postal_index.bin"
+    path.write_bytes(build_index(parse_ken_all(KEN_ALL)))
+    index = PostalIndex.open(str(path))
+    yield index
+    index.close()
+
+
+def test_normalize_postal_code():
+    assert normalize_postal_code("530-0001") == "5300001"
+    assert normalize_postal_code("〒5300001") == "5300001"
+    for invalid in ("530001", "53000011", "abc-defg", "５３００００１"):
+        assert normalize_postal_code(invalid) is None
+
+
+def test_lookup(index):
+    assert len(index) == 5
+    [osaka] = index.lookup("530-0001")
+    assert (osaka.prefecture, osaka.city, osaka.town) == ("大阪府", "大阪市北区", "梅田")
+    assert index.lookup("1000000")[0].town == ""
+    assert index.lookup("0640941")[0].town == "旭ケ丘（１～７丁目、宮の森）"
+    assert [e.town for e in index.lookup("9893201")] == ["国見ケ丘", "錦ケ丘"]
+    assert index.lookup("0640942") == []
+    assert index.lookup("9999999") == []
+
+
+def test_bundled_index_matches_sample_csv():
+    # 同梱の索引はサンプル CSV から生成したもの（CSV を更新したら scripts/build_postal_index で再生成する）
+    with open(SAMPLE_CSV, encoding="utf-8", newline="") as f:
+        expected = build_index(parse_ken_all(f))
+    with open(POSTAL_INDEX_PATH, "rb") as f:
+        assert f.read() == expected
+
+
+def test_missing_index_is_unavailable(tmp_path):
+    service = PostalService(str(tmp_path / "missing.bin"))
+    assert not service.available
+    assert service.lookup("5300001") == []
+
+
+def test_create_cross_checks_postal_code_when_enabled(monkeypatch, company_input):
+    CompanyCreate.model_validate(company_input(postalCode="1000001"))
+    monkeypatch.setattr(company_schema, "POSTAL_ADDRESS_CHECK_ENABLED", True)
+
+    CompanyCreate.model_validate(company_input())
+    CompanyCreate.model_validate(company_input(location={"prefecture": "大阪府", "city": "大阪市 北区", "streetAddress": "1"}))
+    for data, message in [
+        (company_input(postalCode="5309999"), "郵便番号に該当する住所が見つかりません"),
+        (company_input(postalCode="1000001"), "郵便番号と都道府県が一致しません"),
+        (company_input(location={"prefecture": "大阪府", "city": "大阪市中央区", "streetAddress": "1"}), "郵便番号と市区町村が一致しません"),
+    ]:
+        with pytest.raises(ValidationError, match=message):
+            CompanyCreate.model_validate(data)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+
+import httpx
+from pymongo import monitoring
+
+from app.middleware.profiling import ProfilingMiddleware
+from app.services.profiling import MongoProfileListener, ProfileStore
+from app.utils.profiling import StackSampler, collapsed, current_profile, phase, profiled, record_phase
+
+
+def test_phase_is_a_shared_noop_outside_a_profile():
+    assert current_profile() is None
+    assert phase("auth") is phase("db")
+    with phase("auth"):
+        pass
+    record_phase("db", 1.0)
+    assert current_profile() is None
+
+
+def test_phases_accumulate_and_render_server_timing():
+    with profiled() as profile:
+        with phase("auth"):
+            time.sleep(0.002)
+        record_phase("db", 0.003)
+        record_phase("db", 0.004)
+        assert current_profile() is profile
+    assert current_profile() is None
+    assert profile.phases["auth"] >= 0.002
+    assert profile.phases["db"] == 0.007
+    timing = profile.server_timing(total=0.05)
+    assert "db;dur=7.00" in timing
+    assert timing.endswith("total;dur=50.00")
+
+
+def test_mongo_listener_adds_command_time_to_db_phase():
+    event = monitoring.CommandSucceededEvent(timedelta(milliseconds=3), {"ok": 1}, "find", 1, ("localhost", 27017), None)
+    MongoProfileListener().succeeded(event)
+    with profiled() as profile:
+        MongoProfileListener().succeeded(event)
+    assert profile.phases == {"db": 0.003}
+
+
+def busy_work(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_stack_sampler_collects_collapsed_stacks_of_the_target_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_work, args=(stop,))
+    worker.start()
+    sampler = StackSampler(worker.ident, interval=0.001).start()
+    time.sleep(0.1)
+    stacks = sampler.stop()
+    stop.set()
+    worker.join()
+
+    assert sum(stacks.values()) > 0
+    # 呼び出し元 → 呼び出し先の順（busy_work の下に is_set などが続く場合がある）
+    assert all("busy_work (test_profiling.py:" in stack for stack in stacks)
+    assert all(stack.startswith("_bootstrap ") for stack in stacks)
+    line = collapsed(stacks).splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+async def plain_app(scope, receive, send):
+    with phase("serialization"):
+        body = b"{}"
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def request(app, headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/v1/companies/", headers=headers)
+
+    return asyncio.run(run())
+
+
+def test_middleware_profiles_only_requests_with_the_token(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=10)
+    app = ProfilingMiddleware(plain_app, token="s3cret", all_requests=False, store=store)
+
+    assert "server-timing" not in request(app).headers
+    assert "server-timing" not in request(app, {"X-Profile-Token": "wrong"}).headers
+    assert list(tmp_path.iterdir()) == []
+
+    response = request(app, {"X-Profile-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("serialization;dur=")
+    profile_id = response.headers["x-profile-id"]
+    summary = json.loads(store.load(profile_id, "json"))
+    assert summary["path"] == "/api/v1/companies/"
+    assert summary["status"] == 200
+    assert "serialization" in summary["phasesMs"]
+    assert store.load(profile_id, "folded") is not None
+
+
+def test_middleware_without_token_profiles_nothing_unless_all_requests(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=10)
+    assert "x-profile-id" not in request(ProfilingMiddleware(plain_app, token="", store=store)).headers
+    everything = ProfilingMiddleware(plain_app, token="", all_requests=True, store=store)
+    assert "x-profile-id" in request(everything).headers
+
+
+def test_store_keeps_only_the_newest_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    ids = [f"{i:016x}" for i in range(3)]
+    for i, profile_id in enumerate(ids):
+        store.save(profile_id, "main 1\n", {"id": profile_id})
+        # mtime の順序を確実にする
+        time.sleep(0.01)
+    assert store.load(ids[0], "json") is None
+    assert store.load(ids[2], "folded") == "main 1\n"
+    assert store.load("../etc/passwd", "json") is None
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.migrations.indexes import MIGRATIONS_COLLECTION
+from app.migrations.schema_versions import apply_schema_checks
+from app.models.company_document import CURRENT_SCHEMA_VERSION, INCOMPATIBLE_SCHEMA_VERSION, Company
+from app.services.company_reader import COMPATIBILITY_CHECK, readable
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def test_legacy_documents_are_checked_once_per_check_version(raw_company):
+    db = mongomock_motor.AsyncMongoMockClient()["schema_test"]
+    current = raw_company(schemaVersion=CURRENT_SCHEMA_VERSION)
+    legacy_ok = raw_company(companyCode="OLD-1")
+    legacy_broken = raw_company(companyCode="abc")
+    # 旧い判定基準で非互換と記録されたが、現行の基準では返せる（データ修正・検証の緩和後）
+    stale_ok = raw_company(companyCode="OLD-2", schemaVersion=INCOMPATIBLE_SCHEMA_VERSION, schemaCheck="old")
+    stale_broken = raw_company(companyCode="xyz", schemaVersion=INCOMPATIBLE_SCHEMA_VERSION, schemaCheck="old")
+    rows = [current, legacy_ok, legacy_broken, stale_ok, stale_broken]
+
+    async def run():
+        companies = db[Company.Settings.name]
+        await companies.insert_many(rows)
+        # 古い記録の行は移行前から読み取りの対象（読み取り時に検証して除外される）
+        before = {raw["companyCode"] async for raw in companies.find(readable())}
+        first = await apply_schema_checks(db)
+        second = await apply_schema_checks(db)
+        stored = {raw["companyCode"]: raw async for raw in companies.find()}
+        visible = {raw["companyCode"] async for raw in companies.find(readable())}
+        record = await db[MIGRATIONS_COLLECTION].find_one({"_id": "companies.schema"})
+        return before, first, second, stored, visible, record
+
+    before, first, second, stored, visible, record = asyncio.run(run())
+    assert before == {"OSK-0001", "OLD-1", "abc", "OLD-2", "xyz"}
+    assert first is True
+    # ウォームスタートでは何もしない
+    assert second is False
+    assert stored["OLD-1"]["schemaVersion"] == stored["OLD-2"]["schemaVersion"] == CURRENT_SCHEMA_VERSION
+    assert "schemaCheck" not in stored["OLD-2"]
+    for code in ("abc", "xyz"):
+        assert (stored[code]["schemaVersion"], stored[code]["schemaCheck"]) == (INCOMPATIBLE_SCHEMA_VERSION, COMPATIBILITY_CHECK)
+    assert visible == {"OSK-0001", "OLD-1", "OLD-2"}
+    assert (record["check"], record["compatible"], record["incompatible"]) == (COMPATIBILITY_CHECK, 2, 2)
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.services.company_reader import readable
+from app.services.company_search import SEARCH_SCORE_FIELD, build_search_pipeline
+from app.utils.ngram import index_tokens, normalize_text, query_tokens
+
+
+def test_normalize_text_folds_width_and_case():
+    assert normalize_text("ＡＢＣ－１２ ｵｵｻｶ") == "abc-12オオサカ"
+
+
+def test_index_tokens_contain_every_query_bigram():
+    tokens = set(index_tokens("大阪商事", "オオサカショウジ", "OSK-001"))
+    for q in ("大阪", "阪商事", "ショウジ", "osk", "大"):
+        assert set(query_tokens(q)) <= tokens
+
+
+def test_query_tokens_single_char_and_dedup():
+    assert query_tokens("大") == ["大"]
+    assert query_tokens("ああああ") == ["ああ"]
+    assert query_tokens("   ") == []
+
+
+def test_search_pipeline_does_not_use_regex():
+    pipeline = build_search_pipeline(".*(a+)+$", offset=0, limit=20)
+    assert pipeline[0] == {"$match": readable({"searchTokens": {"$all": query_tokens(".*(a+)+$")}})}
+    assert "$regex" not in str(pipeline)
+
+
+def test_search_requires_every_query_token():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def run():
+        collection = mongomock_motor.AsyncMongoMockClient()["t"]["companies"]
+        await collection.insert_many([
+            {"companyCode": "A", "companyName": "株式会社大阪", "searchTokens": index_tokens("株式会社大阪")},
+            {"companyCode": "B", "companyName": "大和会社", "searchTokens": index_tokens("大和会社")},
+            {"companyCode": "C", "companyName": "株式会社京都", "searchTokens": index_tokens("株式会社京都")},
+        ])
+        pipeline = build_search_pipeline("株式会社", offset=0, limit=20, projection={"companyCode": 1, "_id": 0})
+        return await collection.aggregate(pipeline).to_list(length=None)
+
+    # 「会社」だけを含む B は対象外（A と C は同点のため _id 順）
+    assert asyncio.run(run()) == [{"companyCode": "A"}, {"companyCode": "C"}]
+
+
+def test_search_results_are_ranked_by_relevance(raw_company):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    def company(code, name, kana):
+        return raw_company(
+            companyCode=code, companyName=name, companyNameKana=kana,
+            searchTokens=index_tokens(name, kana, code),
+        )
+
+    # _id の昇順に挿入するため、関連度がなければ挿入順に並ぶ
+    rows = [
+        company("OSK-0001", "西大阪運輸", "ニシオオサカウンユ"),         # 企業名の部分一致
+        company("OSK-0002", "株式会社 大阪", "カブシキガイシャオオサカ"),   # 企業名の部分一致（空白を含む）
+        company("OSK-0003", "大阪商事", "オオサカショウジ"),             # 企業名の前方一致
+        company("OSK-0004", "大阪", "オオサカ"),                         # 企業名の完全一致
+    ]
+
+    async def run():
+        collection = mongomock_motor.AsyncMongoMockClient()["t"]["companies"]
+        await collection.insert_many(rows)
+        pipeline = build_search_pipeline("大阪", offset=0, limit=20)
+        return await collection.aggregate(pipeline).to_list(length=None)
+
+    result = asyncio.run(run())
+    assert [r["companyCode"] for r in result] == ["OSK-0004", "OSK-0003", "OSK-0001", "OSK-0002"]
+    # 関連度は並べ替えにだけ使い、応答には含めない
+    assert all(SEARCH_SCORE_FIELD not in r for r in result)
+
+
+def test_search_ranks_kana_and_code_matches_below_name_matches(raw_company):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    rows = [
+        raw_company(companyCode="ABC-1", companyName="東京物産", companyNameKana="トウキョウブッサン",
+                    searchTokens=index_tokens("東京物産", "トウキョウブッサン", "ABC-1")),
+        raw_company(companyCode="XYZ-1", companyName="ABC商会", companyNameKana="エービーシーショウカイ",
+                    searchTokens=index_tokens("ABC商会", "エービーシーショウカイ", "XYZ-1")),
+    ]
+
+    async def run():
+        collection = mongomock_motor.AsyncMongoMockClient()["t"]["companies"]
+        await collection.insert_many(rows)
+        # 全角・大文字小文字の違いは吸収する
+        pipeline = build_search_pipeline("ａｂｃ", offset=0, limit=20, projection={"companyCode": 1})
+        return await collection.aggregate(pipeline).to_list(length=None)
+
+    # 企業名の前方一致（40）> 企業コードの前方一致（20）
+    assert [r["companyCode"] for r in asyncio.run(run())] == ["XYZ-1", "ABC-1"]
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.models.company_document import CURRENT_SCHEMA_VERSION
+from app.schemas.auth import UserInfo
+from app.services import company_reader
+from app.services.keycloak_service import keycloak_service
+from app.utils.singleflight import SingleFlight, flight_key
+
+USER = UserInfo(sub="u", username="tester")
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def load(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def run():
+        same = await asyncio.gather(*(flight.do("a", lambda: load(1)) for _ in range(10)))
+        other = await flight.do("b", lambda: load(2))
+        # 完了後は保持しない（次の呼び出しは再実行）
+        again = await flight.do("a", lambda: load(3))
+        return same, other, again
+
+    same, other, again = asyncio.run(run())
+    assert same == [1] * 10 and other == 2 and again == 3
+    assert calls == [1, 2, 3]
+    assert flight.shared == 9
+
+
+def test_errors_are_shared_and_not_remembered():
+    flight = SingleFlight()
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        with pytest.raises(ValueError):
+            await flight.do("k", fail)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_flight_key_normalizes_argument_order():
+    assert flight_key("list", {"a": 1, "b": 2}) == flight_key("list", {"b": 2, "a": 1})
+    assert flight_key("list", {"a": 1}) != flight_key("list", {"a": 2})
+
+
+class CountingCursor:
+    def __init__(self, collection, rows):
+        self.collection = collection
+        self.rows = rows
+
+    def sort(self, *args):
+        return self
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        # 1回の to_list を1往復として数え、他のリクエストが重なるよう少し待つ
+        self.collection.round_trips += 1
+        await asyncio.sleep(0.05)
+        return list(self.rows)
+
+
+class CountingCollection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.round_trips = 0
+
+    def find(self, query, projection=None, **kwargs):
+        return CountingCursor(self, self.rows)
+
+
+@pytest.fixture()
+def collection(monkeypatch, raw_company):
+    rows = [raw_company(schemaVersion=CURRENT_SCHEMA_VERSION, companyCode=f"OSK-{i:04d}") for i in range(3)]
+    collection = CountingCollection(rows)
+    monkeypatch.setattr(company_reader.CompanyDoc, "get_motor_collection", classmethod(lambda cls: collection))
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: USER)
+
+    async def verify_token(token):
+        return USER
+
+    monkeypatch.setattr(keycloak_service, "verify_token", verify_token)
+    return collection
+
+
+def gather_requests(n, send):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(send(client) for _ in range(n)))
+
+    return asyncio.run(run())
+
+
+def test_concurrent_identical_rest_lists_make_one_round_trip(collection):
+    responses = gather_requests(20, lambda c: c.get("/api/v1/companies/", params={"limit": 20}))
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.content for r in responses}) == 1
+    assert collection.round_trips == 1
+
+
+def test_concurrent_identical_graphql_lists_make_one_round_trip(collection):
+    query = {"query": "{ companies(limit: 20, offset: 0) { id companyCode } }"}
+    headers = {"Authorization": "Bearer x"}
+    responses = gather_requests(20, lambda c: c.post("/graphql", json=query, headers=headers))
+    bodies = [r.json() for r in responses]
+    assert all(len(b["data"]["companies"]) == 3 for b in bodies)
+    assert collection.round_trips == 1
@@ -0,0 +1,34 @@
+import asyncio
+import json
+
+from pydantic import BaseModel
+
+from app.utils.streaming import json_array_stream, ndjson_stream
+
+
+class Item(BaseModel):
+    name: str
+
+
+async def _items(n):
+    for i in range(n):
+        yield Item(name=f"企業{i}")
+
+
+def _collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+
+    return asyncio.run(run())
+
+
+def test_ndjson_stream_writes_one_line_per_item():
+    chunks = _collect(ndjson_stream(_items(3)))
+    assert len(chunks) == 3
+    assert [json.loads(c) for c in chunks] == [{"name": f"企業{i}"} for i in range(3)]
+
+
+def test_json_array_stream_is_valid_json():
+    for n in (0, 1, 3):
+        body = b"".join(_collect(json_array_stream(_items(n))))
+        assert json.loads(body) == [{"name": f"企業{i}"} for i in range(n)]